@@ -3,27 +3,42 @@
 """
 多源论文监控系统（增强版）
 ✅ 动态扩大搜索时间窗口，确保每日有推送
-✅ 三大主题 + 制备方法组合查询
+✅ 三大主题按材料检索，制备方法本地识别并标注
+✅ 每个主题的候选按 BM25 相关度、偏好关键词与发表时间排序后取前 target_count 篇
+✅ 按用户收藏（stars.json）从论文库近期论文中追加相似推荐
 ✅ DeepSeek 翻译 + 飞书签名推送
 """
 
 import os
 import sys
-import requests
-import json
-import time
-import hashlib
-import base64
-import hmac
+from contextlib import closing
 from pathlib import Path
 from datetime import datetime, timedelta, timezone
-from urllib.parse import quote_plus
-from bs4 import BeautifulSoup
-import re
+
+from arxiv_listing import fetch_listings
+from arxiv_query import arxiv_query_url, build_search_query
+from atom_parser import iter_arxiv_entries
+from cursor_store import CursorStore
+from dedup import Deduplicator
+from feishu_notify import build_digest_messages, build_post_message, post_webhook
+from fetch_engine import fetch_all
+from http_client import get_client
+from iop_source import fetch_iop_papers
+from method_tagger import DEFAULT_TAGGER as METHOD_TAGGER
+from monitor_config import arxiv_categories, keyword_preferences
+from outbox import DeliveryWorker, Outbox, record_delivered
+from paper_archive import PaperArchive
+from query_planner import plan_topic_queries
+from recommender import Recommender, SparseIndex, load_stars
+from relevance_ranker import HALF_LIFE_DAYS, RelevanceRanker
+from seen_store import SEEN_STORE_PATH, SeenStore
+from translator import get_translation_cache, translate_papers
 
 # ==================== 环境变量配置 ====================
 FEISHU_WEBHOOK_URL = os.getenv("FEISHU_WEBHOOK_URL")
 FEISHU_SECRET = os.getenv("FEISHU_SECRET")
+FEISHU_DIGEST = os.getenv("FEISHU_DIGEST", "1") not in ("", "0")  # 0 = 每篇单独推送
+DELIVERY_WAIT_SECONDS = int(os.getenv("DELIVERY_WAIT_SECONDS", "120"))  # 结束前等待发件箱投递的最长时间
 DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY")
 
 if not FEISHU_WEBHOOK_URL:
@@ -31,7 +46,8 @@ if not FEISHU_WEBHOOK_URL:
     sys.exit(1)
 
 # ==================== 搜索配置 ====================
-# 三大主题及其查询（包含制备方法）
+# 三大主题及其"材料 × 制备方法"组合查询：查询规划器把组合查询并入材料查询的批量检索，
+# 再在本地按原查询归属主题；制备方法标签由 method_tagger 另行标注
 ARXIV_TOPICS = [
     {
         "name": "【多铁/磁电 + 制备】",
@@ -94,229 +110,314 @@ ARXIV_TOPICS = [
     }
 ]
 
-# IOP 搜索词（同样融入制备方法）
+# IOP 搜索词（只按材料检索，制备方法在本地识别，只保留识别出制备方法的论文）
 IOP_SEARCH_TERMS = [
-    "multiferroic magnetoelectric solid state reaction",
-    "multiferroic magnetoelectric ceramic method",
-    "multiferroic magnetoelectric CVT",
-    "quantum spin liquid frustrated magnet solid state",
-    "quantum spin liquid frustrated magnet CVT",
-    "kagome lattice solid state reaction",
-    "kagome lattice sintering",
-    "kagome lattice CVT",
-    "solid state reaction multiferroic",
-    "chemical vapor transport quantum spin liquid"
+    "multiferroic magnetoelectric",
+    "quantum spin liquid frustrated magnet",
+    "kagome lattice",
 ]
+IOP_TARGET_COUNT = int(os.getenv("IOP_TARGET_COUNT", "5"))  # IOP 每次最多推送的篇数（按相关度取前 N 篇）
 
 # 动态时间窗口配置（单位：天）
 TIME_WINDOWS = [7, 14, 30, 90]  # 依次扩大
-SENT_IDS_FILE = Path(__file__).parent / "sent_papers.json"
+ARXIV_MAX_WORKERS = int(os.getenv("ARXIV_MAX_WORKERS", "4"))  # 同时在途的 arXiv 请求数
+SENT_IDS_FILE = Path(__file__).parent / "sent_papers.json"  # 旧版格式，仅用于迁移
+ARXIV_MAX_RESULTS = 25  # 每个查询最多抓取的条目数
+CURSOR_PAGE_SIZE = 10   # 有游标时的分页大小，翻到上次的高水位即停止
+PLANNED_MAX_RESULTS = 1000  # 合并后的批量查询最多抓取的条目数（实际在最宽窗口处截止）
+PLANNED_PAGE_SIZE = 200     # 批量查询无游标时的分页大小
+PLANNED_CURSOR_PAGE_SIZE = 50  # 批量查询有游标时的分页大小
+FULL_SYNC = os.getenv("ARXIV_FULL_SYNC", "") not in ("", "0")  # 忽略游标，全量抓取
+ARXIV_CATEGORIES = arxiv_categories()  # 服务端 cat: 限制，来自 config.yaml（ARXIV_CATEGORIES=* 表示不限）
+RECOMMEND_COUNT = int(os.getenv("RECOMMEND_COUNT", "3"))  # 每位用户的相似推荐篇数（0 = 关闭）
+RECOMMEND_DAYS = int(os.getenv("RECOMMEND_DAYS", "7"))    # 相似推荐的候选范围：最近 N 天发表的论文
+# arXiv 来源模式：api = 按主题检索 API；listing = 读取各分类当日列表（RSS），本地匹配主题
+ARXIV_SOURCE_MODE = os.getenv("ARXIV_SOURCE_MODE", "api").strip().lower()
 
 # ==================== 工具函数 ====================
 def load_sent_ids():
-    if SENT_IDS_FILE.exists():
+    """打开紧凑 ID 存储；首次运行时自动导入旧版 sent_papers.json"""
+    store = SeenStore(SEEN_STORE_PATH)
+    if len(store) == 0 and SENT_IDS_FILE.exists():
         try:
-            return set(json.loads(SENT_IDS_FILE.read_text(encoding="utf-8")))
-        except:
-            return set()
-    return set()
+            print(f"📦 导入旧版 {SENT_IDS_FILE.name}：{store.import_json(SENT_IDS_FILE)} 条")
+        except (ValueError, OSError) as e:
+            print(f"⚠️ 旧版 {SENT_IDS_FILE.name} 无法导入: {e}")
+    return store
 
 def save_sent_ids(ids):
-    SENT_IDS_FILE.write_text(json.dumps(list(ids), indent=2), encoding="utf-8")
+    ids.flush()
 
 # --- arXiv 相关 ---
-def query_arxiv_raw(query_str, max_results=30, timeout=30):
-    base_url = "https://export.arxiv.org/api/query"
-    url = f"{base_url}?search_query={quote_plus(query_str)}&sortBy=submittedDate&sortOrder=descending&start=0&max_results={max_results}"
-    response = requests.get(url, timeout=timeout)
-    response.raise_for_status()
-    return response.text
-
-def parse_arxiv_xml(xml_text, since_dt):
-    entries = []
-    for entry in xml_text.split("<entry>")[1:]:
-        try:
-            title = entry.split("<title>")[1].split("</title>")[0].strip()
-            summary = entry.split("<summary>")[1].split("</summary>")[0].strip()
-            link = entry.split('<link href="')[1].split('"')[0]
-            paper_id = "arxiv:" + link.split("/abs/")[-1]
-            published = entry.split("<published>")[1].split("</published>")[0]
-            pub_dt = datetime.strptime(published[:19], "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc)
-            if pub_dt >= since_dt:
-                entries.append({"id": paper_id, "title": title, "summary": summary, "link": link})
-        except:
-            continue
-    return entries
-
-# --- IOP nsearch 抓取 ---
-def fetch_iop_nsearch_papers(keywords, since_dt):
-    base_url = "https://iopscience.iop.org/nsearch"
-    params = {"terms": keywords, "sort": "publishDate"}
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/128.0 Safari/537.36",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-        "Accept-Language": "en-US,en;q=0.9",
-        "Accept-Encoding": "gzip, deflate",
-        "Connection": "keep-alive",
-    }
-    try:
-        response = requests.get(base_url, params=params, headers=headers, timeout=20)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        papers = []
-        for item in soup.select('div.list-item'):
-            try:
-                title_tag = item.select_one('h3 a')
-                if not title_tag:
-                    continue
-                title = title_tag.get_text(strip=True)
-                link = "https://iopscience.iop.org" + title_tag['href']
-                abs_tag = item.select_one('.abstract')
-                abstract = abs_tag.get_text(strip=True) if abs_tag else ""
-                date_tag = item.select_one('.pub-date')
-                if not date_tag:
-                    continue
-                date_str = date_tag.get_text()
-                match = re.search(r'(\d{1,2})\s+(\w+)\s+(\d{4})', date_str)
-                if not match:
-                    continue
-                day, month, year = match.groups()
-                pub_date = datetime.strptime(f"{day} {month} {year}", "%d %b %Y").replace(tzinfo=timezone.utc)
-                if pub_date >= since_dt:
-                    paper_id = f"iop:{link.split('/')[-1]}"
-                    papers.append({
-                        "id": paper_id,
-                        "title": title,
-                        "summary": abstract,
-                        "link": link
-                    })
-            except Exception:
-                continue
-        return papers
-    except Exception as e:
-        print(f"⚠️ IOP nsearch 抓取失败 ({keywords}): {e}")
-        return []
+def arxiv_search_url(query_str, since_dt=None, max_results=30, start=0):
+    """主题查询 + 分类限制 + 提交日期区间，全部在服务端过滤"""
+    search_query = build_search_query(query_str, since_dt, categories=ARXIV_CATEGORIES)
+    return arxiv_query_url(search_query, start=start, max_results=max_results)
 
-# --- DeepSeek 摘要翻译 ---
-def summarize_with_deepseek(text):
-    if not text.strip():
-        return "【摘要】无摘要。"
-    if DEEPSEEK_API_KEY:
-        prompt = (
-            "你是一位顶尖凝聚态物理学家。请将以下英文论文摘要翻译成专业、简洁的中文，并提炼出核心创新点（100字以内）。"
-            f"\n\n{text}\n\n"
-            "输出格式：【中文摘要】... 【核心创新】..."
-        )
-        headers = {"Authorization": f"Bearer {DEEPSEEK_API_KEY}", "Content-Type": "application/json"}
-        data = {"model": "deepseek-coder", "messages": [{"role": "user", "content": prompt}], "max_tokens": 300}
-        try:
-            resp = requests.post("https://api.deepseek.com/chat/completions", headers=headers, json=data, timeout=20)
-            if resp.status_code == 200:
-                return resp.json()["choices"][0]["message"]["content"].strip()
-            else:
-                print(f"⚠️ DeepSeek API 返回错误 {resp.status_code}，使用原文摘要")
-                return f"【摘要】{text[:200]}..."
-        except Exception as e:
-            print(f"⚠️ DeepSeek 调用异常: {e}，使用原文摘要")
-            return f"【摘要】{text[:200]}..."
-    else:
-        return f"【摘要】{text[:200]}..."
+def query_arxiv_entries(query_str, since_dt, max_results=30, timeout=30, start=0):
+    """
+    抓取并解析 arXiv 查询结果
+    流式读取，越过 since_dt 后即断开连接；缓存命中时直接解析缓存内容，
+    回源时边读边缓存（提前断开的残缺响应不写入缓存）
+    """
+    url = arxiv_search_url(query_str, since_dt, max_results, start)
+    with closing(get_client().iter_content(url, timeout=timeout, cache_source="arxiv")) as chunks:
+        return list(iter_arxiv_entries(chunks, since_dt))
+
+def query_arxiv_delta(query_str, since_dt, cursors=None, max_results=ARXIV_MAX_RESULTS,
+                      page_size=None, cursor_page_size=CURSOR_PAGE_SIZE):
+    """
+    分页抓取：有游标时按 cursor_page_size 分页，翻到上次的高水位即停止；
+    没有游标时按 page_size（默认一次取满 max_results）分页。
+    日期区间已在服务端限制，任一页不满即说明窗口内结果已取完。返回高水位之后的新论文。
+    游标以不含日期与分类限制的 query_str 为键，窗口变化不影响高水位。
+    """
+    has_mark = cursors is not None and cursors.mark(query_str) is not None
+    page_size = cursor_page_size if has_mark else (page_size or max_results)
+
+    papers = []
+    start = 0
+    while start < max_results:
+        size = min(page_size, max_results - start)
+        page = query_arxiv_entries(query_str, since_dt, max_results=size, start=start)
+        for p in page:
+            if has_mark and cursors.reached(query_str, p):
+                return papers
+            papers.append(p)
+        if len(page) < size:
+            break
+        start += size
+    return papers
 
 # --- 飞书推送（支持签名）---
-def send_to_feishu(title, summary, link, tag):
-    content = {
-        "msg_type": "post",
-        "content": {
-            "post": {
-                "zh_cn": {
-                    "title": f"{tag} {title}",
-                    "content": [
-                        [{"tag": "text", "text": summary}],
-                        [{"tag": "a", "text": "查看全文", "href": link}]
-                    ]
-                }
-            }
-        }
-    }
-    if FEISHU_SECRET:
-        timestamp = str(int(time.time()))
-        string_to_sign = timestamp + "\n" + FEISHU_SECRET
-        sign = base64.b64encode(
-            hmac.new(string_to_sign.encode('utf-8'), digestmod=hashlib.sha256).digest()
-        ).decode('utf-8')
-        content["timestamp"] = timestamp
-        content["sign"] = sign
-    try:
-        resp = requests.post(FEISHU_WEBHOOK_URL, json=content, timeout=10)
-        if resp.status_code == 200:
-            result = resp.json()
-            if result.get("code") == 0:
-                print(f"✅ 已发送到飞书: {title[:30]}...")
-            else:
-                print(f"❌ 飞书返回错误: {result}")
-        else:
-            print(f"❌ 发送失败 HTTP {resp.status_code}")
-    except Exception as e:
-        print(f"❌ 发送异常: {e}")
+def deliver_to_feishu(payload):
+    """发件箱的投递函数：签名在真正发送时生成"""
+    return post_webhook(FEISHU_WEBHOOK_URL, payload, FEISHU_SECRET)
+
+def enqueue_papers(outbox, papers, used_days):
+    """把本次论文放入发件箱：默认合并为日报卡片，FEISHU_DIGEST=0 时每篇一条"""
+    if FEISHU_DIGEST:
+        title = f"📚 论文日报 {datetime.now().strftime('%Y-%m-%d')}：{len(papers)} 篇（最近 {used_days} 天）"
+        messages = build_digest_messages(papers, title)
+        print(f"📨 日报卡片：{len(papers)} 篇论文合并为 {len(messages)} 条消息")
+        for card, in_card in messages:
+            # 卡片投递成功后，其中的论文才标记为已推送
+            outbox.enqueue(card, in_card)
+    else:
+        for p in papers:
+            outbox.enqueue(build_post_message(p["title"], p["processed_summary"], p["link"], p["tag"], p.get("methods", [])), [p])
+
+# ==================== arXiv 候选采集 ====================
+def harvest_arxiv_api(plan, since_dt, cursors=None):
+    """规划后的少量 OR 批量查询并发抓取，返回候选论文（可能含重复）"""
+    mode = "增量（游标）" if cursors is not None else "全量"
+    if ARXIV_CATEGORIES:
+        print(f"  🏷️ 分类限制：{', '.join(ARXIV_CATEGORIES)}")
+    print(f"  🌐 并发检索 arXiv：{len(plan.batches)} 个批量查询，{mode}，最多 {ARXIV_MAX_WORKERS} 个同时进行")
+    results = fetch_all(
+        lambda q: query_arxiv_delta(
+            q, since_dt, cursors,
+            max_results=PLANNED_MAX_RESULTS,
+            page_size=PLANNED_PAGE_SIZE,
+            cursor_page_size=PLANNED_CURSOR_PAGE_SIZE,
+        ),
+        plan.batches,
+        max_workers=ARXIV_MAX_WORKERS,
+    )
+    candidates = []
+    for result in results:
+        if not result.ok:
+            print(f"    ⚠️ 查询失败: {result.error}")
+            continue
+        if cursors is not None:
+            cursors.advance(result.item, result.value)
+        candidates.extend(result.value)
+    return candidates
+
+def harvest_arxiv_listing():
+    """读取各分类的当日列表（每个分类一次请求），主题匹配留给 plan.attribute"""
+    if not ARXIV_CATEGORIES:
+        print("  ⚠️ 列表模式需要在 config.yaml 或 ARXIV_CATEGORIES 中配置分类")
+        return []
+    papers, requests_made = fetch_listings(ARXIV_CATEGORIES)
+    print(f"  📰 分类列表模式：{len(ARXIV_CATEGORIES)} 个分类，{requests_made} 次请求")
+    return papers
 
 # ==================== 动态时间窗口搜索 ====================
-def search_papers_with_expanding_window():
-    sent_ids = load_sent_ids()
-    all_new_papers = []
-    used_window = None
+def select_smallest_window(pool, target_count, now, taken_ids):
+    """
+    在内存中为候选池选择时间窗口
 
+    依次尝试 TIME_WINDOWS，返回第一个能凑满 target_count 篇的窗口及其论文；
+    都凑不满时返回最宽的非空窗口。target_count 为 None 表示取最小非空窗口内的全部论文。
+    窗口内按 pool 的顺序（相关度排序后的顺序）取前 target_count 篇。
+    返回 (论文列表, 天数)，无候选时返回 ([], None)。
+    """
+    fallback = ([], None)
     for days in TIME_WINDOWS:
-        since_dt = datetime.now(timezone.utc) - timedelta(days=days)
-        print(f"\n📅 尝试搜索最近 {days} 天...")
-
-        # 临时存储本次窗口找到的论文（用于去重）
-        window_papers = []
-
-        # 1. 抓取 arXiv
-        for topic in ARXIV_TOPICS:
-            print(f"  🔍 检索 arXiv: {topic['name']}")
-            collected = 0
-            for q in topic["queries"]:
-                if collected >= topic["target_count"]:
-                    break
-                try:
-                    xml = query_arxiv_raw(q, max_results=25)
-                    papers = parse_arxiv_xml(xml, since_dt)
-                    for p in papers:
-                        if p["id"] not in sent_ids and p["id"] not in [x["id"] for x in window_papers]:
-                            print(f"    🧠 arXiv: {p['title'][:50]}...")
-                            p["processed_summary"] = summarize_with_deepseek(p["summary"])
-                            p["tag"] = topic["name"]
-                            window_papers.append(p)
-                            sent_ids.add(p["id"])
-                            collected += 1
-                            if collected >= topic["target_count"]:
-                                break
-                except Exception as e:
-                    print(f"    ⚠️ 查询失败: {e}")
-                    continue
-
-        # 2. 抓取 IOP
-        print("  📡 搜索 IOP Science (nsearch) ...")
-        for terms in IOP_SEARCH_TERMS:
-            iop_papers = fetch_iop_nsearch_papers(terms, since_dt)
-            for p in iop_papers:
-                if p["id"] not in sent_ids and p["id"] not in [x["id"] for x in window_papers]:
-                    print(f"    🧠 IOP: {p['title'][:50]}...")
-                    p["processed_summary"] = summarize_with_deepseek(p["summary"])
-                    p["tag"] = "【IOP】"
-                    window_papers.append(p)
-                    sent_ids.add(p["id"])
-
-        if window_papers:
-            print(f"  ✅ 在 {days} 天内找到 {len(window_papers)} 篇新论文")
-            all_new_papers = window_papers
-            used_window = days
-            break
-        else:
-            print(f"  ⚠️ 最近 {days} 天无新论文，扩大时间窗口...")
+        since_dt = now - timedelta(days=days)
+        picked = [p for p in pool if p["published"] >= since_dt and p["id"] not in taken_ids]
+        if target_count is None:
+            if picked:
+                return picked, days
+            continue
+        picked = picked[:target_count]
+        if len(picked) >= target_count:
+            return picked, days
+        if picked:
+            fallback = (picked, days)
+    return fallback
 
-    return all_new_papers, used_window, sent_ids
+def recommend_from_stars(archive, dedup, selected_ids, now):
+    """按用户收藏从论文库最近 RECOMMEND_DAYS 天的论文中挑选相似论文（未选中、未推送过的）"""
+    stars = load_stars()
+    if not stars or not RECOMMEND_COUNT:
+        return []
+    index = SparseIndex()
+    added = index.update(archive)
+    pool = [p for p in archive.papers_between(now - timedelta(days=RECOMMEND_DAYS))
+            if p["id"] not in selected_ids and dedup.duplicate_of(p) is None]
+    picks = Recommender(index, stars).recommend(pool, k=RECOMMEND_COUNT)
+    print(f"  ⭐ 相似推荐：{len(stars)} 位用户，索引 {len(index)} 篇（追加 {added}），"
+          f"候选 {len(pool)} 篇，选出 {sum(len(v) for v in picks.values())} 篇")
+    recommended = []
+    for user, papers in picks.items():
+        for p, score in papers:
+            METHOD_TAGGER.tag_paper(p)
+            p["tag"] = f"【相似推荐 · {user}】"
+            p["relevance"] = round(score, 4)
+            recommended.append(p)
+    return recommended
+
+def search_papers_with_expanding_window(cursors=None, dedup=None, archive=None):
+    if dedup is None:
+        dedup = Deduplicator(load_sent_ids())
+    now = datetime.now(timezone.utc)
+    widest_days = max(TIME_WINDOWS)
+    widest_since = now - timedelta(days=widest_days)
+    print(f"\n📅 一次性抓取最近 {widest_days} 天的候选论文，再按 {TIME_WINDOWS} 天依次选择窗口...")
+
+    priority_keywords, excluded_keywords = keyword_preferences()
+    ranker = RelevanceRanker(priority_keywords, excluded_keywords, now=now)
+    print(f"  📐 相关度排序：优先 {priority_keywords or '无'}，降权 {excluded_keywords or '无'}，"
+          f"半衰期 {HALF_LIFE_DAYS:g} 天")
+
+    # 本次已选中的论文（跨主题去重）
+    selected = []
+    selected_ids = set()
+    used_windows = []
+
+    # 1. 抓取 arXiv（API 批量检索或分类列表），再在本地归属到各主题
+    plan = plan_topic_queries(ARXIV_TOPICS)
+    print(f"  🧭 查询规划：{plan.summary()}")
+    if ARXIV_SOURCE_MODE == "listing":
+        candidates = harvest_arxiv_listing()
+    else:
+        candidates = harvest_arxiv_api(plan, widest_since, cursors)
+
+    harvested = []
+    harvested_ids = set()
+    for p in candidates:
+        if p["id"] not in harvested_ids:
+            METHOD_TAGGER.tag_paper(p)
+            harvested.append(p)
+            harvested_ids.add(p["id"])
+    print(f"    📥 共抓取 {len(harvested)} 篇候选论文")
+
+    fetched = list(harvested)
+    if cursors is not None and archive is not None:
+        # 游标只返回高水位之后的新论文；以往抓到但未选中的窗口内候选从论文库补回，时间窗口回退仍然有效
+        backlog = [p for p in archive.papers_between(widest_since, source="arxiv") if p["id"] not in harvested_ids]
+        for p in backlog:
+            METHOD_TAGGER.tag_paper(p)
+            harvested.append(p)
+            harvested_ids.add(p["id"])
+        print(f"    🗄️ 从论文库补回 {len(backlog)} 篇以往的候选")
+
+    topic_pools = plan.attribute(harvested)
+    if archive is not None:
+        # 所有候选都入库（含未选中的），日后调整主题或重新排序无需重新抓取
+        topics = {}
+        for topic, topic_pool in zip(ARXIV_TOPICS, topic_pools):
+            for p in topic_pool:
+                topics.setdefault(p["id"], []).append(topic["name"])
+        archive.upsert_papers(fetched, topics=topics)
+
+    for topic, topic_pool in zip(ARXIV_TOPICS, topic_pools):
+        print(f"  🔍 归属 arXiv: {topic['name']}")
+        pool = [p for p in topic_pool if dedup.duplicate_of(p) is None]
+        # 整个候选池一起打分排序，再按时间窗口取前 target_count 篇
+        pool = ranker.rank(pool, topic["queries"])
+
+        picked, days = select_smallest_window(pool, topic["target_count"], now, selected_ids)
+        if not picked:
+            print(f"    ⚠️ 最近 {widest_days} 天无新论文")
+            continue
+        print(f"    ✅ 最近 {days} 天内选出 {len(picked)} 篇（候选 {len(pool)} 篇，"
+              f"相关度 {picked[0]['relevance']:.2f}~{picked[-1]['relevance']:.2f}）")
+        for p in picked:
+            p["tag"] = topic["name"]
+            selected.append(p)
+            selected_ids.add(p["id"])
+            dedup.register(p)
+        used_windows.append(days)
+
+    # 2. 抓取 IOP
+    print(f"  📡 并发搜索 IOP Science (nsearch)：{len(IOP_SEARCH_TERMS)} 个搜索词 ...")
+    iop_pool = []
+    iop_ids = set()
+    iop_results, harvester = fetch_iop_papers(IOP_SEARCH_TERMS, widest_since)
+    if archive is not None:
+        archive.upsert_papers(p for _terms, papers in iop_results for p in papers)
+    for _terms, papers in iop_results:
+        for p in papers:
+            if p["id"] in iop_ids:
+                continue
+            iop_ids.add(p["id"])
+            # IOP 只按材料检索：识别不出制备方法的论文不进入候选池
+            if METHOD_TAGGER.tag_paper(p) and dedup.duplicate_of(p) is None:
+                iop_pool.append(p)
+
+    for line in harvester.summary().splitlines():
+        print(f"    📊 {line}")
+    if harvester.unproductive_terms():
+        print(f"    💡 未贡献新论文的搜索词：{'、'.join(harvester.unproductive_terms())}")
+    print(f"    🧪 IOP 候选 {len(iop_pool)} 篇（共 {len(iop_ids)} 篇，已去掉未识别出制备方法与已推送的）")
+    iop_pool = ranker.rank(iop_pool, IOP_SEARCH_TERMS)
+    picked, days = select_smallest_window(iop_pool, IOP_TARGET_COUNT, now, selected_ids)
+    if picked:
+        print(f"    ✅ IOP 最近 {days} 天内选出 {len(picked)} 篇（候选 {len(iop_pool)} 篇，"
+              f"相关度 {picked[0]['relevance']:.2f}~{picked[-1]['relevance']:.2f}）")
+        for p in picked:
+            p["tag"] = "【IOP】"
+            selected.append(p)
+            selected_ids.add(p["id"])
+            dedup.register(p)
+        used_windows.append(days)
+
+    # 3. 按用户收藏追加相似推荐（候选来自本地论文库）
+    if archive is not None:
+        for p in recommend_from_stars(archive, dedup, selected_ids, now):
+            selected.append(p)
+            selected_ids.add(p["id"])
+            dedup.register(p)
+
+    # 4. 只翻译最终选中的论文（批量 + 并发）；投递成功后才写入已推送记录
+    for p in selected:
+        methods = "、".join(p["methods"]) or "未识别制备方法"
+        print(f"    🧠 {p['tag']} [{methods}] {p['title'][:50]}...")
+    stats = translate_papers(selected, api_key=DEEPSEEK_API_KEY or "")
+    print(f"  🈶 翻译：{stats.summary()}")
+    if get_translation_cache() is not None:
+        print(f"  🗃️ 翻译缓存：{get_translation_cache().stats()}")
+    if archive is not None and selected:
+        # 记录今天的日报（含译文），重新渲染或重发时直接查本地库
+        archive.record_digest(now.astimezone().strftime("%Y-%m-%d"), selected)
+        print(f"  🗄️ 论文库：{archive.stats()}")
+
+    print(f"  🧹 去重：精确重复 {dedup.stats['exact']} 篇，近似重复 {dedup.stats['near']} 篇")
+    used_window = max(used_windows) if used_windows else None
+    return selected, used_window, dedup.seen
 
 # ==================== 主程序 ====================
 if __name__ == "__main__":
@@ -325,17 +426,44 @@ if __name__ == "__main__":
     print("📚 来源：arXiv + IOP Science (nsearch)")
     print("=" * 60)
 
-    new_papers, used_days, updated_sent_ids = search_papers_with_expanding_window()
+    # 列表模式每天只读当日列表，不需要游标
+    cursors = None if FULL_SYNC or ARXIV_SOURCE_MODE == "listing" else CursorStore()
+    dedup = Deduplicator(load_sent_ids())
+    archive = PaperArchive()
+
+    # 发件箱：先在后台补发上次遗留的消息，同时开始采集
+    outbox = Outbox()
+    recorded = record_delivered(outbox, dedup)
+    if recorded:
+        print(f"📝 补记上次运行结束后才投递成功的论文 {recorded} 篇")
+    in_flight = outbox.pending_papers()
+    for p in in_flight:
+        dedup.register(p)  # 仍在发件箱中的论文不再重复采集
+    worker = DeliveryWorker(outbox, deliver_to_feishu).start()
+    print(f"📮 发件箱：{outbox.counts()}，待投递论文 {len(in_flight)} 篇")
+
+    new_papers, used_days, updated_sent_ids = search_papers_with_expanding_window(cursors, dedup, archive)
 
     if not new_papers:
         print("\n❌ 所有时间窗口均未找到新论文。")
         # 可选：发送一条提示消息到飞书
         msg = "今日 arXiv & IOP 未找到符合条件的新论文。"
-        send_to_feishu("系统通知", msg, "#", "【提示】")
+        outbox.enqueue(build_post_message("系统通知", msg, "#", "【提示】"))
     else:
         print(f"\n📬 共找到 {len(new_papers)} 篇新论文（时间窗口：最近 {used_days} 天）")
-        for p in new_papers:
-            send_to_feishu(p["title"], p["processed_summary"], p["link"], p["tag"])
+        enqueue_papers(outbox, new_papers, used_days)
+
+    worker.stop(timeout=DELIVERY_WAIT_SECONDS)
+    print(f"📮 {worker.summary()}；发件箱：{outbox.counts()}")
+    # 以发件箱中的投递状态为准；等待超时后仍在发送的消息，下次启动时补记
+    record_delivered(outbox, dedup)
 
     save_sent_ids(updated_sent_ids)
-    print(f"\n✅ 任务完成！已记录论文总数：{len(updated_sent_ids)} 篇。")
+    dedup.save()
+    if cursors is not None:
+        cursors.save()
+    archive.close()
+    print(f"🌐 HTTP 请求：{get_client().summary()}")
+    # 已推送记录按键存储（每篇论文的 ID / DOI / 标题各一个），篇数以本次写入的论文 ID 计
+    print(f"\n✅ 任务完成！本次写入已推送记录 {len(dedup.sent_ids)} 篇论文"
+          f"（记录库共 {len(updated_sent_ids)} 个键：ID / DOI / 标题）。")
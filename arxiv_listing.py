@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+arXiv 分类每日列表（RSS）数据源
+✅ 每个分类一次请求即取得当天全部新投稿，取代逐个关键词的 API 检索
+✅ 交叉投稿在多个分类中只保留一份；默认跳过旧论文的替换版本（replace）
+✅ 主题匹配在本地完成（query_planner.QueryPlan.attribute）
+✅ 设置 ARXIV_LISTING_DIR 后从录制的 <分类>.xml 读取，可完全离线运行
+
+录制当天的列表 / 用录制的样例离线运行：
+    python arxiv_listing.py --record ./listings
+    ARXIV_LISTING_DIR=benchmarks/fixtures/listings python arxiv_listing.py --categories cond-mat.str-el cond-mat.mtrl-sci
+"""
+
+import argparse
+import os
+import re
+import xml.etree.ElementTree as ET
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+from atom_parser import split_arxiv_version
+from fetch_engine import fetch_all
+from http_client import get_client
+from monitor_config import arxiv_categories
+
+LISTING_URL = os.getenv("ARXIV_LISTING_URL", "https://rss.arxiv.org/rss/{category}")
+LISTING_DIR = os.getenv("ARXIV_LISTING_DIR")  # 录制的列表目录，设置后不再联网
+LISTING_MAX_WORKERS = 2
+
+ARXIV_NS = "{http://arxiv.org/schemas/atom}"
+DC_NS = "{http://purl.org/dc/elements/1.1/}"
+NEW_ANNOUNCE_TYPES = ("new", "cross")
+
+_ABSTRACT_RE = re.compile(r"^\s*arXiv:(\S+)\s+Announce Type:\s*(\S+)\s*Abstract:\s*", re.S)
+
+
+def _clean(text):
+    return " ".join((text or "").split())
+
+
+def item_to_paper(item):
+    """把 RSS <item> 转换为与 atom_parser.entry_to_paper 字段一致的论文字典"""
+    link = _clean(item.findtext("link"))
+    description = item.findtext("description") or ""
+    match = _ABSTRACT_RE.match(description)
+    raw_id = match.group(1) if match else link.split("/abs/")[-1]
+    summary = description[match.end():] if match else description
+    arxiv_id, version = split_arxiv_version(raw_id)
+    announce_type = _clean(item.findtext(ARXIV_NS + "announce_type")) or (match.group(2) if match else "new")
+    published = parsedate_to_datetime(_clean(item.findtext("pubDate"))).astimezone(timezone.utc)
+    categories = [_clean(c.text) for c in item.findall("category") if c.text]
+    creators = _clean(item.findtext(DC_NS + "creator"))
+    return {
+        "id": "arxiv:" + arxiv_id,
+        "version": version,
+        "doi": _clean(item.findtext(ARXIV_NS + "DOI")) or None,
+        "title": _clean(item.findtext("title")),
+        "summary": _clean(summary),
+        "link": link,
+        "pdf_url": link.replace("/abs/", "/pdf/") if "/abs/" in link else "",
+        "published": published,
+        "updated": None,
+        "authors": [a.strip() for a in creators.split(",") if a.strip()],
+        "categories": categories,
+        "primary_category": categories[0] if categories else None,
+        "announce_type": announce_type,
+    }
+
+
+def parse_listing_feed(data, include_replacements=False):
+    """解析一个分类的 RSS 列表，返回论文列表"""
+    root = ET.fromstring(data)
+    papers = []
+    for item in root.iter("item"):
+        try:
+            paper = item_to_paper(item)
+        except (TypeError, ValueError, IndexError) as e:
+            print(f"⚠️ 跳过无法解析的列表条目: {e}")
+            continue
+        if include_replacements or paper["announce_type"] in NEW_ANNOUNCE_TYPES:
+            papers.append(paper)
+    return papers
+
+
+def listing_url(category):
+    return LISTING_URL.format(category=category)
+
+
+def read_listing(category, listing_dir=LISTING_DIR):
+    """读取一个分类的列表原文：优先使用录制目录，否则联网（经响应缓存）"""
+    if listing_dir:
+        return (Path(listing_dir) / f"{category}.xml").read_bytes()
+    return get_client().get(listing_url(category), cache_source="arxiv").content
+
+
+def fetch_listings(categories, listing_dir=LISTING_DIR, include_replacements=False,
+                   max_workers=LISTING_MAX_WORKERS):
+    """
+    抓取多个分类的当日列表，返回 (去重后的论文列表, 网络请求数；离线读取时为 0)
+
+    交叉投稿会出现在多个分类中，按首次出现保留。
+    """
+    results = fetch_all(lambda c: read_listing(c, listing_dir), categories, max_workers=max_workers)
+    papers = []
+    seen = set()
+    for result in results:
+        if not result.ok:
+            print(f"    ⚠️ 分类 {result.item} 列表获取失败: {result.error}")
+            continue
+        try:
+            listed = parse_listing_feed(result.value, include_replacements)
+        except ET.ParseError as e:
+            print(f"    ⚠️ 分类 {result.item} 列表无法解析: {e}")
+            continue
+        for p in listed:
+            if p["id"] not in seen:
+                seen.add(p["id"])
+                papers.append(p)
+    return papers, 0 if listing_dir else len(categories)
+
+
+def record_listings(categories, out_dir):
+    """把当天各分类的列表保存到 out_dir/<分类>.xml，供离线运行与测试"""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for category in categories:
+        data = get_client().get(listing_url(category), cache_source="arxiv").content
+        (out_dir / f"{category}.xml").write_bytes(data)
+        print(f"💾 {category}: {len(parse_listing_feed(data, True))} 条 -> {out_dir / f'{category}.xml'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="arXiv 分类每日列表")
+    parser.add_argument("--record", metavar="DIR", help="录制当天的列表到目录")
+    parser.add_argument("--categories", nargs="+", help="分类（默认取 config.yaml）")
+    args = parser.parse_args()
+
+    categories = args.categories or arxiv_categories()
+    if args.record:
+        record_listings(categories, args.record)
+        return
+    papers, requests_made = fetch_listings(categories)
+    print(f"📥 {len(categories)} 个分类，{requests_made} 次请求，共 {len(papers)} 篇新论文")
+    for p in papers:
+        print(f"  {p['id']} [{p['primary_category']}] {p['title'][:70]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+arXiv API 查询构造
+✅ submittedDate 区间下推到服务端，只返回时间窗口内的论文
+✅ cat: 分类限制（默认取 config.yaml 中的 categories）
+✅ 时间边界按天取整，同一天内重复运行得到相同 URL，可命中响应缓存
+
+用法：
+    search_query = build_search_query('abs:"kagome"', since_dt=since, categories=["cond-mat.str-el"])
+    url = arxiv_query_url(search_query, start=0, max_results=100)
+"""
+
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlencode
+
+ARXIV_API_URL = "https://export.arxiv.org/api/query"
+ARXIV_MAX_PAGE_SIZE = 2000  # API 单页上限
+
+
+def format_submitted_date(dt):
+    """arXiv 的 submittedDate 格式：YYYYMMDDHHMM（GMT）"""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc)
+    return dt.strftime("%Y%m%d%H%M")
+
+
+def date_clause(since_dt, until_dt=None):
+    """
+    submittedDate:[起 TO 止]
+
+    起点向下、终点向上取整到 UTC 零点：服务端返回的范围略宽于窗口，
+    精确的 since_dt 截止仍由客户端解析时完成。
+    """
+    since = since_dt.astimezone(timezone.utc) if since_dt.tzinfo else since_dt
+    since = since.replace(hour=0, minute=0, second=0, microsecond=0)
+    until = until_dt or datetime.now(timezone.utc)
+    until = until.astimezone(timezone.utc) if until.tzinfo else until
+    until = until.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    return f"submittedDate:[{format_submitted_date(since)} TO {format_submitted_date(until)}]"
+
+
+def category_clause(categories):
+    categories = [c for c in categories or () if c]
+    if not categories:
+        return None
+    if len(categories) == 1:
+        return f"cat:{categories[0]}"
+    return "(" + " OR ".join(f"cat:{c}" for c in categories) + ")"
+
+
+def build_search_query(query, since_dt=None, until_dt=None, categories=None):
+    """把主题查询与分类、日期限制组合为一个 search_query"""
+    parts = [f"({query})"]
+    cats = category_clause(categories)
+    if cats:
+        parts.append(cats)
+    if since_dt is not None:
+        parts.append(date_clause(since_dt, until_dt))
+    return " AND ".join(parts) if len(parts) > 1 else query
+
+
+def arxiv_query_url(search_query, start=0, max_results=30, sort_by="submittedDate", sort_order="descending"):
+    params = {
+        "search_query": search_query,
+        "start": start,
+        "max_results": min(max_results, ARXIV_MAX_PAGE_SIZE),
+        "sortBy": sort_by,
+        "sortOrder": sort_order,
+    }
+    return f"{ARXIV_API_URL}?{urlencode(params)}"
@@ -3,9 +3,9 @@
 快速arXiv API测试
 """
 
-import urllib.request
-import urllib.error
-import socket
+import requests
+
+from http_client import get_client
 
 def test_arxiv_api():
     """测试arXiv API连接"""
@@ -17,18 +17,13 @@ def test_arxiv_api():
     test_url = "http://export.arxiv.org/api/query?search_query=all:quantum&max_results=1"
     
     try:
-        # 设置超时
-        socket.setdefaulttimeout(10)
-        
-        # 发送请求
-        req = urllib.request.Request(test_url, headers={'User-Agent': 'OpenClaw/1.0'})
-        
         print(f"请求URL: {test_url}")
         print("正在连接...")
         
-        response = urllib.request.urlopen(req)
-        status = response.getcode()
-        content_length = len(response.read())
+        response = get_client().get(test_url, timeout=10)
+        response.raise_for_status()
+        status = response.status_code
+        content_length = len(response.content)
         
         print(f"✅ 连接成功!")
         print(f"状态码: {status}")
@@ -37,12 +32,12 @@ def test_arxiv_api():
         
         return True
         
-    except urllib.error.URLError as e:
-        print(f"❌ URL错误: {e.reason}")
-        return False
-    except socket.timeout:
+    except requests.Timeout:
         print("❌ 连接超时 (10秒)")
         return False
+    except requests.ConnectionError as e:
+        print(f"❌ 连接错误: {e}")
+        return False
     except Exception as e:
         print(f"❌ 其他错误: {e}")
         return False
@@ -61,8 +56,8 @@ def test_network():
     
     for name, url in test_sites:
         try:
-            req = urllib.request.Request(url, headers={'User-Agent': 'OpenClaw/1.0'})
-            response = urllib.request.urlopen(req, timeout=5)
+            response = get_client().get(url, timeout=5)
+            response.raise_for_status()
             print(f"✅ {name}: 可访问")
         except Exception as e:
             print(f"❌ {name}: 不可访问 ({e})")
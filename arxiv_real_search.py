@@ -3,34 +3,26 @@
 真实arXiv搜索脚本
 """
 
-import urllib.request
-import urllib.parse
 import xml.etree.ElementTree as ET
-from datetime import datetime, timedelta
-import time
+from contextlib import closing
+from datetime import datetime, timedelta, timezone
 
-def search_arxiv(keywords, days=7, max_results=10):
+from arxiv_query import arxiv_query_url, build_search_query
+from atom_parser import parse_arxiv_xml
+from http_client import get_client
+from monitor_config import arxiv_categories
+from paper_archive import PaperArchive
+
+OPENSEARCH_NS = "{http://a9.com/-/spec/opensearch/1.1/}"
+
+def search_arxiv(keywords, days=7, max_results=10, categories=None):
     """搜索arXiv文献"""
     
-    # arXiv API基础URL
-    base_url = "http://export.arxiv.org/api/query"
-    
-    # 构建查询 - 最近N天的文献
-    date_cutoff = (datetime.now() - timedelta(days=days)).strftime('%Y%m%d')
-    search_query = f'({keywords}) AND submittedDate:[{date_cutoff}000000 TO *]'
-    
-    # 构建查询参数
-    params = {
-        'search_query': search_query,
-        'start': 0,
-        'max_results': max_results,
-        'sortBy': 'submittedDate',
-        'sortOrder': 'descending'
-    }
-    
-    # 编码URL
-    query_string = urllib.parse.urlencode(params)
-    url = f"{base_url}?{query_string}"
+    # 构建查询 - 最近N天、config.yaml 中分类内的文献
+    since_dt = datetime.now(timezone.utc) - timedelta(days=days)
+    categories = arxiv_categories() if categories is None else categories
+    search_query = build_search_query(keywords, since_dt, categories=categories)
+    url = arxiv_query_url(search_query, max_results=max_results)
     
     print(f"搜索关键词: {keywords}")
     print(f"时间范围: 最近{days}天")
@@ -39,76 +31,16 @@ def search_arxiv(keywords, days=7, max_results=10):
     
     try:
         # 发送请求
-        req = urllib.request.Request(url, headers={'User-Agent': 'OpenClaw/1.0'})
-        response = urllib.request.urlopen(req, timeout=30)
-        xml_data = response.read().decode('utf-8')
+        response = get_client().get(url, cache_source="arxiv", timeout=30)
         
-        # 解析XML
-        root = ET.fromstring(xml_data)
-        
-        # Atom命名空间
-        ns = {'atom': 'http://www.w3.org/2005/Atom'}
-        
-        # 获取总结果数
-        total_results = root.find('atom:opensearch:totalResults', ns)
+        # 解析XML（与日报相同的论文字典，可直接写入论文库）
+        root = ET.fromstring(response.content)
+        total_results = root.find(OPENSEARCH_NS + 'totalResults')
         total = int(total_results.text) if total_results is not None else 0
         
         print(f"找到文献: {total} 篇")
         
-        # 解析条目
-        entries = root.findall('atom:entry', ns)
-        results = []
-        
-        for i, entry in enumerate(entries[:max_results]):
-            # 提取标题
-            title_elem = entry.find('atom:title', ns)
-            title = title_elem.text.strip() if title_elem is not None else "无标题"
-            
-            # 提取作者
-            authors = []
-            for author in entry.findall('atom:author', ns):
-                name_elem = author.find('atom:name', ns)
-                if name_elem is not None:
-                    authors.append(name_elem.text)
-            
-            # 提取摘要
-            summary_elem = entry.find('atom:summary', ns)
-            summary = summary_elem.text.strip() if summary_elem is not None else "无摘要"
-            
-            # 提取发布时间
-            published_elem = entry.find('atom:published', ns)
-            published = published_elem.text[:10] if published_elem is not None else "未知"
-            
-            # 提取arXiv ID
-            id_elem = entry.find('atom:id', ns)
-            arxiv_id = id_elem.text if id_elem is not None else ""
-            
-            # 提取PDF链接
-            pdf_link = ""
-            for link in entry.findall('atom:link', ns):
-                if link.get('title') == 'pdf':
-                    pdf_link = link.get('href')
-                    break
-            
-            # 提取分类
-            categories = []
-            for category in entry.findall('atom:category', ns):
-                cat_term = category.get('term', '')
-                if cat_term:
-                    categories.append(cat_term)
-            
-            # 构建结果
-            result = {
-                'index': i + 1,
-                'title': title,
-                'authors': authors,
-                'published': published,
-                'arxiv_id': arxiv_id,
-                'pdf_link': pdf_link,
-                'summary': summary,
-                'categories': categories[:3]  # 只显示前3个分类
-            }
-            results.append(result)
+        results = parse_arxiv_xml(response.content, None)[:max_results]
         
         return results, total
         
@@ -126,8 +58,8 @@ def format_results(results, keyword):
     output.append(f"## 🔍 关键词: {keyword}")
     output.append("")
     
-    for result in results:
-        output.append(f"### {result['index']}. {result['title']}")
+    for index, result in enumerate(results, 1):
+        output.append(f"### {index}. {result['title']}")
         output.append("")
         
         # 作者信息
@@ -137,15 +69,15 @@ def format_results(results, keyword):
         output.append(f"**作者**: {authors_display}")
         
         # 发布时间和分类
-        output.append(f"**发布时间**: {result['published']}")
+        output.append(f"**发布时间**: {result['published']:%Y-%m-%d}")
         if result['categories']:
-            output.append(f"**分类**: {', '.join(result['categories'])}")
+            output.append(f"**分类**: {', '.join(result['categories'][:3])}")
         
         # 链接
-        if result['arxiv_id']:
-            output.append(f"**arXiv链接**: {result['arxiv_id']}")
-        if result['pdf_link']:
-            output.append(f"**PDF下载**: {result['pdf_link']}")
+        if result['link']:
+            output.append(f"**arXiv链接**: {result['link']}")
+        if result['pdf_url']:
+            output.append(f"**PDF下载**: {result['pdf_url']}")
         
         # 摘要
         summary_preview = result['summary'][:300] + "..." if len(result['summary']) > 300 else result['summary']
@@ -174,6 +106,7 @@ def main():
     ]
     
     all_results = []
+    all_papers = []
     
     for keyword in keywords_list:
         print(f"\n搜索: {keyword}")
@@ -184,14 +117,15 @@ def main():
         if results:
             formatted = format_results(results, keyword)
             all_results.append(formatted)
+            all_papers.extend(results)
             
             # 显示简要信息
             print(f"找到 {len(results)} 篇文献:")
-            for result in results:
-                print(f"  {result['index']}. {result['title'][:60]}...")
-        
-        # 添加延迟，避免请求过快
-        time.sleep(2)
+            for index, result in enumerate(results, 1):
+                print(f"  {index}. {result['title'][:60]}...")
+    
+    # 请求节奏由 http_client 按 arXiv 限速自动控制
+    print(f"\n🌐 HTTP 请求：{get_client().summary()}")
     
     # 生成完整报告
     if all_results:
@@ -199,6 +133,7 @@ def main():
         print("生成完整报告...")
         print("=" * 80)
         
+        results_text = "\n\n".join(all_results)
         report = f"""# 📚 arXiv文献搜索报告
 
 **报告时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
@@ -207,7 +142,7 @@ def main():
 
 ---
 
-{'\n\n'.join(all_results)}
+{results_text}
 
 ---
 
@@ -223,16 +158,11 @@ def main():
 *数据来源: arXiv.org - 康奈尔大学*
 """
         
-        # 保存报告
-        import os
-        os.makedirs('./reports', exist_ok=True)
-        filename = f"arxiv_real_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md"
-        filepath = os.path.join('./reports', filename)
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(report)
+        # 论文写入本地论文库（日报、检索与重新发送共用），报告只输出到终端
+        with closing(PaperArchive()) as archive:
+            count = archive.upsert_papers(all_papers)
         
-        print(f"\n✅ 报告已保存: {filepath}")
+        print(f"\n🗄️ 已写入论文库: {archive.path}（{count} 篇）")
         print(f"📄 报告大小: {len(report)} 字符")
         
         # 显示报告摘要
@@ -242,10 +172,10 @@ def main():
         for i in range(min(20, len(lines))):
             print(lines[i])
         
-        return report, filepath
+        return report
     else:
         print("\n⚠️ 未找到任何文献")
-        return None, None
+        return None
 
 if __name__ == "__main__":
-    report, filepath = main()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -3,11 +3,11 @@
 真实arXiv API测试脚本
 """
 
-import urllib.request
-import urllib.parse
 import xml.etree.ElementTree as ET
 from datetime import datetime
-import time
+from urllib.parse import urlencode
+
+from http_client import get_client
 
 def search_arxiv_real(query, max_results=5):
     """使用真实arXiv API搜索"""
@@ -25,8 +25,7 @@ def search_arxiv_real(query, max_results=5):
     }
     
     # 编码URL
-    query_string = urllib.parse.urlencode(params)
-    url = f"{base_url}?{query_string}"
+    url = f"{base_url}?{urlencode(params)}"
     
     print(f"正在搜索: {query}")
     print(f"API URL: {url}")
@@ -34,9 +33,9 @@ def search_arxiv_real(query, max_results=5):
     
     try:
         # 发送请求
-        req = urllib.request.Request(url, headers={'User-Agent': 'OpenClaw/1.0'})
-        response = urllib.request.urlopen(req, timeout=30)
-        xml_data = response.read().decode('utf-8')
+        response = get_client().get(url, timeout=30)
+        response.raise_for_status()
+        xml_data = response.content.decode('utf-8')
         
         # 解析XML
         root = ET.fromstring(xml_data)
@@ -138,9 +137,6 @@ def main():
         
         if not results:
             print("⚠️ 未找到结果或API请求失败")
-        
-        # 添加延迟，避免请求过快
-        time.sleep(2)
     
     print(f"\n{'='*60}")
     print("测试完成")
@@ -5,21 +5,27 @@ arXiv文献搜索脚本
 """
 
 import argparse
-import requests
-import feedparser
-from datetime import datetime, timedelta
+from contextlib import closing
+from datetime import datetime, timedelta, timezone
 import json
 import time
 import sys
 import os
 
+from arxiv_query import ARXIV_API_URL, build_search_query
+from atom_parser import parse_arxiv_xml
+from http_client import get_client
+from keyword_matcher import KeywordMatcher
+from monitor_config import arxiv_categories
+from paper_archive import PaperArchive
+
 def setup_encoding():
     """设置编码以支持中文"""
     import io
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
-def search_arxiv(keywords, max_results=10, days_back=1):
+def search_arxiv(keywords, max_results=10, days_back=1, categories=None):
     """
     搜索arXiv文献
     
@@ -27,24 +33,20 @@ def search_arxiv(keywords, max_results=10, days_back=1):
         keywords: 搜索关键词列表
         max_results: 最大返回结果数
         days_back: 搜索过去多少天的文献
+        categories: 限制的arXiv分类（默认取 config.yaml）
     
     Returns:
         文献列表
     """
-    # arXiv API URL
-    base_url = "http://export.arxiv.org/api/query"
-    
     # 构建搜索查询
     query_parts = []
     for keyword in keywords:
         query_parts.append(f'all:"{keyword}"')
     
-    query = " OR ".join(query_parts)
-    
-    # 日期过滤
-    if days_back > 0:
-        start_date = (datetime.now() - timedelta(days=days_back)).strftime("%Y%m%d")
-        query += f" AND submittedDate:[{start_date}000000 TO *]"
+    # 日期与分类过滤
+    since_dt = datetime.now(timezone.utc) - timedelta(days=days_back) if days_back > 0 else None
+    categories = arxiv_categories() if categories is None else categories
+    query = build_search_query(" OR ".join(query_parts), since_dt, categories=categories)
     
     # 请求参数
     params = {
@@ -59,35 +61,10 @@ def search_arxiv(keywords, max_results=10, days_back=1):
         print(f"🔍 搜索arXiv: {query}")
         print(f"📅 时间范围: 最近{days_back}天")
         
-        response = requests.get(base_url, params=params)
-        response.raise_for_status()
+        response = get_client().get(ARXIV_API_URL, params=params, cache_source="arxiv", timeout=30)
         
-        # 解析Atom feed
-        feed = feedparser.parse(response.content)
-        
-        papers = []
-        for entry in feed.entries:
-            paper = {
-                'id': entry.id.split('/')[-1],
-                'title': entry.title.replace('\n', ' ').strip(),
-                'summary': entry.summary.replace('\n', ' ').strip()[:500] + "...",
-                'authors': [author.name for author in entry.authors],
-                'published': entry.published,
-                'updated': entry.updated,
-                'pdf_url': None,
-                'arxiv_url': None,
-                'categories': [tag.term for tag in entry.tags],
-                'primary_category': entry.arxiv_primary_category['term'] if hasattr(entry, 'arxiv_primary_category') else None
-            }
-            
-            # 查找PDF链接
-            for link in entry.links:
-                if link.rel == 'alternate' and link.type == 'text/html':
-                    paper['arxiv_url'] = link.href
-                elif link.title == 'pdf':
-                    paper['pdf_url'] = link.href
-            
-            papers.append(paper)
+        # 解析Atom feed（与日报相同的论文字典，可直接写入论文库）
+        papers = parse_arxiv_xml(response.content, None)
         
         return papers
     
@@ -96,23 +73,23 @@ def search_arxiv(keywords, max_results=10, days_back=1):
         return []
 
 def filter_by_keywords(papers, keywords):
-    """根据关键词过滤文献"""
+    """根据关键词过滤文献（整词、忽略大小写、允许复数词尾），记录全部命中的关键词"""
+    matcher = KeywordMatcher(keywords, plural=True)
     filtered = []
     for paper in papers:
-        # 检查标题和摘要中是否包含关键词
-        text = (paper['title'] + ' ' + paper['summary']).lower()
-        for keyword in keywords:
-            if keyword.lower() in text:
-                paper['matched_keyword'] = keyword
-                filtered.append(paper)
-                break
+        # 标题和摘要一次扫描得到全部命中
+        matched = matcher.matched(paper['title'] + ' ' + paper['summary'])
+        if matched:
+            paper['matched_keyword'] = matched[0]
+            paper['matched_keywords'] = matched
+            filtered.append(paper)
     
     return filtered
 
 def format_output(papers, output_format='text'):
     """格式化输出"""
     if output_format == 'json':
-        return json.dumps(papers, ensure_ascii=False, indent=2)
+        return json.dumps(papers, ensure_ascii=False, indent=2, default=str)
     
     elif output_format == 'text':
         output = []
@@ -127,9 +104,9 @@ def format_output(papers, output_format='text'):
             output.append(f"   📅 发布时间: {paper['published']}")
             output.append(f"   🏷️ 分类: {', '.join(paper['categories'][:3])}")
             if 'matched_keyword' in paper:
-                output.append(f"   🔍 匹配关键词: {paper['matched_keyword']}")
+                output.append(f"   🔍 匹配关键词: {', '.join(paper.get('matched_keywords', [paper['matched_keyword']]))}")
             output.append(f"   📄 PDF: {paper['pdf_url']}")
-            output.append(f"   🌐 arXiv: {paper['arxiv_url']}")
+            output.append(f"   🌐 arXiv: {paper['link']}")
             output.append(f"   📝 摘要: {paper['summary'][:300]}...")
         
         return '\n'.join(output)
@@ -150,9 +127,10 @@ def format_output(papers, output_format='text'):
             output.append(f"**发布时间**: {paper['published']}  ")
             output.append(f"**分类**: {', '.join(paper['categories'][:3])}  ")
             if 'matched_keyword' in paper:
-                output.append(f"**匹配关键词**: `{paper['matched_keyword']}`  ")
+                keywords = paper.get('matched_keywords', [paper['matched_keyword']])
+                output.append(f"**匹配关键词**: {', '.join(f'`{k}`' for k in keywords)}  ")
             output.append(f"**PDF**: [下载链接]({paper['pdf_url']})  ")
-            output.append(f"**arXiv**: [查看页面]({paper['arxiv_url']})  ")
+            output.append(f"**arXiv**: [查看页面]({paper['link']})  ")
             output.append("")
             output.append(f"**摘要**:")
             output.append(f"> {paper['summary']}")
@@ -207,14 +185,11 @@ def main():
     output = format_output(papers, args.output)
     print(output)
     
-    # 保存到文件
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"arxiv_results_{timestamp}.{args.output if args.output != 'markdown' else 'md'}"
-    
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write(output)
+    # 写入本地论文库（日报、检索与重新发送共用）
+    with closing(PaperArchive()) as archive:
+        count = archive.upsert_papers(papers)
     
-    print(f"\n💾 结果已保存到: {filename}")
+    print(f"\n🗄️ 已写入论文库: {archive.path}（{count} 篇）")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+arXiv Atom 流式解析器
+✅ 基于 XMLPullParser，边接收字节边产出条目
+✅ 结果按 submittedDate 降序，越过 since_dt 后立即停止读取
+✅ 正确处理属性、CDATA 与实体转义
+"""
+
+import re
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+ARXIV_NS = "{http://arxiv.org/schemas/atom}"
+ENTRY_TAG = ATOM_NS + "entry"
+
+_VERSION_RE = re.compile(r"v(\d+)$")
+
+
+def _text(elem, tag):
+    child = elem.find(tag)
+    if child is None or child.text is None:
+        return ""
+    # 标题和摘要中常有换行与多余空白
+    return " ".join(child.text.split())
+
+
+def split_arxiv_version(arxiv_id):
+    """'2401.01234v2' -> ('2401.01234', 2)；没有版本号时返回 (arxiv_id, None)"""
+    m = _VERSION_RE.search(arxiv_id)
+    if not m:
+        return arxiv_id, None
+    return arxiv_id[:m.start()], int(m.group(1))
+
+
+def parse_atom_datetime(value):
+    """解析 Atom 时间戳（如 2024-01-02T03:04:05Z），统一为 UTC"""
+    return datetime.strptime(value.strip()[:19], "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc)
+
+
+def entry_to_paper(entry):
+    """把一个 <entry> 元素转换为论文字典"""
+    link = ""
+    pdf_url = ""
+    for link_elem in entry.findall(ATOM_NS + "link"):
+        if link_elem.get("rel") == "alternate":
+            link = link_elem.get("href", "")
+        elif link_elem.get("title") == "pdf":
+            pdf_url = link_elem.get("href", "")
+    entry_id = _text(entry, ATOM_NS + "id")
+    if not link:
+        link = entry_id
+    primary = entry.find(ARXIV_NS + "primary_category")
+    updated = _text(entry, ATOM_NS + "updated")
+    arxiv_id, version = split_arxiv_version(link.split("/abs/")[-1])
+    return {
+        "id": "arxiv:" + arxiv_id,
+        "version": version,
+        "doi": _text(entry, ARXIV_NS + "doi") or None,
+        "title": _text(entry, ATOM_NS + "title"),
+        "summary": _text(entry, ATOM_NS + "summary"),
+        "link": link,
+        "pdf_url": pdf_url,
+        "published": parse_atom_datetime(_text(entry, ATOM_NS + "published")),
+        "updated": parse_atom_datetime(updated) if updated else None,
+        "authors": [_text(a, ATOM_NS + "name") for a in entry.findall(ATOM_NS + "author")],
+        "categories": [c.get("term") for c in entry.findall(ATOM_NS + "category") if c.get("term")],
+        "primary_category": primary.get("term") if primary is not None else None,
+    }
+
+
+def iter_arxiv_entries(chunks, since_dt=None):
+    """
+    从字节（或字符串）块序列中增量解析 arXiv Atom 条目
+
+    Args:
+        chunks: 可迭代的数据块，例如 response.iter_content()
+        since_dt: 截止时间；遇到早于它的条目即停止，不再读取剩余数据
+
+    Yields:
+        论文字典，字段见 entry_to_paper
+    """
+    parser = ET.XMLPullParser(events=("end",))
+    for chunk in chunks:
+        parser.feed(chunk)
+        for _event, elem in parser.read_events():
+            if elem.tag != ENTRY_TAG:
+                continue
+            try:
+                paper = entry_to_paper(elem)
+            except (ValueError, IndexError) as e:
+                print(f"⚠️ 跳过无法解析的条目: {e}")
+                continue
+            finally:
+                # 释放已处理条目，内存占用与文档大小无关
+                elem.clear()
+            if since_dt is not None and paper["published"] < since_dt:
+                return
+            yield paper
+    parser.close()
+
+
+def parse_arxiv_xml(xml_text, since_dt):
+    """解析完整的 Atom 文本，返回 since_dt 之后的论文列表"""
+    return list(iter_arxiv_entries([xml_text], since_dt))
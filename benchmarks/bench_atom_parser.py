@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Atom 解析器微基准
+对比旧版基于 str.split 的 parse_arxiv_xml 与流式 iter_arxiv_entries
+
+用法:
+    python benchmarks/bench_atom_parser.py                  # 使用合成的大型 feed
+    python benchmarks/bench_atom_parser.py feed1.xml ...    # 使用录制的 arXiv 响应
+"""
+
+import argparse
+import sys
+import timeit
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from atom_parser import iter_arxiv_entries, parse_atom_datetime  # noqa: E402
+
+
+def legacy_parse_arxiv_xml(xml_text, since_dt):
+    """arxiv_daily_report.py 中原有的实现，保留用于对比"""
+    entries = []
+    for entry in xml_text.split("<entry>")[1:]:
+        try:
+            title = entry.split("<title>")[1].split("</title>")[0].strip()
+            summary = entry.split("<summary>")[1].split("</summary>")[0].strip()
+            link = entry.split('<link href="')[1].split('"')[0]
+            paper_id = "arxiv:" + link.split("/abs/")[-1]
+            published = entry.split("<published>")[1].split("</published>")[0]
+            pub_dt = datetime.strptime(published[:19], "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc)
+            if pub_dt >= since_dt:
+                entries.append({"id": paper_id, "title": title, "summary": summary, "link": link})
+        except:
+            continue
+    return entries
+
+
+ENTRY_TEMPLATE = """  <entry>
+    <id>http://arxiv.org/abs/2409.{num:05d}v1</id>
+    <updated>{date}</updated>
+    <published>{date}</published>
+    <title>Kagome lattice magnetism in sample {num} grown by chemical vapor transport</title>
+    <summary>  We report single crystals of a kagome antiferromagnet synthesised by solid state
+  reaction and CVT. Specific heat, magnetisation &amp; neutron scattering reveal a
+  quantum spin liquid candidate ground state below 2 K. {padding}</summary>
+    <author><name>A. Author</name></author>
+    <author><name>B. Author</name></author>
+    <arxiv:comment xmlns:arxiv="http://arxiv.org/schemas/atom">10 pages, 4 figures</arxiv:comment>
+    <link href="http://arxiv.org/abs/2409.{num:05d}v1" rel="alternate" type="text/html"/>
+    <link title="pdf" href="http://arxiv.org/pdf/2409.{num:05d}v1" rel="related" type="application/pdf"/>
+    <arxiv:primary_category xmlns:arxiv="http://arxiv.org/schemas/atom" term="cond-mat.str-el" scheme="http://arxiv.org/schemas/atom"/>
+    <category term="cond-mat.str-el" scheme="http://arxiv.org/schemas/atom"/>
+  </entry>
+"""
+
+
+def synthetic_feed(n_entries, start):
+    """生成按 published 降序排列、每条间隔 1 小时的 feed"""
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>\n<feed xmlns="http://www.w3.org/2005/Atom">\n']
+    for i in range(n_entries):
+        date = (start - timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        parts.append(ENTRY_TEMPLATE.format(num=i, date=date, padding="x" * 400))
+    parts.append("</feed>\n")
+    return "".join(parts)
+
+
+def feed_start(xml_text):
+    """取 feed 中最新条目的时间，便于构造截止时间"""
+    for paper in iter_arxiv_entries([xml_text]):
+        return paper["published"]
+    return datetime.now(timezone.utc)
+
+
+def bench(name, func, repeat):
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    print(f"  {name:<28} {best * 1000:9.2f} ms")
+    return best
+
+
+def run(label, xml_text, repeat):
+    start = feed_start(xml_text)
+    oldest = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    cutoff = start - timedelta(hours=24)
+    data = xml_text.encode("utf-8")
+    chunks = [data[i:i + 8192] for i in range(0, len(data), 8192)]
+
+    n_legacy = len(legacy_parse_arxiv_xml(xml_text, oldest))
+    n_stream = sum(1 for _ in iter_arxiv_entries(chunks, oldest))
+    n_cutoff = sum(1 for _ in iter_arxiv_entries(chunks, cutoff))
+    print(f"\n📄 {label}: {len(data) / 1024:.0f} KiB，条目 旧版={n_legacy} 流式={n_stream} 截止24h={n_cutoff}")
+
+    legacy = bench("legacy split（全部）", lambda: legacy_parse_arxiv_xml(xml_text, oldest), repeat)
+    stream = bench("iter_arxiv_entries（全部）", lambda: list(iter_arxiv_entries(chunks, oldest)), repeat)
+    early = bench("iter_arxiv_entries（24h截止）", lambda: list(iter_arxiv_entries(chunks, cutoff)), repeat)
+    print(f"  全量解析 流式/旧版 = {stream / legacy:.2f}x，提前截止 旧版/流式 = {legacy / early:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Atom 解析器微基准")
+    parser.add_argument("feeds", nargs="*", help="录制的 arXiv API 响应文件")
+    parser.add_argument("--entries", type=int, default=2000, help="合成 feed 的条目数 (默认: 2000)")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数 (默认: 5)")
+    args = parser.parse_args()
+
+    if args.feeds:
+        for path in args.feeds:
+            run(path, Path(path).read_text(encoding="utf-8"), args.repeat)
+    else:
+        run(f"合成 feed ({args.entries} 条)", synthetic_feed(args.entries, parse_atom_datetime("2024-09-30T12:00:00Z")), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
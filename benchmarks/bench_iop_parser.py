@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+IOP nsearch 结果页解析微基准
+对比 BeautifulSoup(html.parser) 与 lxml + 预编译 XPath，以及按 .pub-date 提前截止的效果
+
+用法:
+    python benchmarks/bench_iop_parser.py                   # 使用 benchmarks/fixtures 下保存的结果页
+    python benchmarks/bench_iop_parser.py page1.html ...    # 使用自行保存的 nsearch 结果页
+"""
+
+import argparse
+import sys
+import timeit
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from iop_source import parse_iop_results  # noqa: E402
+
+FIXTURE_DIR = Path(__file__).resolve().parent / "fixtures"
+
+
+def bench(name, func, repeat):
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    print(f"  {name:<30} {best * 1000:9.2f} ms")
+    return best
+
+
+def run(label, page, repeat):
+    oldest = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    papers = parse_iop_results(page, oldest, use_lxml=True)[0]
+    if not papers:
+        print(f"\n📄 {label}: 未解析到条目，跳过")
+        return
+    # 截止时间取最新一条之前 7 天，模拟日常增量
+    cutoff = papers[0]["published"] - timedelta(days=7)
+    n_bs4 = len(parse_iop_results(page, oldest, use_lxml=False)[0])
+    n_cutoff = len(parse_iop_results(page, cutoff, use_lxml=True)[0])
+    print(f"\n📄 {label}: {len(page) / 1024:.0f} KiB，条目 bs4={n_bs4} lxml={len(papers)} 截止7天={n_cutoff}")
+
+    soup = bench("bs4 html.parser（全部）", lambda: parse_iop_results(page, oldest, use_lxml=False), repeat)
+    lxml = bench("lxml XPath（全部）", lambda: parse_iop_results(page, oldest, use_lxml=True), repeat)
+    early = bench("lxml XPath（7天截止）", lambda: parse_iop_results(page, cutoff, use_lxml=True), repeat)
+    print(f"  bs4/lxml = {soup / lxml:.1f}x，bs4/lxml截止 = {soup / early:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IOP 结果页解析微基准")
+    parser.add_argument("pages", nargs="*", help="保存的 nsearch 结果页 HTML")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数 (默认: 5)")
+    args = parser.parse_args()
+
+    paths = [Path(p) for p in args.pages] or sorted(FIXTURE_DIR.glob("iop_nsearch_*.html"))
+    for path in paths:
+        run(path.name, path.read_bytes(), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多关键词匹配基准
+对比逐个关键词 `keyword in text`（旧 filter_by_keywords）、普通正则并集与字典树匹配器
+
+用法:
+    python benchmarks/bench_keyword_matcher.py
+    python benchmarks/bench_keyword_matcher.py --extra-terms 1000
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from keyword_matcher import KeywordMatcher  # noqa: E402
+from monitor_config import load_config  # noqa: E402
+
+
+def synthetic_abstracts(n, keywords, seed=11):
+    rng = random.Random(seed)
+    filler = [f"w{i}" for i in range(5000)] + ["spin", "quantum", "magnetic", "coupling", "liquid"]
+    texts = []
+    for i in range(n):
+        words = rng.choices(filler, k=rng.randint(150, 250))
+        if i % 5 == 0:
+            words.insert(rng.randrange(len(words)), rng.choice(keywords))
+        texts.append(" ".join(words))
+    return texts
+
+
+def bench(name, func, texts):
+    started = time.perf_counter()
+    hits = sum(1 for text in texts if func(text))
+    print(f"  {name:<28} {(time.perf_counter() - started) * 1000:8.1f} ms  命中 {hits} 篇")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多关键词匹配基准")
+    parser.add_argument("--papers", type=int, default=3000, help="摘要数 (默认: 3000)")
+    parser.add_argument("--extra-terms", type=int, default=500, help="额外的主题词数 (默认: 500)")
+    args = parser.parse_args()
+
+    base = (load_config().get("arxiv_monitor") or {}).get("keywords") or ["quantum spin liquid", "multiferroic"]
+    texts = synthetic_abstracts(args.papers, base)
+    for keywords in (base, base + [f"term{i} phrase{i}" for i in range(args.extra_terms)]):
+        print(f"\n🔑 {len(keywords)} 个关键词，{len(texts)} 篇摘要")
+        lowered = [k.lower() for k in keywords]
+        bench("逐个 keyword in text", lambda t: any(k in t.lower() for k in lowered), texts)
+        union = re.compile(r"\b(?:" + "|".join(map(re.escape, keywords)) + r")\b", re.I)
+        bench("正则并集 re.I", union.search, texts)
+        matcher = KeywordMatcher(keywords, plural=True)
+        bench("KeywordMatcher（全部命中）", matcher.find_all, texts)
+
+
+if __name__ == "__main__":
+    main()
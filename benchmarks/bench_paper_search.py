@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地论文库 FTS5 检索延迟基准
+生成多年规模的合成 cond-mat 论文库（默认 20 万篇），测量常见查询的延迟
+
+用法:
+    python benchmarks/bench_paper_search.py                      # 在临时目录生成合成论文库
+    python benchmarks/bench_paper_search.py --db papers.sqlite3  # 使用已有论文库（不写入）
+"""
+
+import argparse
+import itertools
+import random
+import sys
+import tempfile
+import time
+import timeit
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from paper_archive import PaperArchive  # noqa: E402
+from paper_search import parse_search_query  # noqa: E402
+
+QUERIES = [
+    "Na2Co2TeO6",
+    'abs:"spin liquid"',
+    'ti:kagome abs:"anomalous hall"',
+    "au:Balents",
+    "abs:kitaev OR abs:honeycomb",
+    "ti:supercond*",
+]
+
+# 领域词按真实摘要中的量级稀疏出现；其余为 Zipf 分布的填充词
+TOPIC_TERMS = (
+    "kagome honeycomb pyrochlore spin_liquid anomalous_hall kitaev superconductivity nematic charge_density_wave "
+    "neutron_scattering thermal_hall sintering hydrothermal dmft moire Na2Co2TeO6 RuCl3 Fe3GeTe2 CsV3Sb5 YbMgGaO4"
+).split()
+SURNAMES = "Balents Kitaev Wen Sachdev Senthil Kivelson Fu Vishwanath Zhang Wang Li Chen Liu Yang Huang".split()
+
+
+def synthetic_papers(n, seed=1, vocab_size=30000):
+    rng = random.Random(seed)
+    filler = [f"w{i}" for i in range(vocab_size)]
+    cum = list(itertools.accumulate(1 / (i + 1) for i in range(vocab_size)))
+    surnames = SURNAMES + [f"Author{i}" for i in range(20000)]
+    start = datetime(2019, 1, 1, tzinfo=timezone.utc)
+    for i in range(n):
+        topics = [t.replace("_", " ") for t in TOPIC_TERMS if rng.random() < 0.02]
+        title = rng.choices(filler, cum_weights=cum, k=rng.randint(6, 12)) + topics[:2]
+        summary = rng.choices(filler, cum_weights=cum, k=rng.randint(120, 200)) + topics * 2
+        rng.shuffle(summary)
+        yield {
+            "id": f"arxiv:synthetic.{i:07d}",
+            "title": " ".join(title),
+            "summary": " ".join(summary),
+            "authors": [f"{chr(65 + rng.randrange(26))}. {rng.choice(surnames)}" for _ in range(rng.randint(1, 8))],
+            "categories": ["cond-mat.str-el"],
+            "published": start + timedelta(minutes=i * 7),
+            "source": "arxiv",
+        }
+
+
+def bench(archive, query, since, repeat):
+    match = parse_search_query(query)
+    hits = archive.search(match, since=since, limit=20)
+    timer = timeit.Timer(lambda: archive.search(match, since=since, limit=20))
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    window = "近一季度" if since else "全部"
+    print(f"  {query:<34} {window:<6} {len(hits):>3} 条  {best * 1000:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="论文库 FTS5 检索延迟基准")
+    parser.add_argument("--db", help="已有的论文库（不指定则生成合成库）")
+    parser.add_argument("--papers", type=int, default=200_000, help="合成论文数 (默认: 200000)")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数 (默认: 5)")
+    args = parser.parse_args()
+
+    tmp = None
+    if args.db:
+        archive = PaperArchive(args.db)
+    else:
+        tmp = tempfile.TemporaryDirectory()
+        archive = PaperArchive(Path(tmp.name) / "bench.sqlite3")
+        started = time.perf_counter()
+        archive.upsert_papers(synthetic_papers(args.papers), batch_size=5000)
+        print(f"🏗️ 合成论文库 {args.papers} 篇，写入并建索引 {time.perf_counter() - started:.1f} s")
+
+    latest = archive._db.execute("SELECT MAX(published) FROM papers").fetchone()[0]
+    quarter = datetime.fromisoformat(latest) - timedelta(days=90) if latest else None
+    print(f"📚 {archive.stats()['papers']} 篇")
+    for query in QUERIES:
+        bench(archive, query, None, args.repeat)
+        bench(archive, query, quarter, args.repeat)
+    archive.close()
+    if tmp:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+相似论文推荐基准
+合成论文库后测量：全量建索引、增量追加、画像计算，以及最近一周候选的批量打分耗时
+
+用法:
+    python benchmarks/bench_recommender.py
+    python benchmarks/bench_recommender.py --papers 100000 --users 20
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_paper_search import synthetic_papers  # noqa: E402
+from paper_archive import PaperArchive  # noqa: E402
+from recommender import Recommender, SparseIndex  # noqa: E402
+
+WEEK = 7 * 24 * 60 // 7  # 合成论文每 7 分钟一篇，一周的篇数
+
+
+def main():
+    parser = argparse.ArgumentParser(description="相似论文推荐基准")
+    parser.add_argument("--papers", type=int, default=20_000, help="合成论文数 (默认: 20000)")
+    parser.add_argument("--users", type=int, default=10, help="用户数 (默认: 10)")
+    parser.add_argument("--stars", type=int, default=30, help="每位用户的收藏篇数 (默认: 30)")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数 (默认: 5)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = PaperArchive(Path(tmp) / "bench.sqlite3")
+        papers = list(synthetic_papers(args.papers))
+        head = args.papers - args.papers // 10
+        archive.upsert_papers(papers[:head], batch_size=5000)
+
+        index = SparseIndex(Path(tmp) / "index")
+        started = time.perf_counter()
+        added = index.update(archive)
+        print(f"🏗️ 全量建索引 {added} 篇：{time.perf_counter() - started:.2f} s，非零元 {index.nnz}")
+        archive.upsert_papers(papers[head:], batch_size=5000)
+        started = time.perf_counter()
+        added = index.update(archive)
+        print(f"➕ 增量追加 {added} 篇：{time.perf_counter() - started:.2f} s")
+
+        rng = random.Random(3)
+        stars = {f"user{u}": [p["id"] for p in rng.sample(papers[:head], args.stars)] for u in range(args.users)}
+        started = time.perf_counter()
+        recommender = Recommender(index, stars)
+        print(f"👤 {args.users} 位用户画像：{(time.perf_counter() - started) * 1000:.1f} ms")
+
+        pool = papers[-WEEK:]
+        best = min(timeit.repeat(lambda: recommender.recommend(pool, k=3), number=1, repeat=args.repeat))
+        print(f"⭐ 最近一周 {len(pool)} 篇候选 × {args.users} 位用户：{best * 1000:.1f} ms")
+        archive.close()
+
+
+if __name__ == "__main__":
+    main()
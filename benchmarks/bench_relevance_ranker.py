@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+主题候选池相关度排序基准
+合成数千篇候选，分别测量首次打分（含分词）与分词缓存命中后的打分耗时
+
+用法:
+    python benchmarks/bench_relevance_ranker.py
+    python benchmarks/bench_relevance_ranker.py --papers 5000
+"""
+
+import argparse
+import random
+import sys
+import time
+import timeit
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from relevance_ranker import RelevanceRanker  # noqa: E402
+
+QUERIES = ['abs:"quantum spin liquid"', 'abs:"QSL" abs:"frustrated magnet"', 'abs:"spin liquid" abs:"geometric frustration"']
+PHRASES = ["quantum spin liquid", "frustrated magnet", "geometric frustration", "magnetoelectric coupling",
+           "review", "tutorial", "kagome", "QSL"]
+
+
+def synthetic_papers(n, seed=7):
+    rng = random.Random(seed)
+    filler = [f"w{i}" for i in range(5000)]
+    now = datetime.now(timezone.utc)
+    papers = []
+    for i in range(n):
+        words = rng.choices(filler, k=rng.randint(120, 220)) + rng.sample(PHRASES, 3)
+        rng.shuffle(words)
+        papers.append({
+            "id": f"arxiv:bench.{i:05d}",
+            "title": " ".join(rng.choices(filler, k=8) + rng.sample(PHRASES, 1)),
+            "summary": " ".join(words),
+            "published": now - timedelta(hours=rng.uniform(0, 90 * 24)),
+        })
+    return papers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="相关度排序基准")
+    parser.add_argument("--papers", type=int, default=3000, help="候选数 (默认: 3000)")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数 (默认: 5)")
+    args = parser.parse_args()
+
+    papers = synthetic_papers(args.papers)
+    ranker = RelevanceRanker(["magnetoelectric coupling", "quantum spin liquid"], ["review", "tutorial"])
+    started = time.perf_counter()
+    top = ranker.rank(papers, QUERIES)[:5]
+    print(f"📐 {len(papers)} 篇候选，首次打分（含分词）{(time.perf_counter() - started) * 1000:.1f} ms")
+
+    timer = timeit.Timer(lambda: ranker.score(papers, QUERIES))
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=args.repeat, number=number)) / number
+    print(f"  分词缓存命中后打分 {best * 1000:.2f} ms")
+    for p in top:
+        print(f"  {p['relevance']:8.4f}  {p['title'][-40:]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+查询游标（高水位）存储
+arXiv 查询均按 submittedDate 降序返回，记录每个查询上次见到的最新条目，
+下次运行翻页到该位置即可停止，实现增量同步。
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+
+CURSOR_FILE = Path(__file__).parent / "query_cursors.json"
+
+
+class CursorStore:
+    """
+    每个查询一条记录：{"published": ISO 时间, "ids": [该时间点的论文 ID], "updated_at": ISO 时间}
+
+    同一时间戳可能有多篇论文，因此同时记录该时间点已见过的 ID，避免漏掉并列条目。
+    """
+
+    def __init__(self, path=CURSOR_FILE):
+        self.path = Path(path)
+        self._cursors = {}
+        if self.path.exists():
+            try:
+                self._cursors = json.loads(self.path.read_text(encoding="utf-8"))
+            except (ValueError, OSError) as e:
+                print(f"⚠️ 查询游标文件损坏，将全量抓取: {e}")
+                self._cursors = {}
+
+    def __len__(self):
+        return len(self._cursors)
+
+    def mark(self, query):
+        """返回 (高水位时间, 该时间点的 ID 集合)，没有记录时返回 None"""
+        cursor = self._cursors.get(query)
+        if not cursor:
+            return None
+        return datetime.fromisoformat(cursor["published"]), set(cursor["ids"])
+
+    def reached(self, query, paper):
+        """论文是否已处在上次的高水位或更早（即已经见过）"""
+        mark = self.mark(query)
+        if mark is None:
+            return False
+        published, ids = mark
+        return paper["published"] < published or (paper["published"] == published and paper["id"] in ids)
+
+    def advance(self, query, papers):
+        """用本次抓到的论文推进高水位（只前进不后退）"""
+        if not papers:
+            return
+        newest = max(p["published"] for p in papers)
+        ids = {p["id"] for p in papers if p["published"] == newest}
+        mark = self.mark(query)
+        if mark is not None:
+            published, old_ids = mark
+            if newest < published:
+                return
+            if newest == published:
+                ids |= old_ids
+        self._cursors[query] = {
+            "published": newest.isoformat(),
+            "ids": sorted(ids),
+            "updated_at": datetime.now().astimezone().isoformat(timespec="seconds"),
+        }
+
+    def save(self):
+        self.path.write_text(json.dumps(self._cursors, ensure_ascii=False, indent=2), encoding="utf-8")
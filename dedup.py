@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+论文去重引擎
+✅ 版本归一化 ID：arxiv:2401.01234v2 与 v1 视为同一篇
+✅ 精确索引：ID / DOI / 归一化标题，哈希查找
+✅ MinHash + LSH 指纹：识别跨来源（arXiv 预印本 ↔ IOP 期刊版）的近似重复
+整体复杂度与候选数近似线性。
+"""
+
+import hashlib
+import re
+import time
+from pathlib import Path
+
+import numpy as np
+
+from atom_parser import split_arxiv_version
+
+FINGERPRINT_PATH = Path(__file__).parent / "sent_papers.sig"
+FINGERPRINT_TTL_DAYS = 180
+NUM_PERM = 64
+LSH_BANDS = 16                    # 16 段 × 4 行，约在相似度 0.5 附近开始命中
+NEAR_DUP_THRESHOLD = 0.6          # 签名一致比例达到该值判为近似重复
+SHINGLE_SIZE = 3
+
+_WORD_RE = re.compile(r"\w+")
+
+_rng = np.random.RandomState(20240901)  # 固定种子，保证指纹跨运行可比
+_PERM_A = _rng.randint(1, 2 ** 63, size=NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_PERM_B = _rng.randint(0, 2 ** 63, size=NUM_PERM, dtype=np.uint64)
+
+FINGERPRINT_DTYPE = np.dtype([("key", "<u8"), ("day", "<u4"), ("sig", "<u4", (NUM_PERM,))])
+
+
+# ==================== ID 归一化 ====================
+def normalize_paper_id(paper_id):
+    """去掉 arXiv ID 的版本后缀，其他来源原样返回"""
+    if paper_id.startswith("arxiv:"):
+        return split_arxiv_version(paper_id)[0]
+    return paper_id
+
+
+def paper_doi(paper):
+    if paper.get("doi"):
+        return paper["doi"].lower()
+    link = paper.get("link") or ""
+    if "iopscience.iop.org/article/" in link:
+        return link.split("/article/", 1)[1].strip("/").lower()
+    return None
+
+
+def title_key(title):
+    words = _WORD_RE.findall(title.lower())
+    return "title:" + " ".join(words) if len(words) >= 4 else None
+
+
+def exact_keys(paper):
+    """用于精确去重的键：归一化 ID、DOI、归一化标题"""
+    keys = [normalize_paper_id(paper["id"])]
+    doi = paper_doi(paper)
+    if doi:
+        keys.append("doi:" + doi)
+    tkey = title_key(paper.get("title", ""))
+    if tkey:
+        keys.append(tkey)
+    return keys
+
+
+def legacy_ids(paper):
+    """旧版记录里带版本号的 ID（arxiv:XXXXv1 ... vN），仅用于查询"""
+    version = paper.get("version")
+    if not version or not paper["id"].startswith("arxiv:"):
+        return []
+    return [f"{paper['id']}v{v}" for v in range(1, version + 1)]
+
+
+# ==================== MinHash / LSH ====================
+def _shingle_hashes(text):
+    words = _WORD_RE.findall(text.lower())
+    if len(words) >= SHINGLE_SIZE:
+        shingles = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    else:
+        shingles = set(words)
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little") for s in shingles),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+
+
+def minhash_signature(text):
+    """64 个置换下的最小哈希（取乘法哈希的高 32 位），文本为空时返回 None"""
+    hashes = _shingle_hashes(text)
+    if hashes.size == 0:
+        return None
+    mixed = (_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) >> np.uint64(32)
+    return mixed.min(axis=1).astype(np.uint32)
+
+
+class LshIndex:
+    """按段分桶的 LSH 索引，查询只比较同桶候选"""
+
+    def __init__(self, bands=LSH_BANDS):
+        self.bands = bands
+        self.rows = NUM_PERM // bands
+        self._buckets = {}
+        self._sigs = {}
+
+    def _band_keys(self, sig):
+        for b in range(self.bands):
+            yield b, sig[b * self.rows:(b + 1) * self.rows].tobytes()
+
+    def add(self, label, sig):
+        self._sigs[label] = sig
+        for key in self._band_keys(sig):
+            self._buckets.setdefault(key, []).append(label)
+
+    def query(self, sig, threshold=NEAR_DUP_THRESHOLD):
+        """返回相似度最高且不低于 threshold 的标签，没有则返回 None"""
+        best, best_score = None, threshold
+        checked = set()
+        for key in self._band_keys(sig):
+            for label in self._buckets.get(key, ()):
+                if label in checked:
+                    continue
+                checked.add(label)
+                score = float(np.mean(self._sigs[label] == sig))
+                if score >= best_score:
+                    best, best_score = label, score
+        return best
+
+
+# ==================== 去重引擎 ====================
+class Deduplicator:
+    """
+    seen: 已推送记录（SeenStore 或 set），保存归一化 ID / DOI / 标题键
+    duplicate_of(paper) 返回重复来源的标识（ID 或指纹标签），不重复时返回 None；
+    register(paper) 登记本次运行选中的论文；mark_sent(paper) 写入已推送记录。
+    """
+
+    def __init__(self, seen, fingerprint_path=FINGERPRINT_PATH, threshold=NEAR_DUP_THRESHOLD):
+        self.seen = seen
+        self.fingerprint_path = Path(fingerprint_path) if fingerprint_path else None
+        self.threshold = threshold
+        self._keys = {}
+        self._lsh = LshIndex()
+        self._sig_cache = {}
+        self._pending = []
+        self._duplicates = {}   # 论文 ID -> "exact" / "near"，同一篇在多个候选池中被检查也只计一次
+        self.sent_ids = set()   # 本次运行写入已推送记录的论文 ID
+        self._load_fingerprints()
+
+    def _load_fingerprints(self):
+        if not self.fingerprint_path or not self.fingerprint_path.exists():
+            return
+        records = np.fromfile(self.fingerprint_path, dtype=FINGERPRINT_DTYPE)
+        cutoff = int(time.time() // 86400) - FINGERPRINT_TTL_DAYS
+        for rec in records[records["day"] >= cutoff]:
+            self._lsh.add(f"#{int(rec['key']):016x}", rec["sig"])
+
+    def signature(self, paper):
+        sig = self._sig_cache.get(paper["id"])
+        if sig is None:
+            sig = minhash_signature(paper.get("title", "") + " " + paper.get("summary", ""))
+            self._sig_cache[paper["id"]] = sig
+        return sig
+
+    @property
+    def stats(self):
+        """判为重复的论文篇数（按论文 ID 去重）：{"exact": n, "near": n}"""
+        kinds = list(self._duplicates.values())
+        return {"exact": kinds.count("exact"), "near": kinds.count("near")}
+
+    def duplicate_of(self, paper):
+        for key in exact_keys(paper):
+            if key in self._keys:
+                return self._found(paper, "exact", self._keys[key])
+            if key in self.seen:
+                return self._found(paper, "exact", key)
+        for key in legacy_ids(paper):
+            if key in self.seen:
+                return self._found(paper, "exact", key)
+        sig = self.signature(paper)
+        if sig is not None:
+            match = self._lsh.query(sig, self.threshold)
+            if match is not None and match != paper["id"]:
+                return self._found(paper, "near", match)
+        return None
+
+    def _found(self, paper, kind, source):
+        self._duplicates.setdefault(paper["id"], kind)
+        return source
+
+    def register(self, paper):
+        for key in exact_keys(paper):
+            self._keys.setdefault(key, paper["id"])
+        sig = self.signature(paper)
+        if sig is not None:
+            self._lsh.add(paper["id"], sig)
+
+    def mark_sent(self, paper):
+        self.sent_ids.add(paper["id"])
+        for key in exact_keys(paper):
+            self.seen.add(key)
+        sig = self.signature(paper)
+        if sig is not None:
+            key = int.from_bytes(hashlib.blake2b(paper["id"].encode("utf-8"), digest_size=8).digest(), "little")
+            self._pending.append((key, int(time.time() // 86400), sig))
+
+    def save(self):
+        """追加本次已推送论文的指纹；存在过期记录时顺带重写文件"""
+        if not self.fingerprint_path:
+            return
+        new = np.array(self._pending, dtype=FINGERPRINT_DTYPE)
+        self._pending = []
+        old = np.fromfile(self.fingerprint_path, dtype=FINGERPRINT_DTYPE) if self.fingerprint_path.exists() else None
+        cutoff = int(time.time() // 86400) - FINGERPRINT_TTL_DAYS
+        if old is not None and old.size and old["day"].min() < cutoff:
+            np.concatenate([old[old["day"] >= cutoff], new]).tofile(self.fingerprint_path)
+        elif new.size:
+            with open(self.fingerprint_path, "ab") as f:
+                new.tofile(f)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+飞书机器人推送
+✅ 签名校验（timestamp + sign）
+✅ 单篇 post 消息
+✅ 日报摘要卡片：按主题分组，超过消息大小上限时自动拆分为多张卡片
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+
+from http_client import get_client
+
+# 自定义机器人请求体上限为 20 KB，预留签名字段与余量
+FEISHU_MAX_BYTES = 18000
+SUMMARY_MAX_CHARS = 600
+
+
+def sign_payload(payload, secret):
+    """按飞书签名规则写入 timestamp 与 sign 字段"""
+    timestamp = str(int(time.time()))
+    string_to_sign = timestamp + "\n" + secret
+    sign = base64.b64encode(
+        hmac.new(string_to_sign.encode('utf-8'), digestmod=hashlib.sha256).digest()
+    ).decode('utf-8')
+    payload["timestamp"] = timestamp
+    payload["sign"] = sign
+    return payload
+
+
+def encode_payload(payload):
+    # 中文不转义，与计算大小时保持一致
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+def post_webhook(webhook_url, payload, secret=None, timeout=10):
+    """发送一条消息，成功返回 True"""
+    payload = dict(payload)
+    if secret:
+        sign_payload(payload, secret)
+    try:
+        resp = get_client().post(
+            webhook_url,
+            data=encode_payload(payload),
+            headers={"Content-Type": "application/json; charset=utf-8"},
+            timeout=timeout,
+        )
+        if resp.status_code == 200:
+            result = resp.json()
+            if result.get("code") == 0:
+                return True
+            print(f"❌ 飞书返回错误: {result}")
+        else:
+            print(f"❌ 发送失败 HTTP {resp.status_code}")
+    except Exception as e:
+        print(f"❌ 发送异常: {e}")
+    return False
+
+
+def build_post_message(title, summary, link, tag, methods=None):
+    """单篇论文的 post 消息"""
+    lines = [[{"tag": "text", "text": summary}]]
+    if methods is not None:
+        lines.append([{"tag": "text", "text": "🧪 制备方法：" + ("、".join(methods) if methods else "未识别")}])
+    lines.append([{"tag": "a", "text": "查看全文", "href": link}])
+    return {
+        "msg_type": "post",
+        "content": {
+            "post": {
+                "zh_cn": {
+                    "title": f"{tag} {title}",
+                    "content": lines
+                }
+            }
+        }
+    }
+
+
+# ==================== 日报摘要卡片 ====================
+def _md_escape(text):
+    return text.replace("[", "［").replace("]", "］")
+
+
+def _md_div(content):
+    return {"tag": "div", "text": {"tag": "lark_md", "content": content}}
+
+
+def paper_element(paper, summary_max=SUMMARY_MAX_CHARS):
+    summary = paper.get("processed_summary") or paper.get("summary", "")
+    if len(summary) > summary_max:
+        summary = summary[:summary_max] + "..."
+    lines = [f"**[{_md_escape(paper['title'])}]({paper['link']})**"]
+    if "methods" in paper:
+        lines.append("🧪 制备方法：" + ("、".join(paper["methods"]) or "未识别"))
+    lines.append(summary)
+    return _md_div("\n".join(lines))
+
+
+def _card(title, elements, part=None, parts=None):
+    header = title if part is None else f"{title}（{part}/{parts}）"
+    return {
+        "msg_type": "interactive",
+        "card": {
+            "config": {"wide_screen_mode": True},
+            "header": {"title": {"tag": "plain_text", "content": header}, "template": "blue"},
+            "elements": elements,
+        },
+    }
+
+
+def _size(title, elements):
+    # 按最长的分页标题估算，留出 "（n/m）" 的空间
+    return len(encode_payload(_card(title + "（99/99）", elements)))
+
+
+def build_digest_messages(papers, title, max_bytes=FEISHU_MAX_BYTES):
+    """
+    把论文按 tag 分组渲染为交互卡片，返回 [(卡片消息, 卡片内的论文)]
+
+    卡片在超过 max_bytes 前拆分；续页会重复当前主题的小标题。
+    单篇论文本身超限时逐步截短摘要。
+    """
+    groups = {}
+    for p in papers:
+        groups.setdefault(p.get("tag", "【其他】"), []).append(p)
+
+    pages = []
+    current, current_papers = [], []
+    for tag, group in groups.items():
+        heading = _md_div(f"**{tag}**（{len(group)} 篇）")
+        pending_heading = [{"tag": "hr"}, heading] if current else [heading]
+        for p in group:
+            element = paper_element(p)
+            limit = SUMMARY_MAX_CHARS
+            while _size(title, [heading, element]) > max_bytes and limit > 50:
+                limit //= 2
+                element = paper_element(p, limit)
+            candidate = current + pending_heading + [element]
+            if current and _size(title, candidate) > max_bytes:
+                pages.append((current, current_papers))
+                current, current_papers = [heading, element], [p]
+            else:
+                current = candidate
+                current_papers.append(p)
+            pending_heading = []
+    if current:
+        pages.append((current, current_papers))
+
+    if len(pages) == 1:
+        return [(_card(title, pages[0][0]), pages[0][1])]
+    return [(_card(title, elements, i + 1, len(pages)), page_papers)
+            for i, (elements, page_papers) in enumerate(pages)]
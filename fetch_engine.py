@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+并发抓取引擎
+✅ 有界线程池，多个查询同时在途
+✅ 全局令牌桶限速，遵守 arXiv API 访问频率要求
+✅ 自适应限速：遇到 429/503 指数退避（带抖动）并遵守 Retry-After，成功后逐步恢复
+✅ 结果按输入顺序返回，输出确定
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# arXiv API 要求：每 3 秒不超过 1 次请求
+ARXIV_RATE_PER_SEC = 1 / 3
+ARXIV_BURST = 1
+# IOP 没有公开的频率要求，保守地每秒 1 次、允许 2 次突发
+IOP_RATE_PER_SEC = 1.0
+IOP_BURST = 2
+DEFAULT_MAX_WORKERS = 4
+BACKOFF_BASE = 5.0        # 首次被限流后的等待秒数
+BACKOFF_MAX = 300.0
+MIN_RATE_FACTOR = 0.125   # 限流后速率最低降到初始值的 1/8
+RECOVERY_STEP = 0.1       # 每次成功恢复初始速率的 10%
+
+
+class TokenBucket:
+    """线程安全的令牌桶：rate 为每秒补充的令牌数，capacity 为桶容量（突发上限）"""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self._last
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._last = now
+
+    def acquire(self, tokens=1):
+        """阻塞直到取得令牌，返回等待的秒数"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class AdaptiveRateLimiter(TokenBucket):
+    """
+    自适应令牌桶：以服务方公布的速率起步，永不超过该速率
+
+    penalize(retry_after) 在收到 429/503 时调用：速率减半，并在
+    Retry-After（没有时按指数退避加抖动）期间暂停所有请求；
+    reward() 在成功后调用：连续失败清零，速率按固定步长逐步恢复。
+    backoff_seconds 累计所有调用方因退避暂停（429/503、连接错误）而等待的时间，
+    paced_seconds 累计按当前速率正常排队取令牌的等待时间。
+    """
+
+    def __init__(self, rate, capacity=1, backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX):
+        super().__init__(rate, capacity)
+        self.max_rate = float(rate)
+        self.min_rate = self.max_rate * MIN_RATE_FACTOR
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failures = 0
+        self.backoffs = 0
+        self.backoff_seconds = 0.0
+        self.paced_seconds = 0.0
+        self._blocked_until = 0.0
+
+    def acquire(self, tokens=1):
+        """阻塞直到退避结束并取得令牌，返回等待的秒数"""
+        backoff = paced = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                blocked = self._blocked_until - now
+                if blocked <= 0 and self._tokens >= tokens:
+                    self._tokens -= tokens
+                    self.backoff_seconds += backoff
+                    self.paced_seconds += paced
+                    return backoff + paced
+                delay = blocked if blocked > 0 else (tokens - self._tokens) / self.rate
+            time.sleep(delay)
+            if blocked > 0:
+                backoff += delay
+            else:
+                paced += delay
+
+    def backoff_delay(self):
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (self.failures - 1)))
+        return delay * random.uniform(0.5, 1.5)
+
+    def penalize(self, retry_after=None):
+        """记录一次限流，返回本次暂停的秒数"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.failures += 1
+            self.backoffs += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            delay = retry_after if retry_after is not None else self.backoff_delay()
+            delay = min(self.backoff_max, max(0.0, delay))
+            self._blocked_until = max(self._blocked_until, now + delay)
+            self._tokens = 0.0
+            return delay
+
+    def reward(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.failures = 0
+            self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_STEP)
+
+    def summary(self):
+        return (f"退避 {self.backoffs} 次（暂停 {self.backoff_seconds:.1f} 秒），"
+                f"按速率排队 {self.paced_seconds:.1f} 秒，当前速率 {self.rate * 60:.1f} 次/分钟")
+
+
+class FetchResult:
+    """单个任务的结果：value 为返回值，error 为异常（成功时为 None）"""
+
+    __slots__ = ("item", "value", "error")
+
+    def __init__(self, item, value=None, error=None):
+        self.item = item
+        self.value = value
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def fetch_all(func, items, max_workers=DEFAULT_MAX_WORKERS, limiter=None):
+    """
+    并发执行 func(item)，返回与 items 顺序一致的 FetchResult 列表
+
+    Args:
+        func: 单个抓取函数
+        items: 待抓取的参数序列
+        max_workers: 同时在途的最大请求数
+        limiter: 共享的 TokenBucket，每次调用 func 前取一个令牌
+
+    单个任务失败不会影响其他任务，异常记录在对应结果的 error 中。
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    def run(item):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            return FetchResult(item, value=func(item))
+        except Exception as e:
+            return FetchResult(item, error=e)
+
+    workers = max(1, min(max_workers, len(items)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # map 按提交顺序返回结果，保证输出确定
+        return list(pool.map(run, items))
+
+
+# 同一主机的所有请求共享一个自适应令牌桶（由 http_client 按主机使用）
+ARXIV_LIMITER = AdaptiveRateLimiter(ARXIV_RATE_PER_SEC, ARXIV_BURST)
+IOP_LIMITER = AdaptiveRateLimiter(IOP_RATE_PER_SEC, IOP_BURST)
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+持久化 HTTP 响应缓存
+✅ 内容寻址的磁盘存储（响应体按 SHA-256 存放，相同内容只存一份）
+✅ 按来源设置 TTL（arXiv / IOP ...）
+✅ 过期后用 ETag / Last-Modified 做条件请求，304 直接复用
+✅ 按总大小做 LRU 淘汰
+✅ 可边读边缓存（stream）：读完整个响应才写入，提前断开的响应不缓存
+回源请求由 http_client.HttpClient 完成。
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+CACHE_DIR = Path(os.getenv("ARXIV_MONITOR_CACHE_DIR", Path(__file__).parent / ".http_cache"))
+CACHE_MAX_BYTES = int(os.getenv("ARXIV_MONITOR_CACHE_MAX_MB", "200")) * 1024 * 1024
+CACHE_DISABLED = os.getenv("ARXIV_MONITOR_NO_CACHE", "") not in ("", "0")
+
+# 各来源的缓存有效期（秒）
+SOURCE_TTLS = {
+    "arxiv": 6 * 3600,
+    "iop": 12 * 3600,
+    "default": 3600,
+}
+
+
+class CachedResponse:
+    """与 requests.Response 常用字段兼容的精简响应"""
+
+    def __init__(self, status_code, content, headers=None, from_cache=False):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.from_cache = from_cache
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise OSError(f"HTTP {self.status_code}")
+
+
+class HttpCache:
+    """
+    磁盘缓存：索引存于 SQLite，响应体存于 blobs/ 下以内容哈希命名的文件
+
+    fetch(url, fetcher, source) 中的 fetcher 负责真正的网络请求：
+    fetcher(extra_headers) -> (status_code, body_bytes, headers_dict)，
+    status_code 为 304 表示内容未变化；其他错误应直接抛出异常。
+    """
+
+    def __init__(self, root=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, ttls=None):
+        self.root = Path(root)
+        self.blob_dir = self.root / "blobs"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttls = dict(SOURCE_TTLS, **(ttls or {}))
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.root / "index.sqlite3"), check_same_thread=False)
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                source TEXT NOT NULL,
+                blob TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed_at)")
+        self._db.commit()
+
+    @staticmethod
+    def key_for(url):
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _blob_path(self, digest):
+        return self.blob_dir / digest[:2] / digest
+
+    def _read_blob(self, digest):
+        try:
+            return self._blob_path(digest).read_bytes()
+        except OSError:
+            return None
+
+    def _write_blob(self, body):
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._blob_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # 每个写入者用独立的临时文件，多个线程同时写入同一内容时互不干扰（os.replace 原子覆盖）
+            with tempfile.NamedTemporaryFile(dir=path.parent, prefix=path.name + ".", suffix=".tmp",
+                                             delete=False) as f:
+                f.write(body)
+            try:
+                os.replace(f.name, path)
+            except OSError:
+                os.unlink(f.name)
+                raise
+        return digest
+
+    def _lookup(self, key):
+        with self._lock:
+            return self._db.execute(
+                "SELECT blob, etag, last_modified, fetched_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+
+    def _touch(self, key, refreshed=False):
+        now = time.time()
+        with self._lock:
+            if refreshed:
+                self._db.execute("UPDATE entries SET fetched_at = ?, accessed_at = ? WHERE key = ?", (now, now, key))
+            else:
+                self._db.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self._db.commit()
+
+    def _store(self, key, url, source, body, headers):
+        digest = self._write_blob(body)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, source, digest, len(body), headers.get("ETag"), headers.get("Last-Modified"), now, now),
+            )
+            self._db.commit()
+        self._evict()
+
+    def _evict(self):
+        """超过 max_bytes 时按最近访问时间淘汰，并删除不再被引用的 blob"""
+        with self._lock:
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            rows = self._db.execute("SELECT key, blob, size FROM entries ORDER BY accessed_at").fetchall()
+            for key, digest, size in rows:
+                if total <= self.max_bytes:
+                    break
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+                still_used = self._db.execute("SELECT 1 FROM entries WHERE blob = ? LIMIT 1", (digest,)).fetchone()
+                if not still_used:
+                    try:
+                        self._blob_path(digest).unlink()
+                    except OSError:
+                        pass
+            self._db.commit()
+
+    def _prepare(self, key, source):
+        """返回 (缓存的响应体或 None, 是否仍在有效期内, 条件请求头)"""
+        ttl = self.ttls.get(source, self.ttls["default"])
+        row = self._lookup(key)
+        extra_headers = {}
+        if not row:
+            return None, False, extra_headers
+        digest, etag, last_modified, fetched_at = row
+        cached_body = self._read_blob(digest)
+        if cached_body is None:
+            return None, False, extra_headers
+        if time.time() - fetched_at < ttl:
+            self.hits += 1
+            self._touch(key)
+            return cached_body, True, extra_headers
+        if etag:
+            extra_headers["If-None-Match"] = etag
+        if last_modified:
+            extra_headers["If-Modified-Since"] = last_modified
+        return cached_body, False, extra_headers
+
+    def fetch(self, url, fetcher, source="default"):
+        """读取缓存或回源，返回 CachedResponse"""
+        key = self.key_for(url)
+        cached_body, fresh, extra_headers = self._prepare(key, source)
+        if fresh:
+            return CachedResponse(200, cached_body, from_cache=True)
+
+        status, body, headers = fetcher(extra_headers)
+        if status == 304 and cached_body is not None:
+            self.revalidated += 1
+            self._touch(key, refreshed=True)
+            return CachedResponse(200, cached_body, headers, from_cache=True)
+
+        self.misses += 1
+        self._store(key, url, source, body, headers)
+        return CachedResponse(status, body, headers)
+
+    def stream(self, url, fetcher, source="default"):
+        """
+        与 fetch 相同，但逐块产出响应体；fetcher(extra_headers) -> (status_code, 分块迭代器, headers_dict)
+
+        回源时边读边产出，完整读完才写入缓存；调用方提前停止（close）时不缓存残缺的响应。
+        """
+        key = self.key_for(url)
+        cached_body, fresh, extra_headers = self._prepare(key, source)
+        if fresh:
+            yield cached_body
+            return
+
+        status, chunks, headers = fetcher(extra_headers)
+        if status == 304 and cached_body is not None:
+            self.revalidated += 1
+            self._touch(key, refreshed=True)
+            yield cached_body
+            return
+
+        self.misses += 1
+        parts = []
+        try:
+            for chunk in chunks:
+                parts.append(chunk)
+                yield chunk
+        finally:
+            if hasattr(chunks, "close"):
+                chunks.close()
+        self._store(key, url, source, b"".join(parts), headers)
+
+    def stats(self):
+        return {"hits": self.hits, "revalidated": self.revalidated, "misses": self.misses}
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_cache():
+    """返回进程内共享的缓存实例；设置 ARXIV_MONITOR_NO_CACHE=1 时返回 None"""
+    global _default_cache
+    if CACHE_DISABLED:
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = HttpCache()
+        return _default_cache
+
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+共享 HTTP 客户端
+✅ 按主机复用 keep-alive 连接池，TLS 握手每个主机每次运行只需一次
+✅ 统一的默认请求头（gzip 压缩）与超时
+✅ 可选走持久化响应缓存（http_cache）
+✅ 按主机自适应限速：429/503 与连接错误自动退避重试（fetch_engine.AdaptiveRateLimiter）
+✅ 传输层可替换，测试时换成假的 transport 即可离线运行
+
+用法：
+    from http_client import get_client
+    resp = get_client().get(url, cache_source="arxiv")
+"""
+
+import os
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from json import dumps as json_dumps
+from urllib.parse import urlencode, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from fetch_engine import ARXIV_LIMITER, IOP_LIMITER
+from http_cache import CachedResponse, get_cache
+
+DEFAULT_USER_AGENT = "OpenClaw/1.0"
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))
+READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "30"))
+DEFAULT_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "8"))  # 每个主机最多保持的连接数
+MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "4"))    # 限速主机上的最大重试次数
+RETRY_STATUSES = (429, 503)
+
+# 需要限速的主机（按主机名）
+HOST_LIMITERS = {
+    "export.arxiv.org": ARXIV_LIMITER,
+    "rss.arxiv.org": ARXIV_LIMITER,
+    "oaipmh.arxiv.org": ARXIV_LIMITER,
+    "iopscience.iop.org": IOP_LIMITER,
+}
+
+DEFAULT_HEADERS = {
+    "User-Agent": DEFAULT_USER_AGENT,
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+}
+
+
+def host_of(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def with_params(url, params):
+    if not params:
+        return url
+    return url + ("&" if "?" in url else "?") + urlencode(params)
+
+
+def retry_after_seconds(headers):
+    """解析 Retry-After（秒数或 HTTP 日期），无法解析时返回 None"""
+    value = (headers or {}).get("Retry-After")
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def _timeout(timeout):
+    """单个数字视为读超时，连接超时保持默认"""
+    if timeout is None:
+        return DEFAULT_TIMEOUT
+    if isinstance(timeout, (int, float)):
+        return (min(CONNECT_TIMEOUT, timeout), timeout)
+    return timeout
+
+
+def _iter_response(response, chunk_size):
+    try:
+        yield from response.iter_content(chunk_size=chunk_size)
+    finally:
+        response.close()
+
+
+class RequestsTransport:
+    """
+    基于 requests 的传输层：每个主机一个 Session，各自维护连接池
+
+    send(method, url, headers, body, timeout, stream) 返回 requests.Response；
+    替换用的 transport 只需返回带有 status_code / headers / content / text /
+    json() / iter_content() / raise_for_status() / close() 的对象。
+    """
+
+    def __init__(self, pool_maxsize=POOL_MAXSIZE):
+        self.pool_maxsize = pool_maxsize
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def session_for(self, url):
+        host = host_of(url)
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize)
+                session.mount(host, adapter)
+                self._sessions[host] = session
+            return session
+
+    def send(self, method, url, headers=None, body=None, timeout=DEFAULT_TIMEOUT, stream=False):
+        return self.session_for(url).request(
+            method, url, headers=headers, data=body, timeout=timeout, stream=stream
+        )
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+class HttpClient:
+    """
+    所有模块共用的 HTTP 客户端
+
+    get(..., cache_source="arxiv") 经过持久化缓存，非 2xx 响应抛出异常；
+    不带 cache_source 的 get / post 原样返回响应，由调用方检查状态码。
+    """
+
+    def __init__(self, transport=None, headers=None, timeout=None, cache=False, limiters=None,
+                 max_retries=MAX_RETRIES):
+        self.transport = transport or RequestsTransport()
+        self.headers = dict(DEFAULT_HEADERS, **(headers or {}))
+        self.timeout = timeout or DEFAULT_TIMEOUT
+        self.limiters = dict(HOST_LIMITERS, **(limiters or {}))
+        self.max_retries = max_retries
+        # cache=False 表示使用进程内共享缓存（get_cache），None 表示不缓存
+        self._cache = cache
+        self.requests_per_host = Counter()
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return get_cache() if self._cache is False else self._cache
+
+    def request(self, method, url, params=None, headers=None, data=None, json=None, timeout=None, stream=False):
+        url = with_params(url, params)
+        merged = dict(self.headers, **(headers or {}))
+        body = data
+        if json is not None:
+            body = json_dumps(json).encode("utf-8")
+            merged.setdefault("Content-Type", "application/json")
+        timeout = _timeout(timeout or self.timeout)
+        limiter = self.limiters.get(urlsplit(url).hostname)
+        attempt = 0
+        while True:
+            if limiter is not None:
+                limiter.acquire()
+            with self._lock:
+                self.requests_per_host[host_of(url)] += 1
+            try:
+                response = self.transport.send(method, url, headers=merged, body=body, timeout=timeout, stream=stream)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if limiter is None or attempt >= self.max_retries:
+                    raise
+                delay = limiter.penalize()
+                print(f"⏳ {urlsplit(url).hostname} 连接失败（{type(e).__name__}），{delay:.1f} 秒后重试")
+                attempt += 1
+                continue
+            if limiter is None:
+                return response
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                delay = limiter.penalize(retry_after_seconds(response.headers))
+                print(f"⏳ {urlsplit(url).hostname} 返回 {response.status_code}，{delay:.1f} 秒后重试")
+                response.close()
+                attempt += 1
+                continue
+            if response.status_code not in RETRY_STATUSES:
+                limiter.reward()
+            return response
+
+    def get(self, url, params=None, headers=None, timeout=None, stream=False, cache_source=None):
+        if cache_source is None:
+            return self.request("GET", url, params=params, headers=headers, timeout=timeout, stream=stream)
+        url = with_params(url, params)
+        fetcher = self.fetcher(url, headers=headers, timeout=timeout)
+        cache = self.cache
+        if cache is None:
+            status, body, resp_headers = fetcher({})
+            return CachedResponse(status, body, resp_headers)
+        return cache.fetch(url, fetcher, source=cache_source)
+
+    def iter_content(self, url, params=None, headers=None, timeout=None, cache_source=None, chunk_size=8192):
+        """
+        逐块读取响应体，非 2xx 抛出异常；调用方可随时停止读取并 close() 断开连接
+
+        带 cache_source 时经过缓存：命中直接产出缓存内容，回源时边读边产出，完整读完才写入缓存。
+        """
+        url = with_params(url, params)
+
+        def fetch(extra_headers):
+            response = self.request("GET", url, headers=dict(headers or {}, **extra_headers), timeout=timeout,
+                                    stream=True)
+            if response.status_code == 304:
+                response.close()
+                return 304, (), dict(response.headers)
+            try:
+                response.raise_for_status()
+            except Exception:
+                response.close()
+                raise
+            return response.status_code, _iter_response(response, chunk_size), dict(response.headers)
+
+        cache = self.cache if cache_source is not None else None
+        if cache is None:
+            return fetch({})[1]
+        return cache.stream(url, fetch, source=cache_source)
+
+    def post(self, url, data=None, json=None, headers=None, timeout=None):
+        return self.request("POST", url, headers=headers, data=data, json=json, timeout=timeout)
+
+    def fetcher(self, url, headers=None, timeout=None):
+        """供 HttpCache.fetch 使用的回源函数"""
+
+        def fetch(extra_headers):
+            response = self.request("GET", url, headers=dict(headers or {}, **extra_headers), timeout=timeout)
+            if response.status_code == 304:
+                return 304, b"", dict(response.headers)
+            response.raise_for_status()
+            return response.status_code, response.content, dict(response.headers)
+
+        return fetch
+
+    def summary(self):
+        with self._lock:
+            parts = [f"{host.split('://', 1)[-1]} {n} 次" for host, n in self.requests_per_host.most_common()]
+        # 多个主机共用同一个限速器（arXiv 的 export / rss / oaipmh），按限速器合并后只输出一次
+        hosts_of = {}
+        for hostname, limiter in self.limiters.items():
+            hosts_of.setdefault(id(limiter), (limiter, []))[1].append(hostname)
+        for limiter, hostnames in hosts_of.values():
+            if limiter.backoffs or limiter.paced_seconds:
+                parts.append(f"{' / '.join(hostnames)} {limiter.summary()}")
+        return "，".join(parts) or "无请求"
+
+    def close(self):
+        self.transport.close()
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_client():
+    """进程内共享的客户端实例"""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
+
+
+def set_client(client):
+    """替换共享客户端（测试时注入假的 transport），返回旧实例"""
+    global _default_client
+    with _default_lock:
+        old, _default_client = _default_client, client
+        return old
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+IOP Science (nsearch) 数据源
+✅ 多个搜索词并发抓取，按主机限速（http_client + fetch_engine.IOP_LIMITER）
+✅ lxml 解析 + 预编译 XPath；未安装 lxml 时回退到 BeautifulSoup(html.parser)
+✅ 结果按发表日期降序，.pub-date 早于 since_dt 即停止解析后续条目
+✅ 按 currentPage 翻页直到越过 since_dt；各搜索词共享本次运行的文章 URL 索引，每篇只解析一次
+✅ 统计每个搜索词的翻页数与新增篇数，便于剔除从不贡献新论文的搜索词
+"""
+
+import os
+import re
+import threading
+from datetime import datetime, timezone
+
+from fetch_engine import fetch_all
+from http_client import get_client
+
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:  # pragma: no cover - 仅在缺少 lxml 的环境中使用
+    etree = lxml_html = None
+
+IOP_BASE_URL = "https://iopscience.iop.org"
+IOP_SEARCH_URL = IOP_BASE_URL + "/nsearch"
+IOP_MAX_WORKERS = int(os.getenv("IOP_MAX_WORKERS", "3"))
+IOP_TIMEOUT = 20
+IOP_MAX_PAGES = int(os.getenv("IOP_MAX_PAGES", "5"))  # 每个搜索词最多翻页数
+
+IOP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/128.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+_DATE_RE = re.compile(r"(\d{1,2})\s+(\w+)\s+(\d{4})")
+
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+if etree is not None:
+    _XP_ITEMS = etree.XPath(f"//div[{_has_class('list-item')}]")
+    _XP_TITLE = etree.XPath(".//h3//a[@href]")
+    _XP_ABSTRACT = etree.XPath(f".//*[{_has_class('abstract')}]")
+    _XP_PUB_DATE = etree.XPath(f".//*[{_has_class('pub-date')}]")
+
+
+def parse_pub_date(text):
+    """'12 Sep 2024' 形式的日期，无法识别时返回 None"""
+    match = _DATE_RE.search(text)
+    if not match:
+        return None
+    day, month, year = match.groups()
+    try:
+        return datetime.strptime(f"{day} {month[:3]} {year}", "%d %b %Y").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def article_url(href):
+    return IOP_BASE_URL + href if href.startswith("/") else href
+
+
+def make_paper(title, link, abstract, pub_date):
+    return {
+        "id": f"iop:{link.split('/')[-1]}",
+        "title": title,
+        "summary": abstract,
+        "link": link,
+        "published": pub_date,
+    }
+
+
+def _clean(text):
+    # 合并空白；标题中的 <i>/<sub> 等标签两侧保留空格
+    return " ".join(text.split())
+
+
+def _iter_items_lxml(page_html):
+    root = lxml_html.fromstring(page_html)
+    for item in _XP_ITEMS(root):
+        titles = _XP_TITLE(item)
+        if not titles:
+            continue
+        dates = _XP_PUB_DATE(item)
+
+        def details(item=item, title=titles[0]):
+            abstracts = _XP_ABSTRACT(item)
+            return _clean(title.text_content()), _clean(abstracts[0].text_content()) if abstracts else ""
+
+        yield titles[0].get("href"), dates[0].text_content() if dates else None, details
+
+
+def _iter_items_bs4(page_html):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(page_html, "html.parser")
+    for item in soup.select("div.list-item"):
+        title_tag = item.select_one("h3 a")
+        if not title_tag or not title_tag.get("href"):
+            continue
+        date_tag = item.select_one(".pub-date")
+
+        def details(item=item, title_tag=title_tag):
+            abs_tag = item.select_one(".abstract")
+            return _clean(title_tag.get_text()), _clean(abs_tag.get_text()) if abs_tag else ""
+
+        yield title_tag["href"], date_tag.get_text() if date_tag else None, details
+
+
+def parse_iop_results(page_html, since_dt, use_lxml=None, claim=None):
+    """
+    解析一页 nsearch 结果，返回 (论文列表, 是否已越过 since_dt, 本页条目数)
+
+    页面按发表日期降序，遇到第一条早于 since_dt 的条目即停止；
+    缺少标题或日期的条目跳过。claim(link) 返回 False 的条目视为已解析过，
+    不再提取标题与摘要。
+    """
+    use_lxml = etree is not None if use_lxml is None else use_lxml
+    items = _iter_items_lxml(page_html) if use_lxml else _iter_items_bs4(page_html)
+    papers = []
+    count = 0
+    for href, date_text, details in items:
+        count += 1
+        pub_date = parse_pub_date(date_text) if date_text else None
+        if pub_date is None:
+            continue
+        if pub_date < since_dt:
+            return papers, True, count
+        link = article_url(href)
+        if claim is not None and not claim(link):
+            continue
+        title, abstract = details()
+        papers.append(make_paper(title, link, abstract, pub_date))
+    return papers, False, count
+
+
+def fetch_iop_page(keywords, since_dt, page=1, claim=None):
+    """抓取单个搜索词的一页结果，返回 (论文列表, 是否应停止翻页, 本页条目数)"""
+    params = {"terms": keywords, "sort": "publishDate"}
+    if page > 1:
+        params["currentPage"] = page
+    response = get_client().get(
+        IOP_SEARCH_URL, params=params, headers=IOP_HEADERS, timeout=IOP_TIMEOUT, cache_source="iop"
+    )
+    papers, reached, count = parse_iop_results(response.content, since_dt, claim=claim)
+    return papers, reached or count == 0, count
+
+
+def _term_stats():
+    return {"pages": 0, "items": 0, "new": 0, "shared": 0}
+
+
+class IopHarvester:
+    """
+    一次运行内的 IOP 采集器
+
+    各搜索词并发翻页，直到越过 since_dt、结果耗尽或达到 max_pages；
+    文章 URL 索引在搜索词之间共享，每篇文章只解析一次。全部采集完成后再按 terms 顺序分配：
+    同一篇文章归属排在最前的搜索词，与线程调度无关。
+    stats[搜索词] 记录 pages / items / new / shared。
+    """
+
+    def __init__(self, since_dt, max_pages=IOP_MAX_PAGES, max_workers=IOP_MAX_WORKERS):
+        self.since_dt = since_dt
+        self.max_pages = max_pages
+        self.max_workers = max_workers
+        self.stats = {}
+        self._seen = set()
+        self._papers = {}
+        self._lock = threading.Lock()
+
+    def claim(self, link):
+        """登记文章 URL，首次出现时返回 True（由调用方负责解析）"""
+        with self._lock:
+            if link in self._seen:
+                return False
+            self._seen.add(link)
+            return True
+
+    def harvest_term(self, term):
+        """翻页采集单个搜索词，返回命中的文章 URL（按页面顺序）；解析出的论文存入共享索引"""
+        stats = self.stats.setdefault(term, _term_stats())
+        links = []
+
+        def claim(link):
+            links.append(link)
+            return self.claim(link)
+
+        for page in range(1, self.max_pages + 1):
+            try:
+                found, done, count = fetch_iop_page(term, self.since_dt, page, claim=claim)
+            except Exception as e:
+                print(f"⚠️ IOP nsearch 抓取失败 ({term} 第 {page} 页): {e}")
+                break
+            stats["pages"] += 1
+            stats["items"] += count
+            with self._lock:
+                for p in found:
+                    self._papers[p["link"]] = p
+            if done:
+                break
+        return links
+
+    def harvest(self, terms):
+        """并发采集，返回按 terms 顺序排列的 [(搜索词, 论文列表)]"""
+        for term in terms:
+            self.stats.setdefault(term, _term_stats())
+        results = fetch_all(self.harvest_term, terms, max_workers=self.max_workers)
+        assigned = set()
+        harvested = []
+        for r in results:
+            stats = self.stats[r.item]
+            papers = []
+            for link in r.value if r.ok else []:
+                if link in assigned:
+                    stats["shared"] += 1
+                elif link in self._papers:
+                    assigned.add(link)
+                    papers.append(self._papers[link])
+                    stats["new"] += 1
+            harvested.append((r.item, papers))
+        return harvested
+
+    def unproductive_terms(self):
+        return [term for term, stats in self.stats.items() if stats["new"] == 0]
+
+    def summary(self):
+        lines = [
+            f"{term}：{s['pages']} 页，新增 {s['new']} 篇，与其他搜索词重复 {s['shared']} 篇"
+            for term, s in self.stats.items()
+        ]
+        return "\n".join(lines)
+
+
+def fetch_iop_papers(terms, since_dt, max_workers=IOP_MAX_WORKERS, max_pages=IOP_MAX_PAGES):
+    """并发翻页抓取多个搜索词，返回 (按 terms 顺序排列的 [(搜索词, 论文列表)], 采集器)"""
+    harvester = IopHarvester(since_dt, max_pages=max_pages, max_workers=max_workers)
+    return harvester.harvest(terms), harvester
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多关键词匹配器（各模块共用）
+✅ 关键词编译为一棵字典树，再生成一条正则：每个起点只沿字典树前进，与 Aho–Corasick 同样共享前缀
+✅ 一次扫描返回全部命中的关键词及位置（含重叠，如 "quantum spin liquid" 与 "spin liquid"）
+✅ 忽略大小写；关键词中的空格与连字符等价（"sol gel" 命中 "sol-gel"）
+✅ 拉丁字母 / 数字端点要求词边界，中日韩字符端点不要求（"磁电耦合" 可命中 "研究磁电耦合效应"）
+✅ 可选复数词尾：plural=True 时 "skyrmion" 命中 "skyrmions"
+
+用法：
+    matcher = KeywordMatcher(["quantum spin liquid", "spin liquid", "磁电耦合"], plural=True)
+    matcher.find_all(text)     # [KeywordMatch("quantum spin liquid", 10, 29), KeywordMatch("spin liquid", 18, 29)]
+    matcher.matched(text)      # ["quantum spin liquid", "spin liquid"]
+"""
+
+import re
+
+_END = None  # 字典树中的终止标记
+_CJK = "\u2e80-\u9fff\uac00-\ud7af\uf900-\ufaff\uff66-\uff9f"
+_CJK_RE = re.compile(f"[{_CJK}]")
+# 需要词边界的字符：\w 中除去中日韩字符（与 \b 一致，下划线也算单词字符）
+_WORD_CHAR = f"(?:(?![{_CJK}])\\w)"
+_SEPARATOR_RE = r"[\s\-]+"
+_PLURAL_SUFFIXES = ("es", "s", "")
+
+
+def _needs_boundary(ch):
+    return (ch.isalnum() or ch == "_") and not _CJK_RE.match(ch)
+
+
+def normalize_keyword(keyword, case_sensitive=False):
+    """空格 / 连字符序列归一为单个空格；不区分大小写时转为小写"""
+    words = re.split(_SEPARATOR_RE, keyword.strip())
+    text = " ".join(w for w in words if w)
+    return text if case_sensitive else text.lower()
+
+
+class KeywordMatch:
+    """一次命中：原始关键词与在文本中的 [start, end) 位置"""
+
+    __slots__ = ("keyword", "start", "end")
+
+    def __init__(self, keyword, start, end):
+        self.keyword = keyword
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return f"KeywordMatch({self.keyword!r}, {self.start}, {self.end})"
+
+    def __eq__(self, other):
+        return isinstance(other, KeywordMatch) and (self.keyword, self.start, self.end) == (
+            other.keyword, other.start, other.end)
+
+
+class KeywordMatcher:
+    def __init__(self, keywords, plural=False, case_sensitive=False):
+        self.keywords = []
+        self.plural = plural
+        self.case_sensitive = case_sensitive
+        self._root = {}
+        for keyword in keywords:
+            key = normalize_keyword(keyword, case_sensitive)
+            if not key:
+                continue
+            node = self._root
+            for ch in key:
+                node = node.setdefault(ch, {})
+            node.setdefault(_END, []).append(len(self.keywords))
+            self.keywords.append(keyword)
+        self._regex = self._regex_ignorecase = None
+        if self._root:
+            body = "|".join(self._branch(ch, child, top=True) for ch, child in self._children(self._root))
+            # 不区分大小写时先把文本转成小写再用区分大小写的正则，比 re.I 快一个数量级；
+            # 转小写后长度改变的少见文本（位置无法对应）才退回 re.I
+            self._regex = re.compile(body)
+            self._regex_ignorecase = None if case_sensitive else re.compile(body, re.I)
+
+    @staticmethod
+    def _children(node):
+        return sorted((ch, child) for ch, child in node.items() if ch is not _END)
+
+    def _branch(self, ch, node, top=False):
+        if ch == " ":
+            head = _SEPARATOR_RE
+        else:
+            head = re.escape(ch)
+            if top and _needs_boundary(ch):
+                # 词边界检查放在首字符之后，正则仍以字面字符开头，可以用首字符集快速跳过
+                head = f"{head}(?<!{_WORD_CHAR}{head})"
+        alternatives = [self._branch(c, child) for c, child in self._children(node)]
+        if _END in node:
+            # 终止于此的关键词：拉丁字母 / 数字结尾需要词边界（可带复数词尾）
+            if _needs_boundary(ch):
+                alternatives.append(("(?:e?s)?" if self.plural else "") + f"(?!{_WORD_CHAR})")
+            else:
+                alternatives.append("")
+        if not alternatives:
+            return head
+        if len(alternatives) == 1:
+            return head + (f"(?:{alternatives[0]})" if "|" in alternatives[0] else alternatives[0])
+        return head + "(?:" + "|".join(alternatives) + ")"
+
+    def _keyword_end(self, text, i, last_char, fold):
+        """关键词在 i 处结束时的实际终点（含复数词尾）；不满足词边界时返回 None"""
+        if not _needs_boundary(last_char):
+            return i
+        for suffix in _PLURAL_SUFFIXES if self.plural else ("",):
+            end = i + len(suffix)
+            if suffix and (text[i:end].lower() if fold else text[i:end]) != suffix:
+                continue
+            if end >= len(text) or not _needs_boundary(text[end]):
+                return end
+        return None
+
+    def _walk(self, text, start, fold):
+        """从 start 沿字典树前进，产出在此起点命中的全部关键词（fold 为 False 时 text 已是小写或区分大小写）"""
+        node = self._root
+        i = start
+        last = ""
+        n = len(text)
+        while True:
+            if _END in node and i > start:
+                end = self._keyword_end(text, i, last, fold)
+                if end is not None:
+                    for index in node[_END]:
+                        yield KeywordMatch(self.keywords[index], start, end)
+            if i >= n:
+                return
+            ch = text[i]
+            if ch == " " or ch == "-" or ch.isspace():
+                while i < n and (text[i] == " " or text[i] == "-" or text[i].isspace()):
+                    i += 1
+                node = node.get(" ")
+            else:
+                node = node.get(ch.lower() if fold else ch)
+                i += 1
+                last = ch
+            if node is None:
+                return
+
+    def finditer(self, text):
+        """按起点顺序产出全部命中（同一起点先短后长）"""
+        if self._regex is None or not text:
+            return
+        regex = self._regex
+        fold = False
+        if not self.case_sensitive:
+            folded = text.lower()
+            if len(folded) == len(text):
+                text = folded
+            else:
+                regex = self._regex_ignorecase
+                fold = True
+        # 每次命中后从下一个字符继续搜索，重叠的命中（"spin liquid" 位于 "quantum spin liquid" 内）也不会被跳过
+        search = regex.search
+        m = search(text)
+        while m is not None:
+            yield from self._walk(text, m.start(), fold)
+            m = search(text, m.start() + 1)
+
+    def find_all(self, text):
+        return list(self.finditer(text))
+
+    def matched(self, text):
+        """命中的关键词（去重，按首次出现的位置排序）"""
+        seen = {}
+        for match in self.finditer(text):
+            seen.setdefault(match.keyword, match.start)
+        return list(seen)
+
+    def search(self, text):
+        """第一个命中（无命中时返回 None）"""
+        return next(self.finditer(text), None)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+制备方法标注器
+在标题和摘要中识别制备/生长方法（含同义词与缩写），
+取代"材料 × 方法"的组合查询：只按材料抓取，方法在本地筛选和标注。
+"""
+
+from keyword_matcher import KeywordMatcher
+
+# 标签 -> 同义写法（不区分大小写，空格与连字符等价）
+SYNTHESIS_METHODS = {
+    "固相反应": ["solid state reaction", "solid state synthesis", "solid state route", "solid state method"],
+    "烧结": ["sintering", "sintered", "spark plasma sintering"],
+    "陶瓷法": ["ceramic method", "ceramic route", "ceramic technique", "conventional ceramic"],
+    "化学气相输运": ["chemical vapor transport", "chemical vapour transport"],
+    "助熔剂法": ["flux growth", "flux method", "flux grown", "self flux", "grown from flux", "grown from a flux"],
+    "浮区法": ["floating zone", "optical floating zone", "traveling solvent floating zone", "travelling solvent floating zone"],
+    "布里奇曼法": ["bridgman"],
+    "单晶生长": ["single crystal growth", "single crystals were grown", "single crystals grown", "grown single crystals", "crystal growth"],
+    "溶胶-凝胶": ["sol gel"],
+    "水热法": ["hydrothermal"],
+    "脉冲激光沉积": ["pulsed laser deposition"],
+    "分子束外延": ["molecular beam epitaxy"],
+}
+
+# 缩写区分大小写，避免误匹配普通单词
+METHOD_ABBREVIATIONS = {
+    "化学气相输运": ["CVT"],
+    "烧结": ["SPS"],
+    "浮区法": ["TSFZ"],
+    "脉冲激光沉积": ["PLD"],
+    "分子束外延": ["MBE"],
+}
+
+LABEL_ORDER = list(SYNTHESIS_METHODS)
+
+
+class MethodTagger:
+    """把同义词表编译为两个多关键词匹配器（不区分大小写的短语 + 区分大小写的缩写），一次扫描得到全部标签"""
+
+    def __init__(self, methods=SYNTHESIS_METHODS, abbreviations=METHOD_ABBREVIATIONS):
+        self._label_of = {s: label for label, synonyms in methods.items() for s in synonyms}
+        self._label_of.update((a, label) for label, abbrs in abbreviations.items() for a in abbrs)
+        self._phrases = KeywordMatcher([s for synonyms in methods.values() for s in synonyms])
+        self._abbrs = KeywordMatcher([a for abbrs in abbreviations.values() for a in abbrs],
+                                     plural=True, case_sensitive=True)
+
+    def tag(self, text):
+        """返回文本中出现的制备方法标签（按 LABEL_ORDER 排序，去重）"""
+        found = {self._label_of[k] for k in self._phrases.matched(text)}
+        found.update(self._label_of[k] for k in self._abbrs.matched(text))
+        return [label for label in LABEL_ORDER if label in found]
+
+    def tag_paper(self, paper):
+        """给论文字典写入 methods 字段并返回"""
+        paper["methods"] = self.tag(paper.get("title", "") + " " + paper.get("summary", ""))
+        return paper["methods"]
+
+
+DEFAULT_TAGGER = MethodTagger()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+读取 config.yaml
+✅ 进程内只解析一次
+✅ 文件缺失或格式错误时返回空配置，各模块使用自身默认值
+"""
+
+import os
+from pathlib import Path
+
+CONFIG_PATH = Path(os.getenv("ARXIV_MONITOR_CONFIG", Path(__file__).parent / "config.yaml"))
+
+_cache = {}
+
+
+def load_config(path=CONFIG_PATH):
+    path = Path(path)
+    if path not in _cache:
+        try:
+            import yaml
+
+            with open(path, encoding="utf-8") as f:
+                _cache[path] = yaml.safe_load(f) or {}
+        except (ImportError, OSError, ValueError) as e:
+            print(f"⚠️ 无法读取配置 {path.name}: {e}")
+            _cache[path] = {}
+    return _cache[path]
+
+
+def arxiv_categories(config=None):
+    """
+    arXiv 分类列表
+
+    环境变量 ARXIV_CATEGORIES（逗号分隔）优先；设为 * 表示不限分类。
+    """
+    env = os.getenv("ARXIV_CATEGORIES")
+    if env is not None:
+        env = env.strip()
+        return [] if env == "*" else [c.strip() for c in env.split(",") if c.strip()]
+    config = load_config() if config is None else config
+    return list((config.get("arxiv_monitor") or {}).get("categories") or [])
+
+
+def keyword_preferences(config=None):
+    """user_preferences 中的 (priority_keywords, excluded_keywords)"""
+    config = load_config() if config is None else config
+    prefs = config.get("user_preferences") or {}
+    return list(prefs.get("priority_keywords") or []), list(prefs.get("excluded_keywords") or [])
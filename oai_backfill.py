@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+arXiv OAI-PMH 历史回填
+✅ ListRecords + resumptionToken 逐批收割，整个分类的元数据不受 max_results 限制
+✅ 主进程只负责下载并提取下一批的 token，大批量 XML 交给进程池并行解析
+✅ 每批写成一个 gzip JSONL 分片，写完后更新检查点；中断后从检查点继续
+✅ 端点可配置，可指向本地的 OAI 替身服务器做测试
+
+用法：
+    python oai_backfill.py --from 2021-01-01 --until 2024-12-31
+    python oai_standin.py --port 8000   # 本地替身服务器（另开终端）
+    python oai_backfill.py --endpoint http://127.0.0.1:8000/oai --store /tmp/oai_store
+"""
+
+import argparse
+import gzip
+import html
+import json
+import os
+import re
+import sys
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from http_client import get_client
+
+OAI_ENDPOINT = os.getenv("ARXIV_OAI_URL", "https://oaipmh.arxiv.org/oai")
+OAI_SET = os.getenv("ARXIV_OAI_SET", "physics:cond-mat")
+OAI_METADATA_PREFIX = "arXiv"
+OAI_STORE_DIR = Path(os.getenv("ARXIV_OAI_STORE", Path(__file__).parent / "oai_store"))
+OAI_TIMEOUT = (10, 180)  # 单批响应可达数 MB
+PARSE_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
+OAI_NS = "{http://www.openarchives.org/OAI/2.0/}"
+ARXIV_OAI_NS = "{http://arxiv.org/OAI/arXiv/}"
+CHECKPOINT_NAME = "checkpoint.json"
+
+_TOKEN_RE = re.compile(rb"<resumptionToken([^>]*)>([^<]*)</resumptionToken>|<resumptionToken[^>]*/>")
+_ERROR_RE = re.compile(rb'<error code="([^"]+)"[^>]*>([^<]*)</error>')
+
+
+class OaiError(Exception):
+    def __init__(self, code, message=""):
+        super().__init__(f"{code}: {message}".strip(": "))
+        self.code = code
+
+
+# ==================== 解析（在子进程中执行）====================
+def _clean(text):
+    return " ".join((text or "").split())
+
+
+def record_to_dict(record):
+    """OAI <record>（arXiv 元数据格式）-> 紧凑记录；已删除的记录返回 None"""
+    header = record.find(OAI_NS + "header")
+    if header is None or header.get("status") == "deleted":
+        return None
+    meta = record.find(f"{OAI_NS}metadata/{ARXIV_OAI_NS}arXiv")
+    if meta is None:
+        return None
+    authors = []
+    for author in meta.iterfind(f"{ARXIV_OAI_NS}authors/{ARXIV_OAI_NS}author"):
+        name = " ".join(filter(None, [
+            _clean(author.findtext(ARXIV_OAI_NS + "forenames")),
+            _clean(author.findtext(ARXIV_OAI_NS + "keyname")),
+            _clean(author.findtext(ARXIV_OAI_NS + "suffix")),
+        ]))
+        if name:
+            authors.append(name)
+    return {
+        "id": "arxiv:" + _clean(meta.findtext(ARXIV_OAI_NS + "id")),
+        "title": _clean(meta.findtext(ARXIV_OAI_NS + "title")),
+        "summary": _clean(meta.findtext(ARXIV_OAI_NS + "abstract")),
+        "authors": authors,
+        "categories": _clean(meta.findtext(ARXIV_OAI_NS + "categories")).split(),
+        "created": _clean(meta.findtext(ARXIV_OAI_NS + "created")) or None,
+        "updated": _clean(meta.findtext(ARXIV_OAI_NS + "updated")) or None,
+        "doi": _clean(meta.findtext(ARXIV_OAI_NS + "doi")) or None,
+        "datestamp": _clean(header.findtext(OAI_NS + "datestamp")) or None,
+    }
+
+
+def parse_batch(data):
+    """解析一批 ListRecords 响应，返回 (记录列表, 删除条数)"""
+    root = ET.fromstring(data)
+    records = []
+    deleted = 0
+    for record in root.iter(OAI_NS + "record"):
+        item = record_to_dict(record)
+        if item is None:
+            deleted += 1
+        else:
+            records.append(item)
+    return records, deleted
+
+
+# ==================== 主进程：下载与检查点 ====================
+def scan_batch(data):
+    """
+    不做完整解析，只从响应中取出错误码与下一批的 token
+
+    返回 (下一批 token 或 None, 列表总数或 None)；OAI 错误抛出 OaiError。
+    """
+    error = _ERROR_RE.search(data)
+    if error:
+        raise OaiError(error.group(1).decode(), error.group(2).decode(errors="replace"))
+    match = _TOKEN_RE.search(data, max(0, len(data) - 4096)) or _TOKEN_RE.search(data)
+    if not match or not match.group(2) or not match.group(2).strip():
+        return None, None
+    size = re.search(rb'completeListSize="(\d+)"', match.group(1) or b"")
+    return html.unescape(match.group(2).strip().decode()), int(size.group(1)) if size else None
+
+
+class BackfillStore:
+    """
+    回填输出目录：batch-000001.jsonl.gz ... 与 checkpoint.json
+
+    检查点记录收割参数、下一批的 resumptionToken 与下一个分片编号，
+    只在对应分片完整写入后才更新。
+    """
+
+    def __init__(self, root=OAI_STORE_DIR):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.checkpoint_path = self.root / CHECKPOINT_NAME
+
+    def load_checkpoint(self):
+        if not self.checkpoint_path.exists():
+            return None
+        with open(self.checkpoint_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_checkpoint(self, checkpoint):
+        tmp = self.checkpoint_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.checkpoint_path)
+
+    def shard_path(self, index):
+        return self.root / f"batch-{index:06d}.jsonl.gz"
+
+    def write_shard(self, index, records):
+        path = self.shard_path(index)
+        tmp = path.with_name(path.name + ".tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        os.replace(tmp, path)
+
+    def shards(self):
+        return sorted(self.root.glob("batch-*.jsonl.gz"))
+
+    def iter_records(self):
+        """按分片顺序读出所有记录（同一篇可能因更新出现多次，后出现的更新）"""
+        for path in self.shards():
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    yield json.loads(line)
+
+
+def fetch_batch(endpoint, params):
+    response = get_client().get(endpoint, params=params, timeout=OAI_TIMEOUT)
+    response.raise_for_status()
+    return response.content
+
+
+def harvest(store, endpoint=OAI_ENDPOINT, oai_set=OAI_SET, date_from=None, date_until=None,
+            workers=PARSE_WORKERS, restart=False, max_batches=None):
+    """
+    收割到 store，返回本次写入的记录数
+
+    存在检查点且参数一致时从检查点继续；resumptionToken 过期时从头重新收割
+    （已写入的分片保留，导入时按 ID 覆盖）。
+    """
+    params = {"set": oai_set, "from": date_from, "until": date_until, "endpoint": endpoint}
+    checkpoint = None if restart else store.load_checkpoint()
+    if checkpoint and checkpoint.get("params") != params:
+        print("⚠️ 检查点的收割参数与本次不同，忽略检查点重新开始（使用 --restart 可清除提示）")
+        checkpoint = None
+    if checkpoint and checkpoint.get("done"):
+        print(f"✅ 检查点显示收割已完成（{checkpoint['records']} 条），如需重新收割请加 --restart")
+        return 0
+    if checkpoint is None:
+        # 新的收割接在已有分片之后编号，旧分片保留，导入时按 ID 覆盖
+        checkpoint = {"params": params, "token": None, "next_shard": len(store.shards()) + 1,
+                      "records": 0, "deleted": 0}
+    if checkpoint["token"]:
+        print(f"⏯️ 从检查点继续：第 {checkpoint['next_shard']} 批，已收割 {checkpoint['records']} 条")
+
+    def request_params(token):
+        if token:
+            return {"verb": "ListRecords", "resumptionToken": token}
+        first = {"verb": "ListRecords", "metadataPrefix": OAI_METADATA_PREFIX}
+        if oai_set:
+            first["set"] = oai_set
+        if date_from:
+            first["from"] = date_from
+        if date_until:
+            first["until"] = date_until
+        return first
+
+    written = 0
+    pending = []  # [(分片编号, 下一批 token, future)]，按顺序落盘
+    token = checkpoint["token"]
+    batches = 0
+    started = checkpoint["token"] is None
+
+    def flush(limit, salvage=False):
+        """
+        按顺序落盘：超出 limit 的批次等待解析完成，队首已解析完的批次也随即落盘
+
+        salvage=True（中断或出错时）遇到解析失败的批次即停止，不再抛出新的异常。
+        """
+        nonlocal written
+        while pending and (len(pending) > limit or pending[0][2].done()):
+            index, next_token, future = pending[0]
+            try:
+                records, deleted = future.result()
+            except BaseException:
+                if salvage:
+                    return
+                raise
+            pending.pop(0)
+            store.write_shard(index, records)
+            checkpoint.update(token=next_token, next_shard=index + 1, done=next_token is None)
+            checkpoint["records"] += len(records)
+            checkpoint["deleted"] += deleted
+            store.save_checkpoint(checkpoint)
+            written += len(records)
+            print(f"  💾 第 {index} 批：{len(records)} 条（删除 {deleted}），累计 {checkpoint['records']} 条")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        index = checkpoint["next_shard"]
+        try:
+            while True:
+                try:
+                    data = fetch_batch(endpoint, request_params(token))
+                    next_token, total = scan_batch(data)
+                except OaiError as e:
+                    if e.code == "noRecordsMatch":
+                        print("ℹ️ 没有符合条件的记录")
+                        checkpoint.update(token=None, done=True)
+                        break
+                    if e.code == "badResumptionToken" and not started:
+                        print("⚠️ resumptionToken 已失效，从头重新收割")
+                        flush(0)
+                        token, started = None, True
+                        checkpoint["token"] = None
+                        continue
+                    raise
+                started = True
+                if total and batches == 0:
+                    print(f"📚 列表总数约 {total} 条")
+                pending.append((index, next_token, pool.submit(parse_batch, data)))
+                flush(workers * 2)
+                index += 1
+                batches += 1
+                token = next_token
+                if token is None or (max_batches and batches >= max_batches):
+                    break
+        except BaseException:
+            # 中断或网络错误：已下载的批次先按顺序落盘并推进检查点，再把异常抛出
+            flush(0, salvage=True)
+            raise
+        flush(0)
+    store.save_checkpoint(checkpoint)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="arXiv OAI-PMH 历史回填")
+    parser.add_argument("--endpoint", default=OAI_ENDPOINT, help=f"OAI-PMH 端点 (默认: {OAI_ENDPOINT})")
+    parser.add_argument("--set", dest="oai_set", default=OAI_SET, help=f"OAI set (默认: {OAI_SET})")
+    parser.add_argument("--from", dest="date_from", help="起始日期 YYYY-MM-DD")
+    parser.add_argument("--until", dest="date_until", help="截止日期 YYYY-MM-DD")
+    parser.add_argument("--store", default=str(OAI_STORE_DIR), help="输出目录")
+    parser.add_argument("--workers", type=int, default=PARSE_WORKERS, help="解析进程数")
+    parser.add_argument("--max-batches", type=int, help="本次最多收割的批数（便于分段运行）")
+    parser.add_argument("--restart", action="store_true", help="忽略检查点从头开始")
+    args = parser.parse_args()
+
+    store = BackfillStore(args.store)
+    print(f"🚀 OAI-PMH 回填：{args.endpoint} set={args.oai_set} from={args.date_from} until={args.date_until}")
+    try:
+        written = harvest(store, args.endpoint, args.oai_set, args.date_from, args.date_until,
+                          workers=args.workers, restart=args.restart, max_batches=args.max_batches)
+    except KeyboardInterrupt:
+        print("\n⏸️ 已中断，重新运行同样的命令即可从检查点继续")
+        sys.exit(130)
+    except OaiError as e:
+        print(f"❌ OAI-PMH 错误 {e}")
+        sys.exit(1)
+    print(f"✅ 本次写入 {written} 条，输出目录 {store.root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地 OAI-PMH 替身服务器（供 oai_backfill 离线测试）
+✅ ListRecords + resumptionToken 分页，返回 arXiv 元数据格式的合成记录（含已删除记录）
+✅ 未知 token 返回 badResumptionToken，无记录时返回 noRecordsMatch
+✅ 可指定某些分页在第一次请求时返回 HTTP 500，模拟收割中途断网
+
+用法：
+    python oai_standin.py --records 1000 --page-size 100 --port 8000
+    python oai_backfill.py --endpoint http://127.0.0.1:8000/oai --store /tmp/oai_store
+"""
+
+import argparse
+import threading
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+DELETED_EVERY = 17  # 每 17 条中有 1 条为已删除记录
+
+
+def standin_record(i):
+    """第 i 条合成记录的 <record> XML"""
+    arxiv_id = f"2101.{i:05d}"
+    datestamp = f"2021-01-{1 + i % 28:02d}"
+    if i % DELETED_EVERY == DELETED_EVERY - 1:
+        return (f'<record><header status="deleted"><identifier>oai:arXiv.org:{arxiv_id}</identifier>'
+                f"<datestamp>{datestamp}</datestamp></header></record>")
+    return (
+        f"<record><header><identifier>oai:arXiv.org:{arxiv_id}</identifier>"
+        f"<datestamp>{datestamp}</datestamp><setSpec>physics:cond-mat</setSpec></header>"
+        f'<metadata><arXiv xmlns="http://arxiv.org/OAI/arXiv/">'
+        f"<id>{arxiv_id}</id><created>{datestamp}</created>"
+        f"<authors><author><keyname>Author{i % 50}</keyname><forenames>A.</forenames></author></authors>"
+        f"<title>Synthetic kagome paper {i}</title><categories>cond-mat.str-el</categories>"
+        f"<abstract>{escape(f'Abstract of synthetic paper {i} on frustrated magnets & spin liquids.')}</abstract>"
+        f"</arXiv></metadata></record>"
+    )
+
+
+class OaiStandin:
+    """
+    records: 合成记录总数；page_size: 每批条数；fail_pages: 第一次请求时返回 HTTP 500 的分页编号（从 0 开始）
+
+    start() 在后台线程启动并返回端点 URL，stop() 关闭。requests 记录每次请求的分页编号。
+    """
+
+    def __init__(self, records=1000, page_size=100, fail_pages=(), host="127.0.0.1", port=0):
+        self.records = records
+        self.page_size = page_size
+        self.fail_pages = set(fail_pages)
+        self.requests = []
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/oai"
+
+    def _page(self, page):
+        start = page * self.page_size
+        body = "".join(standin_record(i) for i in range(start, min(start + self.page_size, self.records)))
+        token = f"page-{page + 1}" if start + self.page_size < self.records else ""
+        return (f"<ListRecords>{body}<resumptionToken completeListSize=\"{self.records}\" "
+                f"cursor=\"{start}\">{token}</resumptionToken></ListRecords>")
+
+    def respond(self, query):
+        """返回 (HTTP 状态码, 响应正文)"""
+        verb = query.get("verb", [""])[0]
+        token = query.get("resumptionToken", [None])[0]
+        if verb != "ListRecords":
+            body = f'<error code="badVerb">{escape(verb)}</error>'
+        elif token is None and not self.records:
+            body = '<error code="noRecordsMatch">no records</error>'
+        elif token is not None and not (token.startswith("page-") and token[5:].isdigit()
+                                        and int(token[5:]) * self.page_size < self.records):
+            body = f'<error code="badResumptionToken">{escape(token)}</error>'
+        else:
+            page = int(token[5:]) if token else 0
+            self.requests.append(page)
+            if page in self.fail_pages:
+                self.fail_pages.discard(page)
+                return 500, "temporary failure"
+            body = self._page(page)
+        return 200, ('<?xml version="1.0" encoding="UTF-8"?>'
+                     f'<OAI-PMH xmlns="http://www.openarchives.org/OAI/2.0/">{body}</OAI-PMH>')
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                status, body = standin.respond(parse_qs(urlsplit(self.path).query))
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/xml; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="oai-standin", daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地 OAI-PMH 替身服务器")
+    parser.add_argument("--records", type=int, default=1000, help="合成记录数 (默认: 1000)")
+    parser.add_argument("--page-size", type=int, default=100, help="每批条数 (默认: 100)")
+    parser.add_argument("--fail-page", type=int, action="append", default=[], help="第一次请求返回 500 的分页")
+    parser.add_argument("--port", type=int, default=8000, help="端口 (默认: 8000)")
+    args = parser.parse_args()
+
+    standin = OaiStandin(args.records, args.page_size, args.fail_page, port=args.port)
+    print(f"🧪 OAI 替身服务器：{standin.url}（{args.records} 条，每批 {args.page_size} 条）")
+    try:
+        standin._server.serve_forever()
+    except KeyboardInterrupt:
+        standin._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+持久化通知发件箱
+✅ 采集阶段只负责入队，投递由后台线程异步完成
+✅ 幂等键去重，失败按指数退避（带抖动）重试
+✅ 超过最大重试次数写入死信文件
+✅ 只有真正投递成功的消息，其中的论文才会被标记为已推送（以发件箱中的 delivered 记录为准，
+   上次运行结束后才投递成功的消息，下次启动时补记）
+
+单独运行时补发积压消息：
+    python outbox.py
+"""
+
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+OUTBOX_PATH = Path(__file__).parent / "outbox.sqlite3"
+DEAD_LETTER_PATH = Path(__file__).parent / "outbox_dead_letter.jsonl"
+MAX_ATTEMPTS = 8
+BACKOFF_BASE = 2.0       # 秒
+BACKOFF_MAX = 3600.0     # 秒
+
+PENDING, DELIVERED, DEAD = "pending", "delivered", "dead"
+
+# 入队时为每篇论文保留的字段（足够在投递后写入已推送记录并做去重）
+PAPER_FIELDS = ("id", "version", "doi", "title", "summary", "link")
+
+
+def outbox_paper(paper):
+    return {k: paper.get(k) for k in PAPER_FIELDS}
+
+
+def idempotency_key(payload, day=None):
+    """同一天内内容相同的消息视为同一条"""
+    day = day or datetime.now().strftime("%Y-%m-%d")
+    raw = day + "\n" + json.dumps(payload, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def backoff_delay(attempts):
+    """第 attempts 次失败后的等待时间：指数增长、封顶，并加 ±50% 抖动"""
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** (attempts - 1)))
+    return delay * random.uniform(0.5, 1.5)
+
+
+class Outbox:
+    def __init__(self, path=OUTBOX_PATH, dead_letter_path=DEAD_LETTER_PATH, max_attempts=MAX_ATTEMPTS):
+        self.path = Path(path)
+        self.dead_letter_path = Path(dead_letter_path)
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS messages (
+                key TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                papers TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                last_error TEXT,
+                created_at REAL NOT NULL,
+                delivered_at REAL,
+                recorded INTEGER NOT NULL DEFAULT 0
+            )"""
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(messages)")}
+        if "recorded" not in columns:
+            # 旧版发件箱：已投递的消息全部重新补记一次（写入已推送记录是幂等的）
+            self._db.execute("ALTER TABLE messages ADD COLUMN recorded INTEGER NOT NULL DEFAULT 0")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_messages_due ON messages(status, next_attempt_at)")
+        self._db.commit()
+
+    def enqueue(self, payload, papers=(), key=None):
+        """入队一条消息；幂等键已存在时忽略，返回是否为新消息"""
+        key = key or idempotency_key(payload)
+        now = time.time()
+        with self._lock:
+            cur = self._db.execute(
+                "INSERT OR IGNORE INTO messages (key, payload, papers, status, next_attempt_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, json.dumps(payload, ensure_ascii=False),
+                 json.dumps([outbox_paper(p) for p in papers], ensure_ascii=False), PENDING, now, now),
+            )
+            self._db.commit()
+            return cur.rowcount == 1
+
+    def due(self, now=None, limit=20):
+        """到期待投递的消息：[(key, payload, papers, attempts)]"""
+        now = now or time.time()
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key, payload, papers, attempts FROM messages "
+                "WHERE status = ? AND next_attempt_at <= ? ORDER BY created_at LIMIT ?",
+                (PENDING, now, limit),
+            ).fetchall()
+        return [(key, json.loads(payload), json.loads(papers), attempts) for key, payload, papers, attempts in rows]
+
+    def next_due_at(self):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT MIN(next_attempt_at) FROM messages WHERE status = ?", (PENDING,)
+            ).fetchone()
+        return row[0]
+
+    def pending_papers(self):
+        """仍在发件箱中（待投递）的论文，采集时应视为已占用"""
+        with self._lock:
+            rows = self._db.execute("SELECT papers FROM messages WHERE status = ?", (PENDING,)).fetchall()
+        return [p for (papers,) in rows for p in json.loads(papers)]
+
+    def mark_delivered(self, key):
+        with self._lock:
+            self._db.execute(
+                "UPDATE messages SET status = ?, attempts = attempts + 1, delivered_at = ?, last_error = NULL "
+                "WHERE key = ?",
+                (DELIVERED, time.time(), key),
+            )
+            self._db.commit()
+
+    def unrecorded(self):
+        """已投递、但论文尚未写入已推送记录的消息：[(key, papers)]"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key, papers FROM messages WHERE status = ? AND recorded = 0 ORDER BY delivered_at",
+                (DELIVERED,),
+            ).fetchall()
+        return [(key, json.loads(papers)) for key, papers in rows]
+
+    def mark_recorded(self, keys):
+        with self._lock:
+            self._db.executemany("UPDATE messages SET recorded = 1 WHERE key = ?", [(key,) for key in keys])
+            self._db.commit()
+
+    def mark_failed(self, key, error):
+        """记录一次失败；超过最大次数时转入死信，返回是否已进入死信"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT payload, papers, attempts FROM messages WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return False
+            payload, papers, attempts = row
+            attempts += 1
+            if attempts >= self.max_attempts:
+                self._db.execute(
+                    "UPDATE messages SET status = ?, attempts = ?, last_error = ? WHERE key = ?",
+                    (DEAD, attempts, error, key),
+                )
+                with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({
+                        "key": key,
+                        "payload": json.loads(payload),
+                        "papers": json.loads(papers),
+                        "attempts": attempts,
+                        "last_error": error,
+                        "dead_at": datetime.now().astimezone().isoformat(timespec="seconds"),
+                    }, ensure_ascii=False) + "\n")
+                dead = True
+            else:
+                self._db.execute(
+                    "UPDATE messages SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE key = ?",
+                    (attempts, time.time() + backoff_delay(attempts), error, key),
+                )
+                dead = False
+            self._db.commit()
+            return dead
+
+    def counts(self):
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM messages GROUP BY status").fetchall()
+        return dict(rows)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def record_delivered(outbox, dedup):
+    """
+    把已投递消息中的论文写入已推送记录，返回论文篇数
+
+    以发件箱中的 delivered 状态为准，而不是投递线程的内存列表：线程在等待超时后仍可能投递成功，
+    这些消息由下一次调用补记。已推送记录落盘后才标记为已记录，中途崩溃时下次重新写入（幂等）。
+    """
+    messages = outbox.unrecorded()
+    if not messages:
+        return 0
+    count = 0
+    for _key, papers in messages:
+        for p in papers:
+            dedup.mark_sent(p)
+            count += 1
+    if hasattr(dedup.seen, "flush"):
+        dedup.seen.flush()
+    dedup.save()
+    outbox.mark_recorded([key for key, _papers in messages])
+    return count
+
+
+class DeliveryWorker:
+    """
+    后台投递线程
+
+    send(payload) -> bool 负责真正发送（签名应在发送时生成）；
+    投递成功的消息在发件箱中标记为 delivered，其中的论文由 record_delivered 写入已推送记录。
+    """
+
+    def __init__(self, outbox, send, poll_interval=1.0):
+        self.outbox = outbox
+        self.send = send
+        self.poll_interval = poll_interval
+        self.delivered = 0
+        self.failed = 0
+        self.dead = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="outbox-delivery", daemon=True)
+
+    def drain_once(self):
+        """投递当前所有到期消息，返回处理条数"""
+        batch = self.outbox.due()
+        for key, payload, _papers, _attempts in batch:
+            try:
+                ok = self.send(payload)
+                error = None if ok else "发送失败"
+            except Exception as e:
+                ok, error = False, str(e)
+            if ok:
+                self.outbox.mark_delivered(key)
+                self.delivered += 1
+            elif self.outbox.mark_failed(key, error):
+                self.dead += 1
+                print(f"☠️ 消息 {key[:8]} 重试次数用尽，已写入死信文件")
+            else:
+                self.failed += 1
+        return len(batch)
+
+    def _run(self):
+        while True:
+            processed = self.drain_once()
+            if processed:
+                continue
+            if self._stop.is_set():
+                return
+            self._stop.wait(self.poll_interval)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=60):
+        """
+        通知线程在当前到期消息投递完后退出，最多等待 timeout 秒
+
+        仍在退避中的消息保留在发件箱，由下一次运行继续投递。
+        """
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            next_due = self.outbox.next_due_at()
+            if next_due is None or next_due > deadline:
+                break
+            time.sleep(min(self.poll_interval, max(0.0, deadline - time.time())))
+        self._stop.set()
+        self._thread.join(max(0.0, deadline - time.time()) + self.poll_interval)
+
+    def summary(self):
+        return f"投递成功 {self.delivered} 条，失败待重试 {self.failed} 次，进入死信 {self.dead} 条"
+
+
+if __name__ == "__main__":
+    from dedup import Deduplicator
+    from feishu_notify import post_webhook
+    from seen_store import SeenStore
+
+    webhook = os.getenv("FEISHU_WEBHOOK_URL")
+    if not webhook:
+        print("❌ 错误：未设置环境变量 FEISHU_WEBHOOK_URL")
+        sys.exit(1)
+    outbox = Outbox()
+    print(f"📮 发件箱状态：{outbox.counts()}")
+    worker = DeliveryWorker(outbox, lambda payload: post_webhook(webhook, payload, os.getenv("FEISHU_SECRET")))
+    worker.drain_once()
+    recorded = record_delivered(outbox, Deduplicator(SeenStore()))
+    print(f"✅ {worker.summary()}；写入已推送记录 {recorded} 篇")
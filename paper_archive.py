@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地论文库（SQLite，WAL 模式）
+✅ 归一化记录：ID、版本、标题、摘要、作者、分类、日期、来源、主题标签、制备方法、译文
+✅ 按 ID upsert，批量写入在单个事务中完成
+✅ 记录每天日报包含的论文，重新渲染 / 重新发送某一天只需本地查询
+✅ FTS5 全文索引（标题 / 摘要 / 作者）由触发器自动维护，检索见 paper_search.py
+
+用法：
+    python paper_archive.py stats
+    python paper_archive.py show 2024-09-30
+    python paper_archive.py resend 2024-09-30
+    python paper_archive.py import-oai ./oai_store
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+PAPER_ARCHIVE_PATH = Path(os.getenv("PAPER_ARCHIVE_PATH", Path(__file__).parent / "papers.sqlite3"))
+UPSERT_BATCH_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS papers (
+    id TEXT PRIMARY KEY,
+    version INTEGER,
+    doi TEXT,
+    title TEXT NOT NULL,
+    summary TEXT NOT NULL DEFAULT '',
+    authors TEXT NOT NULL DEFAULT '[]',
+    categories TEXT NOT NULL DEFAULT '[]',
+    primary_category TEXT,
+    link TEXT,
+    pdf_url TEXT,
+    published TEXT,
+    updated TEXT,
+    source TEXT NOT NULL,
+    methods TEXT,
+    translation TEXT,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_papers_published ON papers(published);
+CREATE INDEX IF NOT EXISTS idx_papers_source ON papers(source, published);
+CREATE TABLE IF NOT EXISTS paper_topics (
+    paper_id TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    PRIMARY KEY (paper_id, topic)
+);
+CREATE INDEX IF NOT EXISTS idx_paper_topics_topic ON paper_topics(topic);
+CREATE TRIGGER IF NOT EXISTS papers_fts_ai AFTER INSERT ON papers BEGIN
+    INSERT INTO papers_fts(rowid, title, summary, authors) VALUES (new.rowid, new.title, new.summary, new.authors);
+END;
+CREATE TRIGGER IF NOT EXISTS papers_fts_ad AFTER DELETE ON papers BEGIN
+    INSERT INTO papers_fts(papers_fts, rowid, title, summary, authors)
+    VALUES ('delete', old.rowid, old.title, old.summary, old.authors);
+END;
+CREATE TRIGGER IF NOT EXISTS papers_fts_au AFTER UPDATE OF title, summary, authors ON papers BEGIN
+    INSERT INTO papers_fts(papers_fts, rowid, title, summary, authors)
+    VALUES ('delete', old.rowid, old.title, old.summary, old.authors);
+    INSERT INTO papers_fts(rowid, title, summary, authors) VALUES (new.rowid, new.title, new.summary, new.authors);
+END;
+-- 标题 / 摘要实际改变（如 arXiv 新版本）时记一条，供推荐索引增量重建对应的行
+CREATE TABLE IF NOT EXISTS text_changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    paper_id TEXT NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS papers_text_au AFTER UPDATE OF title, summary ON papers
+WHEN old.title != new.title OR old.summary != new.summary BEGIN
+    INSERT INTO text_changes(paper_id) VALUES (new.id);
+END;
+CREATE TABLE IF NOT EXISTS digests (
+    day TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    paper_id TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (day, paper_id)
+);
+"""
+
+# 外部内容表：索引只存倒排表，正文仍在 papers 中
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+    title, summary, authors,
+    content='papers', content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+# 新值为空时保留旧值；版本号取较大者
+UPSERT_SQL = """
+INSERT INTO papers (id, version, doi, title, summary, authors, categories, primary_category, link, pdf_url,
+                    published, updated, source, methods, translation, first_seen, last_seen)
+VALUES (:id, :version, :doi, :title, :summary, :authors, :categories, :primary_category, :link, :pdf_url,
+        :published, :updated, :source, :methods, :translation, :now, :now)
+ON CONFLICT(id) DO UPDATE SET
+    version = MAX(COALESCE(excluded.version, 0), COALESCE(papers.version, 0)),
+    doi = COALESCE(excluded.doi, papers.doi),
+    title = excluded.title,
+    summary = CASE WHEN excluded.summary != '' THEN excluded.summary ELSE papers.summary END,
+    authors = CASE WHEN excluded.authors != '[]' THEN excluded.authors ELSE papers.authors END,
+    categories = CASE WHEN excluded.categories != '[]' THEN excluded.categories ELSE papers.categories END,
+    primary_category = COALESCE(excluded.primary_category, papers.primary_category),
+    link = COALESCE(excluded.link, papers.link),
+    pdf_url = COALESCE(excluded.pdf_url, papers.pdf_url),
+    published = COALESCE(papers.published, excluded.published),
+    updated = COALESCE(excluded.updated, papers.updated),
+    methods = COALESCE(excluded.methods, papers.methods),
+    translation = COALESCE(excluded.translation, papers.translation),
+    last_seen = excluded.last_seen
+"""
+
+PAPER_COLUMNS = ("id", "version", "doi", "title", "summary", "authors", "categories", "primary_category",
+                 "link", "pdf_url", "published", "updated", "source", "methods", "translation")
+
+
+def _iso(value):
+    if value is None or isinstance(value, str):
+        return value or None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat(timespec="seconds")
+
+
+def _source(paper):
+    return paper["id"].split(":", 1)[0] if ":" in paper["id"] else "unknown"
+
+
+def paper_row(paper, now):
+    """论文字典 -> upsert 参数（列表字段存为 JSON）"""
+    methods = paper.get("methods")
+    return {
+        "id": paper["id"],
+        "version": paper.get("version"),
+        "doi": paper.get("doi"),
+        "title": paper.get("title", ""),
+        "summary": paper.get("summary") or "",
+        "authors": json.dumps(paper.get("authors") or [], ensure_ascii=False),
+        "categories": json.dumps(paper.get("categories") or [], ensure_ascii=False),
+        "primary_category": paper.get("primary_category"),
+        "link": paper.get("link"),
+        "pdf_url": paper.get("pdf_url") or None,
+        "published": _iso(paper.get("published")),
+        "updated": _iso(paper.get("updated")),
+        "source": paper.get("source") or _source(paper),
+        "methods": json.dumps(methods, ensure_ascii=False) if methods is not None else None,
+        "translation": paper.get("processed_summary"),
+        "now": now,
+    }
+
+
+def row_to_paper(row):
+    """数据库行 -> 与采集阶段一致的论文字典（published 为带时区的 datetime）"""
+    paper = dict(zip(PAPER_COLUMNS, row))
+    paper["authors"] = json.loads(paper["authors"])
+    paper["categories"] = json.loads(paper["categories"])
+    for key in ("published", "updated"):
+        if paper[key]:
+            paper[key] = datetime.fromisoformat(paper[key])
+    if paper["methods"] is not None:
+        paper["methods"] = json.loads(paper["methods"])
+    else:
+        del paper["methods"]
+    paper["processed_summary"] = paper.pop("translation")
+    return paper
+
+
+class PaperArchive:
+    def __init__(self, path=PAPER_ARCHIVE_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        has_fts = self._db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'papers_fts'"
+        ).fetchone()
+        self._db.executescript(FTS_SCHEMA + SCHEMA)
+        if not has_fts:
+            # 旧库首次打开时为已有论文建立索引
+            self._db.execute("INSERT INTO papers_fts(papers_fts) VALUES ('rebuild')")
+        self._db.commit()
+
+    def upsert_papers(self, papers, topics=None, batch_size=UPSERT_BATCH_SIZE):
+        """
+        批量 upsert，返回写入条数
+
+        topics: 可选的 {论文 ID: [主题, ...]}，追加到 paper_topics
+        """
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        count = 0
+        batch = []
+        with self._lock:
+            for paper in papers:
+                batch.append(paper_row(paper, now))
+                if len(batch) >= batch_size:
+                    count += self._write(batch, topics)
+                    batch = []
+            if batch:
+                count += self._write(batch, topics)
+        return count
+
+    def _write(self, rows, topics):
+        with self._db:  # 单个事务
+            self._db.executemany(UPSERT_SQL, rows)
+            if topics:
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO paper_topics VALUES (?, ?)",
+                    [(row["id"], topic) for row in rows for topic in topics.get(row["id"], ())],
+                )
+        return len(rows)
+
+    def record_digest(self, day, papers):
+        """记录某天日报包含的论文（按顺序，带主题标签），并写入译文等最新字段"""
+        self.upsert_papers(papers, topics={p["id"]: [p["tag"]] for p in papers if p.get("tag")})
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM digests WHERE day = ?", (day,))
+            self._db.executemany(
+                "INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?)",
+                [(day, i, p["id"], p.get("tag", "")) for i, p in enumerate(papers)],
+            )
+
+    def _select(self, where, params):
+        cols = ", ".join(f"p.{c}" for c in PAPER_COLUMNS)
+        with self._lock:
+            return self._db.execute(f"SELECT {cols} FROM papers p {where}", params).fetchall()
+
+    def get(self, paper_id):
+        rows = self._select("WHERE p.id = ?", (paper_id,))
+        return row_to_paper(rows[0]) if rows else None
+
+    def digest_papers(self, day):
+        """某天日报中的论文，顺序与标签与当天一致"""
+        cols = ", ".join(f"p.{c}" for c in PAPER_COLUMNS)
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {cols}, d.tag FROM digests d JOIN papers p ON p.id = d.paper_id "
+                "WHERE d.day = ? ORDER BY d.position",
+                (day,),
+            ).fetchall()
+        papers = []
+        for row in rows:
+            paper = row_to_paper(row[:-1])
+            paper["tag"] = row[-1]
+            papers.append(paper)
+        return papers
+
+    def papers_between(self, since, until=None, topic=None, source=None):
+        """按发表时间区间（含主题 / 来源过滤）查询，最新的在前"""
+        where = ["p.published >= ?"]
+        params = [_iso(since)]
+        if until is not None:
+            where.append("p.published < ?")
+            params.append(_iso(until))
+        if source:
+            where.append("p.source = ?")
+            params.append(source)
+        if topic:
+            where.append("p.id IN (SELECT paper_id FROM paper_topics WHERE topic = ?)")
+            params.append(topic)
+        rows = self._select("WHERE " + " AND ".join(where) + " ORDER BY p.published DESC", params)
+        return [row_to_paper(r) for r in rows]
+
+    def search(self, match, since=None, until=None, limit=20, weights=(10.0, 1.0, 3.0)):
+        """
+        FTS5 检索，返回 [(论文, 摘要片段, bm25 分数)]，按相关度排序
+
+        match 为 FTS5 查询表达式（由 paper_search.parse_search_query 生成）；
+        weights 依次为标题、摘要、作者的 bm25 权重。
+        """
+        where = ["papers_fts MATCH ?"]
+        params = [match]
+        if since is not None:
+            where.append("p.published >= ?")
+            params.append(_iso(since))
+        if until is not None:
+            where.append("p.published < ?")
+            params.append(_iso(until))
+        bm25 = "bm25(papers_fts, {:f}, {:f}, {:f})".format(*weights)
+        cols = ", ".join(f"p.{c}" for c in PAPER_COLUMNS)
+        sql = (
+            f"SELECT {cols}, snippet(papers_fts, 1, '[', ']', '…', 16), {bm25} AS score "
+            "FROM papers_fts JOIN papers p ON p.rowid = papers_fts.rowid "
+            f"WHERE {' AND '.join(where)} ORDER BY score LIMIT ?"
+        )
+        with self._lock:
+            rows = self._db.execute(sql, params + [limit]).fetchall()
+        return [(row_to_paper(r[:-2]), r[-2], r[-1]) for r in rows]
+
+    def iter_texts(self, after_rowid=0, batch_size=2000):
+        """按入库顺序逐批产出 (rowid, ID, 标题, 摘要)，只取 rowid 大于 after_rowid 的论文（供增量建索引）"""
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    "SELECT rowid, id, title, summary FROM papers WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    (after_rowid, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            yield from rows
+            after_rowid = rows[-1][0]
+
+    def iter_text_changes(self, after_seq=0):
+        """产出 seq 大于 after_seq 的文本变更 (seq, ID, 当前标题, 当前摘要)，按变更顺序"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT c.seq, p.id, p.title, p.summary FROM text_changes c JOIN papers p ON p.id = c.paper_id "
+                "WHERE c.seq > ? ORDER BY c.seq",
+                (after_seq,),
+            ).fetchall()
+        yield from rows
+
+    def digest_days(self):
+        with self._lock:
+            return self._db.execute(
+                "SELECT day, COUNT(*) FROM digests GROUP BY day ORDER BY day DESC"
+            ).fetchall()
+
+    def stats(self):
+        with self._lock:
+            total = self._db.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+            by_source = dict(self._db.execute("SELECT source, COUNT(*) FROM papers GROUP BY source").fetchall())
+            translated = self._db.execute("SELECT COUNT(*) FROM papers WHERE translation IS NOT NULL").fetchone()[0]
+        return {"papers": total, "by_source": by_source, "translated": translated}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def import_oai_store(archive, store_dir):
+    """把 oai_backfill 的分片导入论文库，返回导入条数"""
+    from oai_backfill import BackfillStore
+
+    def records():
+        for record in BackfillStore(store_dir).iter_records():
+            created = record.get("created")
+            yield dict(
+                record,
+                source="arxiv",
+                link="https://arxiv.org/abs/" + record["id"].split(":", 1)[1],
+                primary_category=(record.get("categories") or [None])[0],
+                published=created + "T00:00:00+00:00" if created else None,
+                updated=record["updated"] + "T00:00:00+00:00" if record.get("updated") else None,
+            )
+
+    return archive.upsert_papers(records())
+
+
+# ==================== 命令行 ====================
+def main():
+    parser = argparse.ArgumentParser(description="本地论文库")
+    parser.add_argument("--db", default=str(PAPER_ARCHIVE_PATH), help="数据库路径")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="统计信息与日报日期")
+    show = sub.add_parser("show", help="重新渲染某天的日报（只打印）")
+    show.add_argument("day", help="YYYY-MM-DD")
+    resend = sub.add_parser("resend", help="把某天的日报重新放入发件箱并投递")
+    resend.add_argument("day", help="YYYY-MM-DD")
+    oai = sub.add_parser("import-oai", help="导入 oai_backfill 的输出目录")
+    oai.add_argument("store", help="oai_backfill 输出目录")
+    args = parser.parse_args()
+
+    archive = PaperArchive(args.db)
+    if args.command == "stats":
+        print(f"📚 {archive.stats()}")
+        for day, n in archive.digest_days()[:30]:
+            print(f"  {day}: {n} 篇")
+    elif args.command == "import-oai":
+        print(f"✅ 已导入 {import_oai_store(archive, args.store)} 条")
+    else:
+        from feishu_notify import build_digest_messages
+
+        papers = archive.digest_papers(args.day)
+        if not papers:
+            print(f"❌ 论文库中没有 {args.day} 的日报")
+            sys.exit(1)
+        title = f"📚 论文日报 {args.day}：{len(papers)} 篇（重发）"
+        messages = build_digest_messages(papers, title)
+        if args.command == "show":
+            for card, _ in messages:
+                print(json.dumps(card, ensure_ascii=False, indent=2))
+            return
+        webhook = os.getenv("FEISHU_WEBHOOK_URL")
+        if not webhook:
+            print("❌ 错误：未设置环境变量 FEISHU_WEBHOOK_URL")
+            sys.exit(1)
+        from dedup import Deduplicator
+        from feishu_notify import post_webhook
+        from outbox import DeliveryWorker, Outbox, record_delivered
+        from seen_store import SeenStore
+
+        outbox = Outbox()
+        for card, in_card in messages:
+            outbox.enqueue(card, in_card)
+        worker = DeliveryWorker(outbox, lambda payload: post_webhook(webhook, payload, os.getenv("FEISHU_SECRET")))
+        # 发件箱中其他到期消息（如积压的日报）也会一并投递，其中的论文同样写入已推送记录
+        worker.drain_once()
+        recorded = record_delivered(outbox, Deduplicator(SeenStore()))
+        print(f"📮 {worker.summary()}；写入已推送记录 {recorded} 篇")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地论文库离线全文检索（SQLite FTS5 倒排索引）
+✅ 查询语法沿用 arXiv：ti: / abs: / au: / all: 字段前缀、"短语"、前缀通配 word*
+✅ AND（默认）/ OR / ANDNOT 与括号
+✅ 发表日期区间过滤，BM25 排序（标题权重最高）
+✅ 不联网，多年 cond-mat 论文库上查询为毫秒级
+
+用法：
+    python paper_search.py Na2Co2TeO6 --since 2024-07-01
+    python paper_search.py 'ti:kagome abs:"spin liquid"' --days 90
+    python paper_search.py 'au:Balents AND (abs:kitaev OR abs:"honeycomb iridate")' --limit 50
+"""
+
+import argparse
+import re
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from paper_archive import PAPER_ARCHIVE_PATH, PaperArchive
+
+# arXiv 字段前缀 -> FTS5 列；all 不限列
+FIELD_COLUMNS = {"ti": "title", "abs": "summary", "au": "authors", "all": None}
+OPERATORS = {"AND": "AND", "OR": "OR", "ANDNOT": "NOT", "NOT": "NOT"}
+
+_TOKEN_RE = re.compile(r'\s*(?:([()])|(?:(\w+):)?(?:"([^"]*)"|([^\s()"]+)))')
+
+
+def _quote(text):
+    return '"' + text.replace('"', '""') + '"'
+
+
+def parse_search_query(query_str):
+    """
+    把 arXiv 风格的查询转换为 FTS5 MATCH 表达式
+
+    每个词都加引号交给分词器处理，化学式、连字符等不会被当作 FTS5 语法；
+    未知的字段前缀按普通词处理。语法错误抛出 ValueError。
+    """
+    parts = []
+    expect_term = True  # 当前位置是否需要一个词（开头、运算符或左括号之后）
+    depth = 0
+    pos = 0
+    query_str = query_str.strip()
+    while pos < len(query_str):
+        match = _TOKEN_RE.match(query_str, pos)
+        if not match or match.end() == pos:
+            raise ValueError(f"无法解析查询: {query_str[pos:]}")
+        pos = match.end()
+        paren, field, phrase, word = match.groups()
+        if paren == "(":
+            if not expect_term:
+                parts.append("AND")
+            parts.append("(")
+            depth += 1
+            expect_term = True
+            continue
+        if paren == ")":
+            if expect_term or depth == 0:
+                raise ValueError(f"括号不匹配: {query_str}")
+            parts.append(")")
+            depth -= 1
+            continue
+        if field is None and phrase is None and word in OPERATORS:
+            if expect_term:
+                raise ValueError(f"运算符 {word} 缺少左侧的查询词: {query_str}")
+            parts.append(OPERATORS[word])
+            expect_term = True
+            continue
+        if field is not None and field.lower() not in FIELD_COLUMNS:
+            word = f"{field}:{word}" if phrase is None else word
+            field = None
+        prefix = phrase is None and word.endswith("*") and len(word) > 1
+        text = phrase if phrase is not None else word.rstrip("*") if prefix else word
+        if not re.search(r"\w", text):
+            continue
+        term = _quote(text) + ("*" if prefix else "")
+        column = FIELD_COLUMNS.get(field.lower()) if field else None
+        if not expect_term:
+            parts.append("AND")
+        parts.append(f"{column} : {term}" if column else term)
+        expect_term = False
+    if depth or (parts and expect_term):
+        raise ValueError(f"查询不完整: {query_str}")
+    if not parts:
+        raise ValueError("查询为空")
+    return " ".join(parts)
+
+
+def parse_day(text):
+    return datetime.strptime(text, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+
+
+def search(archive, query_str, since=None, until=None, limit=20):
+    """返回 ([(论文, 摘要片段, bm25 分数)], 耗时毫秒)"""
+    match = parse_search_query(query_str)
+    start = time.perf_counter()
+    try:
+        hits = archive.search(match, since=since, until=until, limit=limit)
+    except sqlite3.OperationalError as e:
+        raise ValueError(f"FTS5 无法执行查询 {match}: {e}") from e
+    return hits, (time.perf_counter() - start) * 1000
+
+
+def format_hit(rank, paper, snippet):
+    published = paper["published"].strftime("%Y-%m-%d") if paper.get("published") else "----------"
+    authors = paper["authors"][:3]
+    if len(paper["authors"]) > 3:
+        authors.append("et al.")
+    return (
+        f"{rank:>3}. [{published}] {paper['id']}\n"
+        f"     {paper['title']}\n"
+        f"     👥 {', '.join(authors)}\n"
+        f"     {snippet}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地论文库全文检索")
+    parser.add_argument("query", help='查询，如 \'ti:kagome abs:"spin liquid"\'')
+    parser.add_argument("--since", type=parse_day, help="发表日期下限 YYYY-MM-DD（含）")
+    parser.add_argument("--until", type=parse_day, help="发表日期上限 YYYY-MM-DD（含）")
+    parser.add_argument("--days", type=int, help="只看最近 N 天（与 --since 二选一）")
+    parser.add_argument("--limit", type=int, default=20, help="最多返回条数 (默认: 20)")
+    parser.add_argument("--db", default=str(PAPER_ARCHIVE_PATH), help="数据库路径")
+    args = parser.parse_args()
+
+    since = args.since
+    if args.days:
+        since = datetime.now(timezone.utc) - timedelta(days=args.days)
+    until = args.until + timedelta(days=1) if args.until else None
+
+    archive = PaperArchive(args.db)
+    try:
+        hits, elapsed = search(archive, args.query, since=since, until=until, limit=args.limit)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+    finally:
+        archive.close()
+    print(f"🔎 {parse_search_query(args.query)}")
+    for rank, (paper, snippet, _) in enumerate(hits, 1):
+        print(format_hit(rank, paper, snippet))
+    print(f"✅ {len(hits)} 条结果，{elapsed:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+arXiv 查询规划器
+✅ 检测查询之间的包含关系（abs:"multiferroic" 覆盖 abs:"multiferroic" abs:sintering）
+✅ 把剩余的根查询合并为少量 OR 批量查询
+✅ 用本地匹配器把返回的论文重新归属到各主题，保持原有的主题标注
+✅ 本地匹配前对查询与论文文本做同样的词干归并，近似 arXiv 检索（"frustrated magnet" 命中 "frustrated magnetism"）
+"""
+
+import re
+
+from keyword_matcher import KeywordMatcher
+
+# 单个批量查询最多包含的根查询数（控制 URL 长度）
+MAX_CLAUSES_PER_BATCH = 8
+
+# 查询字段对应的论文字段；其他字段按 all（标题 + 摘要）处理
+FIELDS = ("ti", "abs", "all")
+
+_TERM_RE = re.compile(r'(\w+):(?:"([^"]+)"|(\S+))')
+
+# 去复数词尾后再去掉的常见词尾（按顺序尝试第一个）；词干至少保留 4 个字符
+_STEM_SUFFIXES = ("ically", "ical", "ism", "ic", "ing", "ed")
+
+
+def _words(text):
+    return tuple(re.findall(r"\w+", text.lower()))
+
+
+def parse_query(query_str):
+    """把 'abs:"kagome" abs:sintering' 解析为 {(字段, 词序列)} 的合取式"""
+    terms = set()
+    for field, phrase, word in _TERM_RE.findall(query_str):
+        terms.add((field.lower(), _words(phrase or word)))
+    if not terms:
+        raise ValueError(f"无法解析查询: {query_str}")
+    return frozenset(terms)
+
+
+def _term_covers(general, specific):
+    """包含 specific 短语的文本一定包含 general 短语时返回 True"""
+    g_field, g_words = general
+    s_field, s_words = specific
+    if g_field != s_field and g_field != "all":
+        return False
+    n = len(g_words)
+    return any(s_words[i:i + n] == g_words for i in range(len(s_words) - n + 1))
+
+
+def subsumes(general, specific):
+    """查询 general 的结果是否必然包含查询 specific 的全部结果"""
+    return all(any(_term_covers(g, s) for s in specific) for g in general)
+
+
+def _format_term(term):
+    field, words = term
+    return f'{field}:"{" ".join(words)}"'
+
+
+def format_clause(terms):
+    parts = [_format_term(t) for t in sorted(terms)]
+    return parts[0] if len(parts) == 1 else "(" + " AND ".join(parts) + ")"
+
+
+def stem(word):
+    """粗略的英文词干（小写单词）：magnets / magnetic / magnetism → magnet，sintering / sintered → sinter"""
+    if word.endswith("ies") and len(word) > 4:
+        word = word[:-3] + "y"
+    elif word.endswith("s") and not word.endswith("ss") and len(word) > 3:
+        word = word[:-1]
+    for suffix in _STEM_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[:-len(suffix)]
+    return word
+
+
+def stem_text(text):
+    """文本分词后逐词取词干，以空格连接"""
+    return " ".join(stem(w) for w in _words(text))
+
+
+def phrase_matcher(phrases):
+    """词干化查询短语的多关键词匹配器（整词、忽略大小写）"""
+    return KeywordMatcher(sorted(phrases))
+
+
+def field_hits(matcher, paper):
+    """论文标题、摘要（词干化后）中命中的短语集合：{"ti": ..., "abs": ..., "all": ...}"""
+    title = set(matcher.matched(stem_text(paper.get("title", ""))))
+    summary = set(matcher.matched(stem_text(paper.get("summary", ""))))
+    return {"ti": title, "abs": summary, "all": title | summary}
+
+
+class QueryMatcher:
+    """本地判断一篇论文是否满足某个 arXiv 查询（整词、忽略大小写、按词干比较）"""
+
+    def __init__(self, query_str):
+        self.query = query_str
+        self.terms = [(field if field in FIELDS else "all", " ".join(stem(w) for w in words))
+                      for field, words in parse_query(query_str)]
+        self._matcher = None
+
+    def matches(self, paper, hits=None):
+        """hits 为 field_hits 的结果（多个查询共用一次扫描）；不提供时单独扫描"""
+        if hits is None:
+            if self._matcher is None:
+                self._matcher = phrase_matcher({phrase for _, phrase in self.terms})
+            hits = field_hits(self._matcher, paper)
+        return all(phrase in hits[field] for field, phrase in self.terms)
+
+
+class QueryPlan:
+    """
+    topics: ARXIV_TOPICS 格式的主题列表
+    roots: 不被其他查询覆盖的根查询（合取式）
+    batches: 实际发往 arXiv 的 OR 批量查询字符串
+    """
+
+    def __init__(self, topics, max_clauses=MAX_CLAUSES_PER_BATCH):
+        self.topics = topics
+        self.query_count = sum(len(t["queries"]) for t in topics)
+        self.matchers = [[QueryMatcher(q) for q in t["queries"]] for t in topics]
+        # 所有主题的全部短语共用一个匹配器，每篇论文只扫描一次
+        self.phrases = phrase_matcher({phrase for ms in self.matchers for m in ms for _, phrase in m.terms})
+
+        unique = []
+        for topic in topics:
+            for q in topic["queries"]:
+                terms = parse_query(q)
+                if terms not in unique:
+                    unique.append(terms)
+        self.roots = [
+            q for q in unique
+            if not any(other != q and subsumes(other, q) for other in unique)
+        ]
+        clauses = [format_clause(r) for r in self.roots]
+        # 批次数由上限决定，各批大小尽量均衡
+        n_batches = -(-len(clauses) // max_clauses)
+        size = -(-len(clauses) // n_batches) if n_batches else 0
+        self.batches = [" OR ".join(clauses[i:i + size]) for i in range(0, len(clauses), size or 1)]
+
+    def summary(self):
+        return f"{self.query_count} 个查询 → {len(self.roots)} 个根查询 → {len(self.batches)} 个批量查询"
+
+    def attribute(self, papers):
+        """
+        把论文重新归属到各主题，返回与 topics 对应的候选列表
+
+        每个主题内按原查询顺序排列：先是匹配第一个查询的论文（按返回顺序），
+        再是匹配第二个查询的，以此类推，与逐条查询时的收集顺序一致。
+        """
+        hits = {p["id"]: field_hits(self.phrases, p) for p in papers}
+        pools = []
+        for matchers in self.matchers:
+            pool = []
+            seen = set()
+            for matcher in matchers:
+                for p in papers:
+                    if p["id"] not in seen and matcher.matches(p, hits[p["id"]]):
+                        pool.append(p)
+                        seen.add(p["id"])
+            pools.append(pool)
+        return pools
+
+
+def plan_topic_queries(topics, max_clauses=MAX_CLAUSES_PER_BATCH):
+    return QueryPlan(topics, max_clauses)
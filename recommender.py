@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基于收藏记录的相似论文推荐
+✅ 标题 + 摘要（单词与相邻词对）哈希为稀疏 TF 向量，无需维护词表；不依赖 GPU 与外部模型服务
+✅ 索引为 CSR 三元组（indptr / indices / data）的原始二进制文件，内存映射读取，按论文库增量追加
+✅ 每位用户的兴趣画像 = 收藏论文 TF-IDF 向量的质心，收藏变化时重新计算并保存
+✅ 当天候选一次批量稀疏矩阵 × 画像矩阵得到全部用户的余弦相似度
+
+收藏记录 stars.json：{"用户": ["arxiv:2401.01234", ...]}
+
+用法：
+    python recommender.py star alice arxiv:2401.01234 arxiv:2402.04321
+    python recommender.py recommend alice --days 7
+    python recommender.py build
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import zlib
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+RECOMMENDER_INDEX_DIR = Path(os.getenv("RECOMMENDER_INDEX_DIR", Path(__file__).parent / "recommender_index"))
+STARS_PATH = Path(os.getenv("RECOMMENDER_STARS_PATH", Path(__file__).parent / "stars.json"))
+N_FEATURES = 1 << int(os.getenv("RECOMMENDER_HASH_BITS", "18"))
+RECOMMEND_MIN_SCORE = float(os.getenv("RECOMMEND_MIN_SCORE", "0.1"))  # 余弦相似度下限
+
+_WORD_RE = re.compile(r"\w+")
+_BIGRAM_MIX = np.uint64(0x100000001B3)
+_STOPWORDS = frozenset(
+    "a an and are as at be by can for from has have in into is it its of on or our that the their these this "
+    "to via was we which with".split()
+)
+
+
+# ==================== 特征哈希 ====================
+@lru_cache(maxsize=1 << 20)
+def _word_hash(word):
+    return zlib.crc32(word.encode("utf-8"))
+
+
+def _token_hashes(text):
+    """单词的 32 位哈希，加上相邻词对的组合哈希（不拼接字符串）"""
+    words = [w for w in _WORD_RE.findall(text.lower()) if len(w) > 1 and w not in _STOPWORDS]
+    hashes = np.fromiter(map(_word_hash, words), dtype=np.uint64, count=len(words))
+    mixed = (hashes[:-1] * _BIGRAM_MIX) ^ hashes[1:]
+    bigrams = (mixed ^ (mixed >> np.uint64(29))) & np.uint64(0xFFFFFFFF)
+    return np.concatenate((hashes, bigrams))
+
+
+def hash_documents(texts, n_features=N_FEATURES):
+    """
+    一批文本 -> 哈希 TF 的 CSR 三元组 (indptr, indices, data)
+
+    取值为带符号的 1 + log(tf)：符号由哈希最高位决定，冲突在内积中相互抵消。
+    词频统计与特征合并都对整批一次完成。
+    """
+    tokens = [_token_hashes(text) for text in texts]
+    doc_of = np.repeat(np.arange(len(texts), dtype=np.uint64), [len(t) for t in tokens])
+    keys, tf = np.unique((doc_of << np.uint64(32)) | np.concatenate(tokens or [np.zeros(0, np.uint64)]),
+                         return_counts=True)
+    hashes = keys & np.uint64(0xFFFFFFFF)
+    values = np.where(hashes & np.uint64(0x80000000), 1.0, -1.0) * (1.0 + np.log(tf))
+    features = (keys >> np.uint64(32)).astype(np.int64) * n_features + (hashes % np.uint64(n_features)).astype(np.int64)
+    cells, inverse = np.unique(features, return_inverse=True)
+    data = np.bincount(inverse.reshape(-1), weights=values)
+    keep = data != 0
+    cells, data = cells[keep], data[keep]
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(cells // n_features, minlength=len(texts)))))
+    return indptr.astype(np.int64), (cells % n_features).astype(np.int32), data.astype(np.float32)
+
+
+# ==================== 稀疏矩阵运算 ====================
+def csr_matmul(indptr, indices, data, dense):
+    """
+    CSR 矩阵 × 稠密矩阵（特征数 × k），返回 (行数, k)
+
+    对每个非零元乘上对应的行后按 indptr 分段求和：一次向量化运算完成全部行与全部列。
+    """
+    if len(indptr) <= 1:
+        return np.zeros((0, dense.shape[1]))
+    products = data[:, None].astype(np.float64) * dense[indices]
+    cumsum = np.vstack([np.zeros((1, dense.shape[1])), np.cumsum(products, axis=0)])
+    return cumsum[indptr[1:]] - cumsum[indptr[:-1]]
+
+
+class SparseIndex:
+    """
+    论文库的哈希 TF 矩阵（每篇论文一行）
+
+    目录下的文件：indptr.i8 / indices.i4 / data.f4 为只追加的 CSR 数组，ids.txt 为行对应的论文 ID，
+    df.npz 为各特征的文档频率，meta.json 记录有效长度、论文库的 rowid 高水位与文本变更序号。
+    文本变化的论文（如 arXiv 新版本）追加一行新的，ids.txt 中同一 ID 以最后一行为准，
+    旧行不再参与 DF 与检索。meta.json 最后写入，中途中断时多出的尾部在下次追加前截掉。
+    """
+
+    def __init__(self, root=RECOMMENDER_INDEX_DIR, n_features=N_FEATURES):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.meta_path = self.root / "meta.json"
+        meta = {}
+        if self.meta_path.exists():
+            with open(self.meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        if meta and meta.get("n_features") != n_features:
+            print(f"⚠️ 推荐索引的特征维数 {meta.get('n_features')} 与当前 {n_features} 不同，重新建索引")
+            meta = {}
+        self.n_features = n_features
+        self.n_docs = meta.get("n_docs", 0)
+        self.nnz = meta.get("nnz", 0)
+        self.archive_rowid = meta.get("archive_rowid", 0)
+        self.change_seq = meta.get("change_seq", 0)
+        self.ids = self._read_ids() if meta else []
+        self._row_of = {paper_id: row for row, paper_id in enumerate(self.ids)}
+        self._truncate()
+        self._load_arrays()
+        self.df = self._load_df()
+
+    def _load_df(self):
+        """各特征的文档频率；与 meta.json 的篇数不一致（追加中断）时由索引中的有效行重新统计"""
+        path = self._path("df.npz")
+        if path.exists():
+            with np.load(path) as saved:
+                if int(saved["n_docs"]) == self.n_docs and len(saved["df"]) == self.n_features:
+                    return saved["df"]
+        live = np.zeros(self.n_docs, dtype=bool)
+        live[list(self._row_of.values())] = True
+        mask = np.repeat(live, np.diff(self.indptr)) if self.n_docs else live
+        return np.bincount(self.indices[mask], minlength=self.n_features).astype(np.int32)
+
+    def _path(self, name):
+        return self.root / name
+
+    def _read_ids(self):
+        path = self._path("ids.txt")
+        if not path.exists():
+            return []
+        with open(path, encoding="utf-8") as f:
+            return [line.rstrip("\n") for _, line in zip(range(self.n_docs), f)]
+
+    def _truncate(self):
+        """截掉 meta.json 之外的尾部（上次追加中断留下的）"""
+        for name, size in (("indptr.i8", (self.n_docs + 1) * 8 if self.n_docs else 0),
+                           ("indices.i4", self.nnz * 4), ("data.f4", self.nnz * 4)):
+            path = self._path(name)
+            if path.exists() and path.stat().st_size != size:
+                with open(path, "r+b") as f:
+                    f.truncate(size)
+        ids_path = self._path("ids.txt")
+        ids_size = sum(len(paper_id.encode("utf-8")) + 1 for paper_id in self.ids)
+        if not ids_path.exists() or ids_path.stat().st_size != ids_size:
+            with open(ids_path, "w", encoding="utf-8") as f:
+                f.writelines(paper_id + "\n" for paper_id in self.ids)
+
+    def _load_arrays(self):
+        def mapped(name, dtype, count):
+            if count == 0:
+                return np.zeros(0, dtype=dtype)
+            return np.memmap(self._path(name), dtype=dtype, mode="r", shape=(count,))
+
+        self.indptr = mapped("indptr.i8", np.int64, self.n_docs + 1 if self.n_docs else 0)
+        if len(self.indptr) == 0:
+            self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = mapped("indices.i4", np.int32, self.nnz)
+        self.data = mapped("data.f4", np.float32, self.nnz)
+
+    def __len__(self):
+        return len(self._row_of)
+
+    def __contains__(self, paper_id):
+        return paper_id in self._row_of
+
+    def update(self, archive, batch_size=2000):
+        """把论文库中新入库以及文本变化的论文追加到索引，返回追加篇数"""
+        added = 0
+        # 先处理已索引论文的文本变更；之后新入库的论文按当前文本建行，无需重复
+        changed = {}
+        change_seq = self.change_seq
+        for change_seq, paper_id, title, summary in archive.iter_text_changes(self.change_seq):
+            if paper_id in self._row_of:
+                changed[paper_id] = f"{title} {summary}"
+        changed = list(changed.items())
+        for start in range(0, len(changed), batch_size):
+            added += self._append(changed[start:start + batch_size], self.archive_rowid)
+        self.change_seq = change_seq
+        batch = []
+        for rowid, paper_id, title, summary in archive.iter_texts(self.archive_rowid):
+            if paper_id not in self._row_of:
+                batch.append((paper_id, f"{title} {summary}"))
+            if len(batch) >= batch_size:
+                added += self._append(batch, rowid)
+                batch = []
+            self.archive_rowid = rowid
+        if batch:
+            added += self._append(batch, self.archive_rowid)
+        self._save_meta()
+        return added
+
+    def _append(self, batch, archive_rowid):
+        indptr, indices, data = hash_documents([text for _, text in batch], self.n_features)
+        # 重新索引的论文：旧行不再计入 DF
+        for paper_id, _ in batch:
+            row = self._row_of.get(paper_id)
+            if row is not None:
+                old = self.indices[self.indptr[row]:self.indptr[row + 1]]
+                self.df -= np.bincount(old, minlength=self.n_features).astype(np.int32)
+        with open(self._path("indices.i4"), "ab") as f:
+            f.write(indices.tobytes())
+        with open(self._path("data.f4"), "ab") as f:
+            f.write(data.tobytes())
+        with open(self._path("indptr.i8"), "ab") as f:
+            f.write((indptr[0 if self.n_docs == 0 else 1:] + self.nnz).tobytes())
+        with open(self._path("ids.txt"), "a", encoding="utf-8") as f:
+            f.writelines(paper_id + "\n" for paper_id, _ in batch)
+        for paper_id, _ in batch:
+            self._row_of[paper_id] = len(self.ids)
+            self.ids.append(paper_id)
+        self.df += np.bincount(indices, minlength=self.n_features).astype(np.int32)
+        self.n_docs += len(batch)
+        self.nnz += len(indices)
+        self.archive_rowid = archive_rowid
+        np.savez(self._path("df.npz"), df=self.df, n_docs=self.n_docs)
+        self._save_meta()
+        self._load_arrays()
+        return len(batch)
+
+    def _save_meta(self):
+        tmp = self.meta_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"n_features": self.n_features, "n_docs": self.n_docs, "nnz": self.nnz,
+                       "archive_rowid": self.archive_rowid, "change_seq": self.change_seq}, f)
+        os.replace(tmp, self.meta_path)
+
+    def idf(self):
+        return (np.log((1.0 + len(self)) / (1.0 + self.df)) + 1.0).astype(np.float32)
+
+    def tfidf_rows(self, paper_ids):
+        """
+        取出若干篇论文的行，乘以 IDF 并做 L2 归一化
+
+        返回 (找到的论文 ID, indptr, indices, data)；不在索引中的论文被跳过。
+        """
+        found = [paper_id for paper_id in paper_ids if paper_id in self._row_of]
+        rows = np.array([self._row_of[paper_id] for paper_id in found], dtype=np.int64)
+        starts = self.indptr[rows] if len(rows) else np.zeros(0, dtype=np.int64)
+        lengths = self.indptr[rows + 1] - starts if len(rows) else np.zeros(0, dtype=np.int64)
+        indptr = np.concatenate(([0], np.cumsum(lengths)))
+        # 各行在原数组中的位置：行起点重复行长次 + 行内偏移
+        positions = np.repeat(starts - indptr[:-1], lengths) + np.arange(indptr[-1])
+        indices = np.asarray(self.indices[positions])
+        data = np.asarray(self.data[positions], dtype=np.float64) * self.idf()[indices]
+        squares = np.concatenate(([0.0], np.cumsum(data ** 2)))
+        norms = np.sqrt(squares[indptr[1:]] - squares[indptr[:-1]])
+        data /= np.repeat(np.where(norms > 0, norms, 1.0), lengths)
+        return found, indptr, indices, data
+
+
+# ==================== 用户画像与推荐 ====================
+def load_stars(path=STARS_PATH):
+    path = Path(path)
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return {user: list(dict.fromkeys(ids)) for user, ids in json.load(f).items() if ids}
+
+
+def save_stars(stars, path=STARS_PATH):
+    path = Path(path)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(stars, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+class Recommender:
+    """
+    stars: {用户: [收藏的论文 ID]}
+
+    画像矩阵（用户数 × 特征数）保存为 profiles.npy 并内存映射读取；
+    收藏、索引中可用的收藏论文或索引规模（决定 IDF）发生变化时重新计算。
+    """
+
+    def __init__(self, index, stars):
+        self.index = index
+        self.stars = stars
+        self.users = sorted(stars)
+        self.profiles = self._load_profiles()
+
+    def _signature(self):
+        usable = {user: [i for i in self.stars[user] if i in self.index] for user in self.users}
+        # 画像用的是当时的 IDF：索引有新论文（文档数 / 非零元变化）时 IDF 随之改变，画像需要重算
+        state = [self.index.n_features, self.index.n_docs, self.index.nnz, usable]
+        return hashlib.sha1(json.dumps(state, sort_keys=True).encode()).hexdigest()
+
+    def _load_profiles(self):
+        path = self.index.root / "profiles.npy"
+        meta_path = self.index.root / "profiles.json"
+        signature = self._signature()
+        if path.exists() and meta_path.exists():
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("signature") == signature and meta.get("users") == self.users:
+                return np.load(path, mmap_mode="r")
+        profiles = np.zeros((len(self.users), self.index.n_features), dtype=np.float32)
+        for u, user in enumerate(self.users):
+            found, indptr, indices, data = self.index.tfidf_rows(self.stars[user])
+            if found:
+                # 质心：各收藏论文的归一化向量求平均，再归一化
+                centroid = np.bincount(indices, weights=data, minlength=self.index.n_features)
+                norm = np.linalg.norm(centroid)
+                profiles[u] = centroid / norm if norm > 0 else centroid
+        np.save(path, profiles)
+        tmp = meta_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"signature": signature, "users": self.users}, f, ensure_ascii=False)
+        os.replace(tmp, meta_path)
+        return np.load(path, mmap_mode="r")
+
+    def scores(self, paper_ids):
+        """候选与各用户画像的余弦相似度，返回 (找到的论文 ID, 形状为 (候选数, 用户数) 的矩阵)"""
+        found, indptr, indices, data = self.index.tfidf_rows(paper_ids)
+        if not found or not self.users:
+            return found, np.zeros((len(found), len(self.users)))
+        # 只取候选中出现过的特征列，避免把整个画像矩阵读入内存
+        columns, local = np.unique(indices, return_inverse=True)
+        dense = np.asarray(self.profiles[:, columns], dtype=np.float64).T
+        return found, csr_matmul(indptr, local.reshape(-1), data, dense)
+
+    def recommend(self, papers, k=3, min_score=RECOMMEND_MIN_SCORE):
+        """
+        为每位用户从 papers 中选出最相似的 k 篇（排除其已收藏的论文）
+
+        返回 {用户: [(论文, 相似度)]}；一篇论文只推荐给相似度最高的用户。
+        """
+        by_id = {p["id"]: p for p in papers}
+        found, scores = self.scores(list(by_id))
+        result = {user: [] for user in self.users}
+        taken = set()
+        for u, user in enumerate(self.users):
+            starred = set(self.stars[user])
+            for row in np.argsort(-scores[:, u], kind="stable") if len(found) else []:
+                score = float(scores[row, u])
+                if score < min_score or len(result[user]) >= k:
+                    break
+                paper_id = found[row]
+                if paper_id in starred or paper_id in taken or scores[row].argmax() != u:
+                    continue
+                result[user].append((by_id[paper_id], score))
+                taken.add(paper_id)
+        return result
+
+
+# ==================== 命令行 ====================
+def main():
+    from paper_archive import PAPER_ARCHIVE_PATH, PaperArchive
+
+    parser = argparse.ArgumentParser(description="基于收藏记录的相似论文推荐")
+    parser.add_argument("--db", default=str(PAPER_ARCHIVE_PATH), help="论文库路径")
+    parser.add_argument("--index", default=str(RECOMMENDER_INDEX_DIR), help="索引目录")
+    parser.add_argument("--stars", default=str(STARS_PATH), help="收藏记录文件")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("build", help="把论文库中的新论文追加到索引")
+    for name, text in (("star", "收藏论文"), ("unstar", "取消收藏")):
+        cmd = sub.add_parser(name, help=text)
+        cmd.add_argument("user")
+        cmd.add_argument("ids", nargs="+", help="论文 ID，如 arxiv:2401.01234")
+    rec = sub.add_parser("recommend", help="从最近的论文中为用户推荐")
+    rec.add_argument("user")
+    rec.add_argument("--days", type=int, default=7, help="候选范围：最近 N 天发表的论文 (默认: 7)")
+    rec.add_argument("-k", type=int, default=10, help="推荐篇数 (默认: 10)")
+    args = parser.parse_args()
+
+    stars = load_stars(args.stars)
+    if args.command in ("star", "unstar"):
+        current = stars.get(args.user, [])
+        if args.command == "star":
+            current = list(dict.fromkeys(current + args.ids))
+        else:
+            current = [i for i in current if i not in args.ids]
+        stars[args.user] = current
+        save_stars({user: ids for user, ids in stars.items() if ids}, args.stars)
+        print(f"⭐ {args.user}：收藏 {len(current)} 篇")
+        return
+
+    archive = PaperArchive(args.db)
+    index = SparseIndex(args.index)
+    added = index.update(archive)
+    print(f"🧮 推荐索引：{len(index)} 篇（追加 {added}），特征维数 {index.n_features}，非零元 {index.nnz}")
+    if args.command == "build":
+        archive.close()
+        return
+    if args.user not in stars:
+        print(f"❌ {args.user} 没有收藏记录")
+        sys.exit(1)
+    pool = archive.papers_between(datetime.now(timezone.utc) - timedelta(days=args.days))
+    archive.close()
+    picks = Recommender(index, {args.user: stars[args.user]}).recommend(pool, k=args.k, min_score=0.0)
+    for rank, (paper, score) in enumerate(picks[args.user], 1):
+        print(f"{rank:>3}. {score:.3f}  {paper['id']}  {paper['title'][:80]}")
+
+
+if __name__ == "__main__":
+    main()
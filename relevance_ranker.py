@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+主题候选池相关度排序
+✅ 标题 + 摘要上的 BM25（标题词加权），短语按相邻词序列计数
+✅ config.yaml 的 priority_keywords 加分、excluded_keywords（review、tutorial）降权
+✅ 按发表时间指数衰减，越新越靠前
+✅ 分词每篇只做一次并缓存；打分对整个候选池用 NumPy 向量化完成
+
+用法：
+    ranker = RelevanceRanker(priority_keywords, excluded_keywords, now=now)
+    top = ranker.rank(pool, ['abs:"kagome"'])[:5]
+"""
+
+import os
+import re
+from datetime import datetime, timezone
+
+import numpy as np
+
+from query_planner import parse_query
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+TITLE_WEIGHT = 2.0          # 标题中的词按 2 次计
+PRIORITY_WEIGHT = float(os.getenv("RANK_PRIORITY_WEIGHT", "1.0"))    # 优先关键词 BM25 分数的权重
+EXCLUDED_FACTOR = float(os.getenv("RANK_EXCLUDED_FACTOR", "0.2"))    # 每出现一个排除关键词，分数乘以该系数
+HALF_LIFE_DAYS = float(os.getenv("RANK_HALF_LIFE_DAYS", "30"))       # 分数随发表时间减半的天数
+
+_WORD_RE = re.compile(r"\w+")
+_SEPARATOR = -1  # 标题与摘要、论文与论文之间的分隔，短语不会跨越
+
+
+def normalize_word(word):
+    """小写并去掉简单的复数词尾，使 magnets / magnet、reviews / review 计为同一词"""
+    word = word.lower()
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def query_phrases(queries):
+    """
+    把查询转换为短语（词序列）列表
+
+    arXiv 风格的查询（abs:"quantum spin liquid"）按字段短语拆开，字段一律按标题 + 摘要处理；
+    其他字符串（IOP 搜索词、关键词）按空白拆成单词。
+    """
+    phrases = []
+    for query in queries:
+        if ":" in query:
+            words = [ws for _field, ws in sorted(parse_query(query))]
+        else:
+            words = [(w,) for w in _WORD_RE.findall(query.lower())]
+        for phrase in words:
+            phrase = tuple(normalize_word(w) for w in phrase)
+            if phrase and phrase not in phrases:
+                phrases.append(phrase)
+    return phrases
+
+
+def keyword_phrases(keywords):
+    """关键词整体作为短语（"quantum spin liquid" 要求三个词相邻）"""
+    phrases = []
+    for keyword in keywords or ():
+        phrase = tuple(normalize_word(w) for w in _WORD_RE.findall(keyword))
+        if phrase and phrase not in phrases:
+            phrases.append(phrase)
+    return phrases
+
+
+class RelevanceRanker:
+    def __init__(self, priority_keywords=(), excluded_keywords=(), now=None, half_life_days=HALF_LIFE_DAYS,
+                 k1=BM25_K1, b=BM25_B, title_weight=TITLE_WEIGHT):
+        self.priority = keyword_phrases(priority_keywords)
+        self.excluded = keyword_phrases(excluded_keywords)
+        self.now = now or datetime.now(timezone.utc)
+        self.half_life_days = half_life_days
+        self.k1 = k1
+        self.b = b
+        self.title_weight = title_weight
+        self._vocab = {}    # 归一化后的词 -> 词 ID
+        self._surface = {}  # 原始小写词 -> 词 ID（免去逐词调用 normalize_word）
+        self._docs = {}     # 论文 ID -> (词 ID 数组, 标题词数, 加权长度, 发表时间戳)
+
+    def _word_ids(self, text):
+        words = _WORD_RE.findall(text.lower())
+        ids = list(map(self._surface.get, words))
+        if None in ids:
+            for i, word in enumerate(words):
+                if ids[i] is None:
+                    ids[i] = self._surface[word] = self._vocab.setdefault(normalize_word(word), len(self._vocab))
+        return ids
+
+    def _encode(self, paper):
+        doc = self._docs.get(paper["id"])
+        if doc is None:
+            title = self._word_ids(paper.get("title", ""))
+            summary = self._word_ids(paper.get("summary", ""))
+            ids = np.array(title + [_SEPARATOR] + summary + [_SEPARATOR], dtype=np.int32)
+            published = paper["published"].timestamp() if paper.get("published") else None
+            doc = self._docs[paper["id"]] = (ids, len(title), self.title_weight * len(title) + len(summary), published)
+        return doc
+
+    def _corpus(self, papers):
+        """候选池拼成一条词序列：(词 ID, 各篇起点, 各篇标题终点, 各篇加权长度, 各篇发表时间戳)"""
+        docs = [self._encode(p) for p in papers]
+        ids = np.concatenate([d[0] for d in docs])
+        sizes = np.fromiter((len(d[0]) for d in docs), dtype=np.int64, count=len(docs))
+        starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        title_ends = starts + np.fromiter((d[1] for d in docs), dtype=np.int64, count=len(docs))
+        lengths = np.fromiter((d[2] for d in docs), dtype=np.float64, count=len(docs))
+        published = np.fromiter((self.now.timestamp() if d[3] is None else d[3] for d in docs),
+                                dtype=np.float64, count=len(docs))
+        return ids, starts, title_ends, lengths, published
+
+    def _term_frequencies(self, corpus, phrases):
+        """各短语在各篇中的加权出现次数，形状 (论文数, 短语数)"""
+        ids, doc_starts, title_ends, lengths, _ = corpus
+        n_docs = len(lengths)
+        tf = np.zeros((n_docs, len(phrases)), dtype=np.float64)
+        phrase_ids = [[self._vocab.get(w) for w in phrase] for phrase in phrases]
+        first_ids = [word_ids[0] for word_ids in phrase_ids if None not in word_ids]
+        if not first_ids:
+            return tf
+        # 只扫描一遍词序列，取出各短语首词的位置，之后都在这些位置上比较
+        is_first = np.zeros(len(self._vocab) + 1, dtype=bool)  # 末位对应分隔符 -1
+        is_first[first_ids] = True
+        candidates = np.flatnonzero(is_first[ids])
+        for j, word_ids in enumerate(phrase_ids):
+            if None in word_ids:
+                continue
+            pos = candidates[ids[candidates] == word_ids[0]]
+            for offset, word_id in enumerate(word_ids[1:], 1):
+                pos = pos[ids[pos + offset] == word_id]  # 每篇末尾有分隔符，不会越界
+            doc = np.searchsorted(doc_starts, pos, side="right") - 1
+            weights = np.where(pos < title_ends[doc], self.title_weight, 1.0)
+            tf[:, j] = np.bincount(doc, weights=weights, minlength=n_docs)
+        return tf
+
+    def _bm25(self, tf, lengths):
+        if tf.shape[1] == 0:
+            return np.zeros(tf.shape[0])
+        n_docs = tf.shape[0]
+        df = np.count_nonzero(tf, axis=0)
+        idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+        norm = self.k1 * (1 - self.b + self.b * lengths / max(lengths.mean(), 1.0))
+        return (tf * (self.k1 + 1) / (tf + norm[:, None])) @ idf
+
+    def _decay(self, published):
+        if not self.half_life_days:
+            return np.ones(len(published))
+        ages = (self.now.timestamp() - published) / 86400
+        return np.exp2(-np.clip(ages, 0, None) / self.half_life_days)
+
+    def score(self, papers, queries):
+        """为候选池打分，返回与 papers 对应的分数数组（越大越相关）"""
+        if not papers:
+            return np.zeros(0)
+        corpus = self._corpus(papers)
+        lengths = corpus[3]
+        phrases = query_phrases(queries)
+        # 三组短语一次计数，再按列切开
+        tf = self._term_frequencies(corpus, phrases + self.priority + self.excluded)
+        n_query, n_priority = len(phrases), len(self.priority)
+        relevance = self._bm25(tf[:, :n_query], lengths)
+        if self.priority:
+            relevance = relevance + PRIORITY_WEIGHT * self._bm25(tf[:, n_query:n_query + n_priority], lengths)
+        if self.excluded:
+            excluded = np.count_nonzero(tf[:, n_query + n_priority:], axis=1)
+            relevance = relevance * np.power(EXCLUDED_FACTOR, excluded)
+        # 无任何命中的论文仍按新旧排序
+        return (relevance + 1e-6) * self._decay(corpus[4])
+
+    def rank(self, papers, queries):
+        """按分数从高到低排序（同分保持原顺序），每篇的分数写入 relevance 字段"""
+        scores = self.score(papers, queries)
+        order = np.argsort(-scores, kind="stable")
+        ranked = []
+        for i in order:
+            paper = papers[i]
+            paper["relevance"] = round(float(scores[i]), 4)
+            ranked.append(paper)
+        return ranked
+
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+紧凑的已推送 ID 存储
+✅ 主文件：按哈希排序的定长记录（64 位 ID 哈希 + 首次记录日），内存映射后二分查找
+✅ 增量日志：新 ID 只追加写入，不重写整个文件
+✅ 定期合并：日志超过阈值时与主文件归并，同时按 TTL 清理过期记录
+启动只需映射主文件并读入增量日志，开销不随历史规模增长。
+"""
+
+import hashlib
+import heapq
+import json
+import mmap
+import os
+import struct
+import time
+from pathlib import Path
+
+SEEN_STORE_PATH = Path(__file__).parent / "sent_papers"  # 生成 sent_papers.bin / sent_papers.log
+SEEN_TTL_DAYS = int(os.getenv("SEEN_TTL_DAYS", "365"))
+COMPACT_THRESHOLD = 4096  # 增量日志超过该条数时合并
+
+RECORD = struct.Struct("<QI")  # (ID 哈希, 首次记录的 Unix 日)
+HASH = struct.Struct("<Q")
+
+
+def id_hash(paper_id):
+    return HASH.unpack(hashlib.blake2b(paper_id.encode("utf-8"), digest_size=8).digest())[0]
+
+
+def _today():
+    return int(time.time() // 86400)
+
+
+class SeenStore:
+    """
+    集合语义的已推送 ID 存储：支持 in / add / len
+
+    哈希冲突概率约为 n²/2⁶⁵，几十万条记录下可以忽略。
+    """
+
+    def __init__(self, path=SEEN_STORE_PATH, ttl_days=SEEN_TTL_DAYS, compact_threshold=COMPACT_THRESHOLD):
+        base = Path(path)
+        self.data_path = base.with_suffix(".bin")
+        self.log_path = base.with_suffix(".log")
+        self.ttl_days = ttl_days
+        self.compact_threshold = compact_threshold
+        self._mm = None
+        self._file = None
+        self._count = 0
+        self._delta = {}
+        self._open_base()
+        self._load_log()
+        self._log = open(self.log_path, "ab")
+
+    # ---------- 主文件 ----------
+    def _open_base(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._file.close()
+            self._mm = self._file = None
+        self._count = 0
+        if not self.data_path.exists() or self.data_path.stat().st_size < RECORD.size:
+            return
+        self._file = open(self.data_path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._count = len(self._mm) // RECORD.size
+
+    def _base_contains(self, h):
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            value = HASH.unpack_from(self._mm, mid * RECORD.size)[0]
+            if value < h:
+                lo = mid + 1
+            elif value > h:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def _iter_base(self):
+        for i in range(self._count):
+            yield RECORD.unpack_from(self._mm, i * RECORD.size)
+
+    # ---------- 增量日志 ----------
+    def _load_log(self):
+        if not self.log_path.exists():
+            return
+        data = self.log_path.read_bytes()
+        # 忽略异常中断时写了一半的尾部记录
+        usable = len(data) - len(data) % RECORD.size
+        for h, day in RECORD.iter_unpack(data[:usable]):
+            self._delta.setdefault(h, day)
+
+    # ---------- 集合接口 ----------
+    def __contains__(self, paper_id):
+        h = id_hash(paper_id)
+        return h in self._delta or self._base_contains(h)
+
+    def __len__(self):
+        return self._count + len(self._delta)
+
+    def add(self, paper_id):
+        h = id_hash(paper_id)
+        if h in self._delta or self._base_contains(h):
+            return
+        day = _today()
+        self._delta[h] = day
+        self._log.write(RECORD.pack(h, day))
+
+    def update(self, paper_ids):
+        for paper_id in paper_ids:
+            self.add(paper_id)
+
+    # ---------- 持久化 ----------
+    def flush(self):
+        """把增量日志落盘；日志过长时顺带合并"""
+        self._log.flush()
+        os.fsync(self._log.fileno())
+        if len(self._delta) >= self.compact_threshold:
+            self.compact()
+
+    def compact(self):
+        """归并主文件与增量日志，清理过期记录，然后清空日志"""
+        cutoff = _today() - self.ttl_days
+        merged = heapq.merge(self._iter_base(), sorted(self._delta.items()))
+        tmp_path = self.data_path.with_suffix(".bin.tmp")
+        kept = 0
+        last = None
+        with open(tmp_path, "wb") as out:
+            for h, day in merged:
+                if h == last or day < cutoff:
+                    continue
+                out.write(RECORD.pack(h, day))
+                last = h
+                kept += 1
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp_path, self.data_path)
+        self._log.close()
+        self._log = open(self.log_path, "wb")
+        self._delta = {}
+        self._open_base()
+        return kept
+
+    def close(self):
+        self._log.close()
+        if self._mm is not None:
+            self._mm.close()
+            self._file.close()
+            self._mm = self._file = None
+
+    def import_json(self, json_path):
+        """导入旧版 sent_papers.json（ID 列表），返回导入条数"""
+        ids = json.loads(Path(json_path).read_text(encoding="utf-8"))
+        before = len(self)
+        self.update(ids)
+        self.flush()
+        return len(self) - before
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+arXiv 分类列表离线测试（读取 benchmarks/fixtures/listings 中录制的 RSS 列表，不联网）
+"""
+
+from datetime import datetime, timezone
+from pathlib import Path
+
+from arxiv_listing import fetch_listings, parse_listing_feed
+from query_planner import plan_topic_queries
+
+LISTING_DIR = Path(__file__).parent / "benchmarks" / "fixtures" / "listings"
+CATEGORIES = ["cond-mat.str-el", "cond-mat.mtrl-sci"]
+
+
+def test_parse_listing_feed():
+    papers = parse_listing_feed((LISTING_DIR / "cond-mat.str-el.xml").read_bytes())
+    # 默认只保留 new 与 cross，替换版本（replace / replace-cross）跳过
+    assert [p["id"] for p in papers] == ["arxiv:2501.07001", "arxiv:2501.07003", "arxiv:2501.07002"]
+    first = papers[0]
+    assert first["version"] == 1
+    assert first["title"] == "Flux growth of Kagome metal CsV3Sb5 single crystals"
+    assert first["summary"].startswith("We report flux growth")
+    assert first["authors"] == ["Li Wei", "Maria Garcia"]
+    assert first["categories"] == ["cond-mat.str-el", "cond-mat.supr-con"]
+    assert first["primary_category"] == "cond-mat.str-el"
+    assert first["link"] == "https://arxiv.org/abs/2501.07001"
+    assert first["pdf_url"] == "https://arxiv.org/pdf/2501.07001"
+    assert first["published"] == datetime(2025, 1, 14, 5, tzinfo=timezone.utc)
+    assert papers[2]["announce_type"] == "cross"
+    assert papers[2]["doi"] == "10.1103/PhysRevB.111.000001"
+
+
+def test_parse_listing_feed_with_replacements():
+    papers = parse_listing_feed((LISTING_DIR / "cond-mat.str-el.xml").read_bytes(), include_replacements=True)
+    assert len(papers) == 5
+    assert {p["id"]: p["version"] for p in papers}["arxiv:2411.04006"] == 3
+
+
+def test_fetch_listings_offline():
+    papers, requests_made = fetch_listings(CATEGORIES, listing_dir=LISTING_DIR)
+    assert requests_made == 0
+    # 交叉投稿 2501.07002 在两个分类中出现，只保留一份
+    assert [p["id"] for p in papers] == [
+        "arxiv:2501.07001", "arxiv:2501.07003", "arxiv:2501.07002", "arxiv:2501.07004",
+    ]
+
+
+def test_listing_papers_attribute_to_topics():
+    papers, _ = fetch_listings(CATEGORIES, listing_dir=LISTING_DIR)
+    plan = plan_topic_queries([
+        {"name": "kagome", "queries": ['abs:"kagome"'], "target_count": 3},
+        {"name": "multiferroic", "queries": ['abs:"multiferroic"'], "target_count": 3},
+        {"name": "qsl", "queries": ['abs:"quantum spin liquid"'], "target_count": 3},
+    ])
+    pools = plan.attribute(papers)
+    assert [[p["id"] for p in pool] for pool in pools] == [
+        ["arxiv:2501.07001"], ["arxiv:2501.07002"], ["arxiv:2501.07003"],
+    ]
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+查询游标增量抓取测试（假的 transport，不联网）
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+os.environ.setdefault("FEISHU_WEBHOOK_URL", "http://127.0.0.1/test-webhook")
+
+import arxiv_daily_report  # noqa: E402
+from cursor_store import CursorStore  # noqa: E402
+from http_client import HttpClient, set_client  # noqa: E402
+
+QUERY = 'abs:"kagome"'
+MARK = datetime(2025, 1, 10, 12, tzinfo=timezone.utc)
+
+
+def atom_feed(papers):
+    entries = "".join(
+        f"<entry><id>http://arxiv.org/abs/{paper_id}v1</id>"
+        f"<published>{published:%Y-%m-%dT%H:%M:%SZ}</published><updated>{published:%Y-%m-%dT%H:%M:%SZ}</updated>"
+        f"<title>Paper {paper_id}</title><summary>Kagome paper {paper_id}.</summary>"
+        f"<author><name>A. Author</name></author>"
+        f'<link href="http://arxiv.org/abs/{paper_id}v1" rel="alternate" type="text/html"/>'
+        f"</entry>"
+        for paper_id, published in papers
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?><feed xmlns="http://www.w3.org/2005/Atom">{entries}</feed>'.encode()
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.status_code = 200
+        self.headers = {}
+        self.content = body
+
+    def iter_content(self, chunk_size=8192):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def raise_for_status(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeArxiv:
+    """按 start / max_results 分页返回按发表时间降序排列的条目，并记录每次请求的 start"""
+
+    def __init__(self, papers):
+        self.papers = papers
+        self.starts = []
+
+    def send(self, method, url, headers=None, body=None, timeout=None, stream=False):
+        query = parse_qs(urlsplit(url).query)
+        start, size = int(query["start"][0]), int(query["max_results"][0])
+        self.starts.append(start)
+        return FakeResponse(atom_feed(self.papers[start:start + size]))
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def fake_arxiv():
+    # 高水位之后 3 篇（其中 1 篇与高水位同一时刻但未见过），然后是已见过的并列条目与更早的论文
+    papers = [
+        ("2501.00005", MARK + timedelta(hours=2)),
+        ("2501.00004", MARK + timedelta(hours=1)),
+        ("2501.00003", MARK),
+        ("2501.00002", MARK),
+        ("2501.00001", MARK - timedelta(hours=1)),
+        ("2501.00000", MARK - timedelta(hours=2)),
+    ]
+    transport = FakeArxiv(papers)
+    old = set_client(HttpClient(transport=transport, cache=None))
+    yield transport
+    set_client(old)
+
+
+def test_delta_stops_at_mark_and_tie_ids(tmp_path, fake_arxiv):
+    cursors = CursorStore(tmp_path / "cursors.json")
+    cursors.advance(QUERY, [{"id": "arxiv:2501.00002", "published": MARK}])
+    since = MARK - timedelta(days=7)
+
+    papers = arxiv_daily_report.query_arxiv_delta(QUERY, since, cursors, max_results=100, cursor_page_size=2)
+
+    # 第二页遇到已见过的并列条目即停止，不再请求第三页
+    assert [p["id"] for p in papers] == ["arxiv:2501.00005", "arxiv:2501.00004", "arxiv:2501.00003"]
+    assert fake_arxiv.starts == [0, 2]
+
+    cursors.advance(QUERY, papers)
+    cursors.save()
+    reloaded = CursorStore(tmp_path / "cursors.json")
+    published, ids = reloaded.mark(QUERY)
+    assert published == MARK + timedelta(hours=2)
+    assert ids == {"arxiv:2501.00005"}
+
+
+def test_delta_without_mark_fetches_window(tmp_path, fake_arxiv):
+    cursors = CursorStore(tmp_path / "cursors.json")
+    papers = arxiv_daily_report.query_arxiv_delta(QUERY, MARK - timedelta(days=7), cursors,
+                                                  max_results=100, page_size=4)
+    assert len(papers) == 6
+    assert fake_arxiv.starts == [0, 4]
+
+
+def test_advance_merges_tie_ids(tmp_path):
+    cursors = CursorStore(tmp_path / "cursors.json")
+    cursors.advance(QUERY, [{"id": "arxiv:a", "published": MARK}])
+    cursors.advance(QUERY, [{"id": "arxiv:b", "published": MARK}, {"id": "arxiv:c", "published": MARK - timedelta(1)}])
+    assert cursors.mark(QUERY) == (MARK, {"arxiv:a", "arxiv:b"})
+    # 高水位只前进不后退
+    cursors.advance(QUERY, [{"id": "arxiv:d", "published": MARK - timedelta(days=1)}])
+    assert cursors.mark(QUERY) == (MARK, {"arxiv:a", "arxiv:b"})
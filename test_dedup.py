@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+去重引擎测试：精确键、arXiv 版本归一化、跨来源近似重复、指纹文件过期清理
+"""
+
+import time
+
+import numpy as np
+
+from dedup import (FINGERPRINT_DTYPE, FINGERPRINT_TTL_DAYS, NUM_PERM, Deduplicator, exact_keys, legacy_ids,
+                   normalize_paper_id)
+
+ABSTRACT = (
+    "We report the synthesis of polycrystalline Co4Nb2O9 by a conventional solid state reaction and "
+    "study its magnetoelectric coupling below the Neel temperature of 27 K. Magnetization, dielectric "
+    "and pyroelectric current measurements reveal a linear magnetoelectric effect whose sign can be "
+    "reversed by the poling field. Neutron powder diffraction shows that the spins lie in the honeycomb "
+    "plane, and a symmetry analysis explains the observed components of the magnetoelectric tensor."
+)
+
+PREPRINT = {
+    "id": "arxiv:2501.01234",
+    "version": 2,
+    "title": "Linear magnetoelectric effect in polycrystalline Co4Nb2O9",
+    "summary": ABSTRACT,
+    "link": "http://arxiv.org/abs/2501.01234v2",
+}
+
+# 期刊版：标题与摘要略有改动，DOI 与 arXiv 预印本不同
+JOURNAL = {
+    "id": "iop:10.1088/1361-648X/ad1234",
+    "title": "Linear magnetoelectric effect in Co4Nb2O9 ceramics",
+    "summary": ABSTRACT.replace("We report the synthesis", "Here we report the preparation")
+                       .replace("below the Neel temperature of 27 K", "below TN = 27 K"),
+    "link": "https://iopscience.iop.org/article/10.1088/1361-648X/ad1234",
+}
+
+UNRELATED = {
+    "id": "arxiv:2501.05678",
+    "title": "Flux growth of kagome metal single crystals",
+    "summary": "Centimetre sized single crystals of the kagome metal CsV3Sb5 were grown from a Sb flux and "
+               "characterised by transport, specific heat and angle resolved photoemission spectroscopy.",
+}
+
+
+def test_exact_keys_and_version_normalization():
+    assert normalize_paper_id("arxiv:2501.01234v3") == "arxiv:2501.01234"
+    assert normalize_paper_id("iop:10.1088/x") == "iop:10.1088/x"
+    assert exact_keys(dict(PREPRINT, doi="10.1103/PhysRevB.1.1")) == [
+        "arxiv:2501.01234",
+        "doi:10.1103/physrevb.1.1",
+        "title:linear magnetoelectric effect in polycrystalline co4nb2o9",
+    ]
+    # IOP 论文的 DOI 取自文章链接；过短的标题不作为键
+    assert exact_keys(dict(JOURNAL, title="Erratum")) == ["iop:10.1088/1361-648X/ad1234", "doi:10.1088/1361-648x/ad1234"]
+    assert legacy_ids(PREPRINT) == ["arxiv:2501.01234v1", "arxiv:2501.01234v2"]
+    assert legacy_ids(JOURNAL) == []
+
+
+def test_versions_collapse_to_one_paper():
+    # 旧版记录里保存的是带版本号的 ID
+    dedup = Deduplicator({"arxiv:2501.01234v1"}, fingerprint_path=None)
+    assert dedup.duplicate_of(PREPRINT) == "arxiv:2501.01234v1"
+
+    seen = set()
+    dedup = Deduplicator(seen, fingerprint_path=None)
+    dedup.mark_sent(dict(PREPRINT, id="arxiv:2501.01234v1", version=1))
+    assert "arxiv:2501.01234" in seen
+    assert dedup.duplicate_of(PREPRINT) == "arxiv:2501.01234"
+    assert dedup.stats == {"exact": 1, "near": 0}
+
+
+def test_exact_duplicates_within_run():
+    dedup = Deduplicator(set(), fingerprint_path=None)
+    dedup.register(PREPRINT)
+    retitled = dict(UNRELATED, title=PREPRINT["title"].upper())
+    assert dedup.duplicate_of(retitled) == PREPRINT["id"]
+    # 同一篇在多个候选池中被检查只计一次
+    dedup.duplicate_of(retitled)
+    assert dedup.stats == {"exact": 1, "near": 0}
+    assert dedup.duplicate_of(UNRELATED) is None
+
+
+def test_preprint_and_journal_version_are_near_duplicates(tmp_path):
+    path = tmp_path / "sent_papers.sig"
+    dedup = Deduplicator(set(), fingerprint_path=path)
+    dedup.register(PREPRINT)
+    assert dedup.duplicate_of(JOURNAL) == PREPRINT["id"]
+    assert dedup.duplicate_of(UNRELATED) is None
+    assert dedup.stats == {"exact": 0, "near": 1}
+
+    # 已推送论文的指纹保存到文件，下次运行仍能识别
+    dedup.mark_sent(PREPRINT)
+    dedup.save()
+    later = Deduplicator(set(), fingerprint_path=path)
+    assert later.duplicate_of(JOURNAL) is not None
+    assert later.duplicate_of(UNRELATED) is None
+
+
+def test_save_drops_expired_fingerprints(tmp_path):
+    path = tmp_path / "sent_papers.sig"
+    today = int(time.time() // 86400)
+    setup = Deduplicator(set(), fingerprint_path=None)
+    old = np.zeros(2, dtype=FINGERPRINT_DTYPE)
+    old["key"] = [1, 2]
+    old["day"] = [today - FINGERPRINT_TTL_DAYS - 1, today - 1]
+    old["sig"] = [setup.signature(PREPRINT), np.arange(NUM_PERM)]
+    old.tofile(path)
+
+    dedup = Deduplicator(set(), fingerprint_path=path)
+    # 过期的指纹在加载时忽略
+    assert dedup.duplicate_of(JOURNAL) is None
+    dedup.mark_sent(UNRELATED)
+    dedup.save()
+
+    records = np.fromfile(path, dtype=FINGERPRINT_DTYPE)
+    assert len(records) == 2
+    assert records["key"][0] == 2
+    assert records["day"].min() >= today - FINGERPRINT_TTL_DAYS
+    assert np.array_equal(records["sig"][1], dedup.signature(UNRELATED))
+
+    # 没有过期记录时只追加
+    dedup.mark_sent(PREPRINT)
+    dedup.save()
+    assert len(np.fromfile(path, dtype=FINGERPRINT_DTYPE)) == 3
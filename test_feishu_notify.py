@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+飞书日报卡片测试：超过大小上限时拆分，每篇论文只出现一次且保持按主题分组
+"""
+
+import re
+
+from feishu_notify import FEISHU_MAX_BYTES, build_digest_messages, encode_payload, sign_payload
+
+TAGS = ["【多铁/磁电 + 制备】", "【量子自旋液体 + 制备】", "【Kagome + 制备】"]
+HEADING_RE = re.compile(r"^\*\*(【.+】)\*\*（(\d+) 篇）$")
+LINK_RE = re.compile(r"^\*\*\[.*\]\((\S+)\)\*\*")
+
+
+def make_papers():
+    papers = []
+    for i in range(45):
+        papers.append({
+            "id": f"arxiv:2501.{i:05d}",
+            "title": f"Paper {i} on [frustrated] magnets",
+            "link": f"https://arxiv.org/abs/2501.{i:05d}",
+            "tag": TAGS[i * len(TAGS) // 45],
+            "methods": ["固相反应"] if i % 2 else [],
+            "processed_summary": f"第 {i} 篇论文的中文摘要，" + "研究了阻挫磁体中的自旋液体行为。" * 20,
+        })
+    # 单篇本身就超过上限的论文：摘要逐步截短
+    papers[-1]["processed_summary"] = "超长摘要" * 10000
+    return papers
+
+
+def test_digest_split_keeps_every_paper_once_and_groups_by_tag():
+    papers = make_papers()
+    total = len(encode_payload({"papers": [p["processed_summary"] for p in papers]}))
+    assert total > FEISHU_MAX_BYTES
+
+    messages = build_digest_messages(papers, "📚 每日论文")
+    assert len(messages) > 1
+
+    by_link = {p["link"]: p for p in papers}
+    seen_links = []
+    seen_papers = []
+    for part, (message, page_papers) in enumerate(messages, 1):
+        assert len(encode_payload(message)) <= FEISHU_MAX_BYTES
+        # 加上签名字段后仍在飞书 20 KB 的请求体上限内
+        assert len(encode_payload(sign_payload(dict(message), "secret"))) < 20 * 1024
+        card = message["card"]
+        assert card["header"]["title"]["content"] == f"📚 每日论文（{part}/{len(messages)}）"
+
+        current_tag = None
+        page_links = []
+        for element in card["elements"]:
+            if element["tag"] == "hr":
+                continue
+            content = element["text"]["content"]
+            heading = HEADING_RE.match(content)
+            if heading:
+                current_tag = heading.group(1)
+                assert int(heading.group(2)) == sum(p["tag"] == current_tag for p in papers)
+                continue
+            link = LINK_RE.match(content).group(1)
+            # 每篇论文都在自己主题的小标题之下（续页重复小标题）
+            assert current_tag == by_link[link]["tag"]
+            page_links.append(link)
+        assert page_links == [p["link"] for p in page_papers]
+        seen_links.extend(page_links)
+        seen_papers.extend(page_papers)
+
+    # 每篇论文恰好出现一次，且按主题顺序连续排列
+    assert seen_links == [p["link"] for p in papers]
+    assert [p["id"] for p in seen_papers] == [p["id"] for p in papers]
+
+
+def test_small_digest_is_one_card():
+    papers = make_papers()[:3]
+    messages = build_digest_messages(papers, "📚 每日论文")
+    assert len(messages) == 1
+    message, page_papers = messages[0]
+    assert message["card"]["header"]["title"]["content"] == "📚 每日论文"
+    assert page_papers == papers
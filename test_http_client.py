@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+共享 HTTP 客户端测试（假的 transport，不联网）：429/503 退避重试、Retry-After、流式读取的 304、限速汇总
+"""
+
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+import requests
+
+from fetch_engine import AdaptiveRateLimiter
+from http_cache import HttpCache
+from http_client import HttpClient, get_client, retry_after_seconds, set_client
+
+URL = "https://api.example.org/query"
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.closed = False
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8")
+
+    def iter_content(self, chunk_size=8192):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"HTTP {self.status_code}")
+
+    def close(self):
+        self.closed = True
+
+
+class FakeTransport:
+    """按顺序返回预设的响应（异常实例则抛出），并记录每次请求的 URL 与请求头"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.sent = []
+
+    def send(self, method, url, headers=None, body=None, timeout=None, stream=False):
+        self.sent.append((url, dict(headers or {})))
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def close(self):
+        pass
+
+
+class RecordingLimiter(AdaptiveRateLimiter):
+    """记录每次 penalize 收到的 Retry-After"""
+
+    def __init__(self):
+        super().__init__(rate=1000, capacity=10, backoff_base=0.001, backoff_max=0.01)
+        self.retry_afters = []
+
+    def penalize(self, retry_after=None):
+        self.retry_afters.append(retry_after)
+        return super().penalize(retry_after)
+
+
+def client_for(transport, limiter=None, **kwargs):
+    limiters = {"api.example.org": limiter} if limiter is not None else None
+    return HttpClient(transport=transport, cache=None, limiters=limiters, **kwargs)
+
+
+def test_retry_after_seconds():
+    assert retry_after_seconds({"Retry-After": "3"}) == 3.0
+    assert retry_after_seconds({}) is None
+    assert retry_after_seconds({"Retry-After": "soon"}) is None
+    later = datetime.now(timezone.utc) + timedelta(seconds=120)
+    assert 100 < retry_after_seconds({"Retry-After": format_datetime(later, usegmt=True)}) <= 120
+    earlier = datetime.now(timezone.utc) - timedelta(seconds=120)
+    assert retry_after_seconds({"Retry-After": format_datetime(earlier, usegmt=True)}) == 0.0
+
+
+def test_retries_429_and_503_with_backoff():
+    limiter = RecordingLimiter()
+    throttled = FakeResponse(429, headers={"Retry-After": "0"})
+    unavailable = FakeResponse(503)
+    transport = FakeTransport(throttled, unavailable, FakeResponse(200, b"ok"))
+    response = client_for(transport, limiter).get(URL)
+
+    assert response.status_code == 200
+    assert len(transport.sent) == 3
+    # Retry-After 原样交给限速器；没有 Retry-After 时按指数退避
+    assert limiter.retry_afters == [0.0, None]
+    assert limiter.backoffs == 2
+    assert throttled.closed and unavailable.closed
+    # 成功后速率按步长恢复，但仍低于上限
+    assert limiter.min_rate <= limiter.rate < limiter.max_rate
+    assert limiter.failures == 0
+
+
+def test_gives_up_after_max_retries():
+    limiter = RecordingLimiter()
+    transport = FakeTransport(*(FakeResponse(503) for _ in range(3)))
+    response = client_for(transport, limiter, max_retries=2).get(URL)
+    assert response.status_code == 503
+    assert len(transport.sent) == 3
+    assert limiter.backoffs == 2
+
+
+def test_retries_connection_errors():
+    limiter = RecordingLimiter()
+    transport = FakeTransport(requests.ConnectionError("reset"), FakeResponse(200, b"ok"))
+    assert client_for(transport, limiter).get(URL).content == b"ok"
+    assert limiter.retry_afters == [None]
+
+    with pytest.raises(requests.ConnectionError):
+        client_for(FakeTransport(requests.ConnectionError("reset"))).get(URL)
+
+
+def test_no_retry_without_limiter():
+    transport = FakeTransport(FakeResponse(503))
+    assert client_for(transport).get(URL).status_code == 503
+    assert len(transport.sent) == 1
+
+
+def test_iter_content_revalidates_with_304(tmp_path):
+    cache = HttpCache(tmp_path / "cache", ttls={"test": 0})
+    body = b"<feed>" + b"x" * 100 + b"</feed>"
+    transport = FakeTransport(FakeResponse(200, body, {"ETag": '"v1"'}), FakeResponse(304))
+    client = HttpClient(transport=transport, cache=cache)
+
+    assert b"".join(client.iter_content(URL, params={"q": "kagome"}, cache_source="test", chunk_size=16)) == body
+    # TTL 为 0：第二次带 If-None-Match 回源，304 时产出缓存的内容
+    assert b"".join(client.iter_content(URL, params={"q": "kagome"}, cache_source="test")) == body
+    assert transport.sent[0][0] == URL + "?q=kagome"
+    assert "If-None-Match" not in transport.sent[0][1]
+    assert transport.sent[1][1]["If-None-Match"] == '"v1"'
+    assert cache.stats() == {"hits": 0, "revalidated": 1, "misses": 1}
+
+
+def test_iter_content_raises_on_error():
+    transport = FakeTransport(FakeResponse(404))
+    with pytest.raises(requests.HTTPError):
+        list(client_for(transport).iter_content(URL))
+
+
+def test_summary_reports_shared_limiter_once():
+    shared = RecordingLimiter()
+    other = RecordingLimiter()
+    client = HttpClient(transport=FakeTransport(FakeResponse(429), FakeResponse(200), FakeResponse(200)), cache=None,
+                        limiters={"a.example.org": shared, "b.example.org": shared, "c.example.org": other})
+    client.get("https://a.example.org/x")
+    client.get("https://b.example.org/y")
+
+    summary = client.summary()
+    assert summary.startswith("a.example.org 2 次，b.example.org 1 次")
+    assert summary.count("a.example.org / b.example.org 退避 1 次") == 1
+    # 没有等待也没有退避的限速器不出现在汇总中
+    assert "c.example.org" not in summary
+
+
+def test_limiter_separates_backoff_from_pacing():
+    limiter = AdaptiveRateLimiter(rate=20, capacity=1, backoff_max=1)
+    limiter.acquire()
+    limiter.acquire()
+    # 正常按速率排队不算退避
+    assert limiter.backoff_seconds == 0
+    assert 0.02 < limiter.paced_seconds < 0.2
+    paced = limiter.paced_seconds
+
+    limiter.penalize(0.1)
+    limiter.acquire()
+    assert 0.08 < limiter.backoff_seconds < 0.3
+    assert limiter.paced_seconds >= paced
+    assert limiter.summary().startswith(f"退避 1 次（暂停 {limiter.backoff_seconds:.1f} 秒），按速率排队")
+
+
+def test_set_client_swaps_shared_client():
+    replacement = client_for(FakeTransport(FakeResponse(200, b"ok")))
+    old = set_client(replacement)
+    try:
+        assert get_client() is replacement
+        assert get_client().get(URL).content == b"ok"
+    finally:
+        set_client(old)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+IOP 采集测试（假的 transport，不联网）：多个搜索词共有的文章按搜索词顺序归属，与线程完成顺序无关
+"""
+
+import threading
+from datetime import datetime, timezone
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from fetch_engine import AdaptiveRateLimiter
+from http_client import HttpClient, set_client
+from iop_source import IopHarvester
+
+SINCE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+# 搜索词 -> 结果页中的文章编号（按发表日期降序）
+RESULTS = {
+    "multiferroic": ["a1", "s1", "a2", "s2"],
+    "magnetoelectric": ["s1", "b1", "s2", "b2"],
+    "kagome": ["s2", "c1"],
+}
+
+
+def result_page(articles):
+    items = "".join(
+        f'<div class="art-list-item list-item"><h3><a href="/article/10.1088/{a}">Article {a}</a></h3>'
+        f'<span class="pub-date">{20 - i} Jan 2025</span><div class="abstract">Abstract of {a}.</div></div>'
+        for i, a in enumerate(articles)
+    )
+    return f"<html><body>{items}</body></html>".encode()
+
+
+class FakeResponse:
+    status_code = 200
+    headers = {}
+
+    def __init__(self, content):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeIop:
+    """只有第一页有结果；release 之前排在第一位的搜索词一直拿不到响应，让其他搜索词先解析共有文章"""
+
+    def __init__(self, first_term):
+        self.first_term = first_term
+        self.release = threading.Event()
+        self.parsed = []
+
+    def send(self, method, url, headers=None, body=None, timeout=None, stream=False):
+        query = parse_qs(urlsplit(url).query)
+        term = query["terms"][0]
+        if term == self.first_term:
+            self.release.wait(5)
+        elif "currentPage" not in query:
+            self.parsed.append(term)
+            if len(self.parsed) == len(RESULTS) - 1:
+                self.release.set()
+        return FakeResponse(result_page(RESULTS[term] if "currentPage" not in query else []))
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def fake_iop():
+    transport = FakeIop("multiferroic")
+    limiter = AdaptiveRateLimiter(rate=1000, capacity=10)
+    old = set_client(HttpClient(transport=transport, cache=None, limiters={"iopscience.iop.org": limiter}))
+    yield transport
+    set_client(old)
+
+
+def test_shared_articles_follow_term_order(fake_iop):
+    harvester = IopHarvester(SINCE, max_pages=2, max_workers=3)
+    results = harvester.harvest(list(RESULTS))
+
+    assert fake_iop.release.is_set()
+    assert [term for term, _ in results] == list(RESULTS)
+    assigned = {term: [p["link"].rsplit("/", 1)[-1] for p in papers] for term, papers in results}
+    # 排在第一位的搜索词最后完成，但共有文章仍归属于它
+    assert assigned == {
+        "multiferroic": ["a1", "s1", "a2", "s2"],
+        "magnetoelectric": ["b1", "b2"],
+        "kagome": ["c1"],
+    }
+    assert results[0][1][1]["title"] == "Article s1"
+    assert {term: (s["new"], s["shared"]) for term, s in harvester.stats.items()} == {
+        "multiferroic": (4, 0),
+        "magnetoelectric": (2, 2),
+        "kagome": (1, 1),
+    }
+    assert list(harvester.stats) == list(RESULTS)
+    assert harvester.unproductive_terms() == []
@@ -3,8 +3,9 @@
 简单网络测试
 """
 
-import urllib.request
-import socket
+import requests
+
+from http_client import get_client
 
 def test_connection():
     print("Testing network connection...")
@@ -13,20 +14,15 @@ def test_connection():
     # 测试arXiv API
     try:
         print("Testing arXiv API...")
-        req = urllib.request.Request(
+        response = get_client().get(
             "http://export.arxiv.org/api/query?search_query=all:quantum&max_results=1",
-            headers={'User-Agent': 'OpenClaw/1.0'}
+            timeout=15
         )
-        
-        # 设置超时
-        socket.setdefaulttimeout(15)
-        
-        response = urllib.request.urlopen(req)
-        data = response.read()
+        data = response.content
         
         print("SUCCESS: arXiv API is accessible")
         print(f"Response size: {len(data)} bytes")
-        print(f"Status code: {response.getcode()}")
+        print(f"Status code: {response.status_code}")
         
         # 检查是否包含有效数据
         if b'<entry>' in data:
@@ -36,7 +32,7 @@ def test_connection():
             print("WARNING: Response format may be incorrect")
             return False
             
-    except socket.timeout:
+    except requests.Timeout:
         print("ERROR: Connection timeout (15 seconds)")
         print("Possible causes:")
         print("1. Network connectivity issues")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+OAI-PMH 回填测试（使用本地替身服务器，不联网）
+"""
+
+import pytest
+import requests
+
+from oai_backfill import BackfillStore, harvest
+from oai_standin import DELETED_EVERY, OaiStandin
+
+RECORDS = 250
+PAGE_SIZE = 40
+
+
+def expected_ids():
+    return {f"arxiv:2101.{i:05d}" for i in range(RECORDS) if i % DELETED_EVERY != DELETED_EVERY - 1}
+
+
+def harvested_ids(store, unique=True):
+    ids = [r["id"] for r in store.iter_records()]
+    if unique:
+        assert len(ids) == len(set(ids))
+    return set(ids)
+
+
+def test_full_harvest(tmp_path):
+    store = BackfillStore(tmp_path)
+    with OaiStandin(RECORDS, PAGE_SIZE) as standin:
+        written = harvest(store, endpoint=standin.url, date_from="2021-01-01", workers=1)
+    assert written == len(expected_ids())
+    assert harvested_ids(store) == expected_ids()
+    checkpoint = store.load_checkpoint()
+    assert checkpoint["done"] and checkpoint["token"] is None
+    assert checkpoint["deleted"] == RECORDS - len(expected_ids())
+
+
+def test_resume_after_network_error(tmp_path):
+    store = BackfillStore(tmp_path)
+    with OaiStandin(RECORDS, PAGE_SIZE, fail_pages=[3]) as standin:
+        with pytest.raises(requests.HTTPError):
+            harvest(store, endpoint=standin.url, date_from="2021-01-01", workers=1)
+        # 出错前下载的批次已落盘，检查点指向出错的那一批
+        checkpoint = store.load_checkpoint()
+        assert checkpoint is not None
+        assert checkpoint["token"] == "page-3"
+        assert checkpoint["next_shard"] == 4
+        assert len(store.shards()) == 3
+
+        harvest(store, endpoint=standin.url, date_from="2021-01-01", workers=1)
+        # 续收从出错的那一批开始，不重复请求已收割的分页
+        assert standin.requests == [0, 1, 2, 3, 3, 4, 5, 6]
+    assert harvested_ids(store) == expected_ids()
+    assert store.load_checkpoint()["done"]
+
+
+def test_expired_token_restarts(tmp_path):
+    store = BackfillStore(tmp_path)
+    with OaiStandin(RECORDS, PAGE_SIZE) as standin:
+        harvest(store, endpoint=standin.url, date_from="2021-01-01", workers=1, max_batches=2)
+        checkpoint = store.load_checkpoint()
+        checkpoint["token"] = "page-999"
+        store.save_checkpoint(checkpoint)
+        harvest(store, endpoint=standin.url, date_from="2021-01-01", workers=1)
+    # 重新收割时旧分片保留（导入时按 ID 覆盖），因此允许重复
+    assert harvested_ids(store, unique=False) == expected_ids()
+    assert store.load_checkpoint()["done"]
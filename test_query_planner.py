@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+查询规划器测试：逐条执行原有主题查询，与批量查询 + 本地归属的主题结果一致
+（读取 benchmarks/fixtures/topics 中的 Atom 文件，用简化的 arXiv 检索语义代替真实 API，不联网）
+"""
+
+import os
+import re
+from pathlib import Path
+
+os.environ.setdefault("FEISHU_WEBHOOK_URL", "http://127.0.0.1/test-webhook")
+
+from arxiv_daily_report import ARXIV_TOPICS  # noqa: E402
+from atom_parser import parse_arxiv_xml  # noqa: E402
+from query_planner import QueryMatcher, plan_topic_queries, stem  # noqa: E402
+
+FEED = Path(__file__).parent / "benchmarks" / "fixtures" / "topics" / "cond-mat.atom.xml"
+
+
+class FakeArxivSearch:
+    """
+    简化的 arXiv 检索：abs 字段的短语逐词按前缀匹配（近似 arXiv 的词干归并），
+    同一子句内的词项取交集，子句之间 OR；结果按发表时间降序
+    """
+
+    def __init__(self, papers):
+        self.papers = sorted(papers, key=lambda p: p["published"], reverse=True)
+        self.requests = 0
+
+    @staticmethod
+    def _has_phrase(text, phrase):
+        words = re.findall(r"\w+", text.lower())
+        query = re.findall(r"\w+", phrase.lower())
+        return any(all(words[i + j].startswith(q) for j, q in enumerate(query))
+                   for i in range(len(words) - len(query) + 1))
+
+    def _matches(self, paper, clause):
+        terms = re.findall(r'abs:(?:"([^"]+)"|(\w+))', clause)
+        return all(self._has_phrase(paper["summary"], phrase or word) for phrase, word in terms)
+
+    def search(self, query_str):
+        self.requests += 1
+        clauses = query_str.split(" OR ")
+        return [p for p in self.papers if any(self._matches(p, c) for c in clauses)]
+
+
+def load_papers():
+    return parse_arxiv_xml(FEED.read_text(encoding="utf-8"), None)
+
+
+def ids(papers):
+    return [p["id"].removeprefix("arxiv:") for p in papers]
+
+
+def test_plan_matches_per_topic_queries():
+    arxiv = FakeArxivSearch(load_papers())
+    # 原来的做法：每个主题逐条查询，按查询顺序收集
+    expected = []
+    for topic in ARXIV_TOPICS:
+        pool = []
+        for q in topic["queries"]:
+            pool.extend(p for p in arxiv.search(q) if p not in pool)
+        expected.append(ids(pool))
+    old_requests = arxiv.requests
+
+    arxiv.requests = 0
+    plan = plan_topic_queries(ARXIV_TOPICS)
+    fetched = {}
+    for batch in plan.batches:
+        for p in arxiv.search(batch):
+            fetched.setdefault(p["id"], p)
+    merged = sorted(fetched.values(), key=lambda p: p["published"], reverse=True)
+    assert [ids(pool) for pool in plan.attribute(merged)] == expected
+    assert (old_requests, arxiv.requests) == (35, 2)
+
+    assert expected == [
+        ["2501.08001", "2501.08003", "2501.08014", "2501.08002"],
+        ["2501.08004", "2501.08010", "2501.08011", "2501.08005"],
+        ["2501.08008", "2501.08009"],
+        ["2501.08003", "2501.08006"],
+    ]
+
+
+def test_plan_summary():
+    assert plan_topic_queries(ARXIV_TOPICS).summary() == "35 个查询 → 9 个根查询 → 2 个批量查询"
+
+
+def test_stemming_follows_arxiv():
+    assert {stem(w) for w in ["magnet", "magnets", "magnetic", "magnetism"]} == {"magnet"}
+    assert stem("sintering") == stem("sintered") == stem("sinter")
+    assert stem("glass") == "glass"
+    matcher = QueryMatcher('abs:"frustrated magnet" abs:"solid state reaction"')
+    assert matcher.matches({"title": "", "summary": "Frustrated magnetism in powders made by solid-state reactions."})
+    # abs 只看摘要
+    assert not QueryMatcher('abs:"kagome"').matches({"title": "Kagome metals", "summary": "A review."})
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+推荐索引测试：论文库中文本变化的论文（如 arXiv 新版本）重新索引，DF 与从头建索引一致
+"""
+
+import numpy as np
+
+from paper_archive import PaperArchive
+from recommender import Recommender, SparseIndex
+
+N_FEATURES = 1 << 12
+
+PAPERS = [
+    {"id": "arxiv:2501.00001", "version": 1, "title": "Kagome metal single crystals",
+     "summary": "Flux growth of CsV3Sb5 single crystals and their charge density wave."},
+    {"id": "arxiv:2501.00002", "version": 1, "title": "Multiferroic Co4Nb2O9 ceramics",
+     "summary": "Solid state reaction synthesis and linear magnetoelectric coupling."},
+]
+
+REVISED = dict(PAPERS[0], version=2, title="Spin liquid candidate grown by chemical vapour transport",
+               summary="Chemical vapour transport growth of a frustrated triangular lattice magnet.")
+
+
+def test_changed_text_is_reindexed(tmp_path):
+    archive = PaperArchive(tmp_path / "papers.sqlite3")
+    archive.upsert_papers(PAPERS)
+    index = SparseIndex(tmp_path / "index", n_features=N_FEATURES)
+    assert index.update(archive) == 2
+    before = index.tfidf_rows([REVISED["id"]])
+    recommender = Recommender(index, {"alice": [REVISED["id"]]})
+    signature = recommender._signature()
+
+    # 未改变文本的重复 upsert 不触发重新索引
+    archive.upsert_papers(PAPERS)
+    assert index.update(archive) == 0
+
+    archive.upsert_papers([REVISED])
+    assert index.update(archive) == 1
+    assert len(index) == 2
+    after = index.tfidf_rows([REVISED["id"]])
+    assert not np.array_equal(before[2], after[2])
+    # 收藏论文的文本变了，画像需要重算
+    assert Recommender(index, {"alice": [REVISED["id"]]})._signature() != signature
+
+    # 与从头建的索引一致；重新打开后（含 DF 由有效行重新统计）也一致
+    rebuilt = SparseIndex(tmp_path / "rebuilt", n_features=N_FEATURES)
+    rebuilt.update(archive)
+    reopened = SparseIndex(tmp_path / "index", n_features=N_FEATURES)
+    (tmp_path / "index" / "df.npz").unlink()
+    recounted = SparseIndex(tmp_path / "index", n_features=N_FEATURES)
+    for other in (reopened, recounted):
+        assert len(other) == 2
+        assert np.array_equal(other.df, rebuilt.df)
+        assert np.allclose(other.idf(), rebuilt.idf())
+        for got, want in zip(other.tfidf_rows([REVISED["id"]])[1:], rebuilt.tfidf_rows([REVISED["id"]])[1:]):
+            assert np.allclose(got, want)
+    assert reopened.update(archive) == 0
+    archive.close()
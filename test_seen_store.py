@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+已推送 ID 存储测试（主文件二分查找、增量日志、合并与 TTL、旧版 JSON 迁移）
+"""
+
+import json
+
+import seen_store
+from seen_store import RECORD, SeenStore, id_hash
+
+TODAY = 20000
+
+
+def open_store(tmp_path, **kwargs):
+    return SeenStore(tmp_path / "sent_papers", **kwargs)
+
+
+def test_binary_search_over_base(tmp_path, monkeypatch):
+    monkeypatch.setattr(seen_store, "_today", lambda: TODAY)
+    ids = [f"arxiv:2501.{i:05d}" for i in range(1000)]
+    store = open_store(tmp_path)
+    store.update(ids)
+    assert store.compact() == 1000
+    store.close()
+
+    # 主文件按哈希排序，重新打开后只靠内存映射上的二分查找
+    data = (tmp_path / "sent_papers.bin").read_bytes()
+    hashes = [h for h, _ in RECORD.iter_unpack(data)]
+    assert hashes == sorted(hashes)
+    store = open_store(tmp_path)
+    assert not store._delta
+    assert len(store) == 1000
+    assert all(paper_id in store for paper_id in ids)
+    assert "arxiv:2501.99999" not in store
+    assert "doi:10.1088/1361-648X/ad0001" not in store
+    store.close()
+
+
+def test_log_merged_on_reopen(tmp_path, monkeypatch):
+    monkeypatch.setattr(seen_store, "_today", lambda: TODAY)
+    store = open_store(tmp_path)
+    store.update(["arxiv:a", "arxiv:b"])
+    store.compact()
+    store.update(["arxiv:c", "arxiv:a"])
+    store.flush()
+    store.close()
+    # 模拟写入中断：日志尾部留下半条记录
+    with open(tmp_path / "sent_papers.log", "ab") as log:
+        log.write(RECORD.pack(id_hash("arxiv:d"), TODAY)[:5])
+
+    store = open_store(tmp_path)
+    assert len(store) == 3
+    assert set(store._delta) == {id_hash("arxiv:c")}
+    assert all(paper_id in store for paper_id in ["arxiv:a", "arxiv:b", "arxiv:c"])
+    assert "arxiv:d" not in store
+    store.close()
+
+
+def test_flush_compacts_past_threshold(tmp_path, monkeypatch):
+    monkeypatch.setattr(seen_store, "_today", lambda: TODAY)
+    store = open_store(tmp_path, compact_threshold=3)
+    store.update(["arxiv:a", "arxiv:b"])
+    store.flush()
+    assert (tmp_path / "sent_papers.log").stat().st_size == 2 * RECORD.size
+    store.add("arxiv:c")
+    store.flush()
+    assert (tmp_path / "sent_papers.log").stat().st_size == 0
+    assert (tmp_path / "sent_papers.bin").stat().st_size == 3 * RECORD.size
+    store.close()
+
+
+def test_compact_drops_expired_records(tmp_path, monkeypatch):
+    monkeypatch.setattr(seen_store, "_today", lambda: TODAY - 400)
+    store = open_store(tmp_path, ttl_days=365)
+    store.update(["arxiv:old-base"])
+    store.compact()
+    store.add("arxiv:old-log")
+    store.flush()
+    store.close()
+
+    monkeypatch.setattr(seen_store, "_today", lambda: TODAY)
+    store = open_store(tmp_path, ttl_days=365)
+    store.add("arxiv:new")
+    assert len(store) == 3
+    # 主文件和日志中超过 TTL 的记录都在合并时清理
+    assert store.compact() == 1
+    assert "arxiv:new" in store
+    assert "arxiv:old-base" not in store
+    assert "arxiv:old-log" not in store
+    store.close()
+
+
+def test_import_json(tmp_path, monkeypatch):
+    monkeypatch.setattr(seen_store, "_today", lambda: TODAY)
+    legacy = tmp_path / "sent_papers.json"
+    legacy.write_text(json.dumps(["arxiv:a", "arxiv:b", "arxiv:a", "doi:10.1/x"]), encoding="utf-8")
+    store = open_store(tmp_path)
+    store.add("arxiv:b")
+    assert store.import_json(legacy) == 2
+    store.close()
+
+    store = open_store(tmp_path)
+    assert len(store) == 3
+    assert all(paper_id in store for paper_id in ["arxiv:a", "arxiv:b", "doi:10.1/x"])
+    store.close()
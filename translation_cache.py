@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+翻译结果持久化缓存
+键 = SHA-256(归一化摘要 + 提示词版本 + 模型名)，窗口回退或重跑时不再重复翻译。
+✅ TTL 过期 + 按条数 LRU 淘汰
+✅ 命中 / 未命中计数
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+TRANSLATION_CACHE_PATH = Path(os.getenv(
+    "TRANSLATION_CACHE_PATH", Path(__file__).parent / "translation_cache.sqlite3"
+))
+TRANSLATION_CACHE_MAX_ENTRIES = 20000
+TRANSLATION_CACHE_TTL_DAYS = 180
+
+
+def normalize_abstract(text):
+    return " ".join(text.split()).lower()
+
+
+def translation_key(text, prompt_version, model):
+    raw = "\x1f".join([normalize_abstract(text), prompt_version, model])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class TranslationCache:
+    def __init__(self, path=TRANSLATION_CACHE_PATH, max_entries=TRANSLATION_CACHE_MAX_ENTRIES,
+                 ttl_days=TRANSLATION_CACHE_TTL_DAYS):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl = ttl_days * 86400
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS translations (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_translations_accessed ON translations(accessed_at)")
+        self._db.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT value, created_at FROM translations WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE translations SET accessed_at = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?)", (key, value, now, now))
+            self._db.commit()
+
+    def evict(self):
+        """删除过期条目，并按最近访问时间裁剪到 max_entries 条，返回删除条数"""
+        with self._lock:
+            cur = self._db.execute("DELETE FROM translations WHERE created_at < ?", (time.time() - self.ttl,))
+            removed = cur.rowcount
+            cur = self._db.execute(
+                """DELETE FROM translations WHERE key IN (
+                    SELECT key FROM translations ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )""",
+                (self.max_entries,),
+            )
+            removed += cur.rowcount
+            self._db.commit()
+            return removed
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def stats(self):
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return f"命中 {self.hits} / 未命中 {self.misses}（命中率 {rate:.0%}），缓存 {len(self)} 条"
+
+    def close(self):
+        with self._lock:
+            self._db.close()
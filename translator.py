@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DeepSeek 批量翻译阶段
+✅ 多篇摘要打包为一次请求，要求结构化 JSON 逐篇返回
+✅ 有界并发发送多个批次
+✅ 统计本次运行的请求数、token 用量与费用
+✅ 发请求前先查翻译缓存（translation_cache），只翻译未命中的摘要
+"""
+
+import json
+import os
+import threading
+
+from fetch_engine import fetch_all
+from http_client import get_client
+from translation_cache import TranslationCache, translation_key
+
+DEEPSEEK_URL = "https://api.deepseek.com/chat/completions"
+DEEPSEEK_MODEL = os.getenv("DEEPSEEK_MODEL", "deepseek-coder")
+TRANSLATE_BATCH_SIZE = int(os.getenv("TRANSLATE_BATCH_SIZE", "5"))
+TRANSLATE_MAX_WORKERS = int(os.getenv("TRANSLATE_MAX_WORKERS", "3"))
+TRANSLATE_TIMEOUT = 60
+TOKENS_PER_PAPER = 300
+PROMPT_VERSION = "batch-json-v1"  # 修改 SYSTEM_PROMPT 或输出格式时递增，旧缓存自动失效
+
+# 每百万 token 单价（元），可按当前价目表通过环境变量调整
+PRICE_INPUT_PER_M = float(os.getenv("DEEPSEEK_PRICE_INPUT_PER_M", "2"))
+PRICE_OUTPUT_PER_M = float(os.getenv("DEEPSEEK_PRICE_OUTPUT_PER_M", "8"))
+
+SYSTEM_PROMPT = (
+    "你是一位顶尖凝聚态物理学家。请将每篇英文论文摘要翻译成专业、简洁的中文，并提炼出核心创新点（100字以内）。"
+    '只输出 JSON：{"items": [{"index": 序号, "summary": "中文摘要", "innovation": "核心创新"}]}，'
+    "index 与输入序号一一对应，不要遗漏。"
+)
+
+
+class TranslationStats:
+    """线程安全的用量统计"""
+
+    def __init__(self):
+        self.requests = 0
+        self.failures = 0
+        self.papers = 0
+        self.fallbacks = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+
+    def record(self, usage=None, failed=False):
+        with self._lock:
+            self.requests += 1
+            if failed:
+                self.failures += 1
+            if usage:
+                self.prompt_tokens += usage.get("prompt_tokens", 0)
+                self.completion_tokens += usage.get("completion_tokens", 0)
+
+    def add_papers(self, n, fallbacks=0):
+        with self._lock:
+            self.papers += n
+            self.fallbacks += fallbacks
+
+    @property
+    def cost(self):
+        return (self.prompt_tokens * PRICE_INPUT_PER_M + self.completion_tokens * PRICE_OUTPUT_PER_M) / 1e6
+
+    def summary(self):
+        return (
+            f"{self.papers} 篇 / {self.requests} 次请求（失败 {self.failures}，回退原文 {self.fallbacks}），"
+            f"token 输入 {self.prompt_tokens} 输出 {self.completion_tokens}，约 ¥{self.cost:.4f}"
+        )
+
+
+def fallback_summary(text):
+    if not text.strip():
+        return "【摘要】无摘要。"
+    return f"【摘要】{text[:200]}..."
+
+
+def format_translation(item):
+    return f"【中文摘要】{item.get('summary', '').strip()} 【核心创新】{item.get('innovation', '').strip()}"
+
+
+def build_batch_messages(texts):
+    body = "\n\n".join(f"[{i}]\n{text}" for i, text in enumerate(texts))
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": body},
+    ]
+
+
+def translate_batch(texts, api_key, stats, timeout=TRANSLATE_TIMEOUT):
+    """翻译一批摘要，返回与 texts 对应的结果列表；缺失或失败的条目为 None"""
+    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+    data = {
+        "model": DEEPSEEK_MODEL,
+        "messages": build_batch_messages(texts),
+        "max_tokens": TOKENS_PER_PAPER * len(texts) + 100,
+        "response_format": {"type": "json_object"},
+    }
+    try:
+        resp = get_client().post(DEEPSEEK_URL, headers=headers, json=data, timeout=timeout)
+        if resp.status_code != 200:
+            print(f"⚠️ DeepSeek API 返回错误 {resp.status_code}，本批 {len(texts)} 篇使用原文摘要")
+            stats.record(failed=True)
+            return [None] * len(texts)
+        payload = resp.json()
+        stats.record(payload.get("usage"))
+        items = json.loads(payload["choices"][0]["message"]["content"]).get("items", [])
+    except Exception as e:
+        print(f"⚠️ DeepSeek 调用异常: {e}，本批 {len(texts)} 篇使用原文摘要")
+        stats.record(failed=True)
+        return [None] * len(texts)
+
+    results = [None] * len(texts)
+    for item in items:
+        try:
+            index = int(item["index"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if 0 <= index < len(texts) and item.get("summary"):
+            results[index] = format_translation(item)
+    return results
+
+
+_default_cache = None
+
+
+def get_translation_cache():
+    """进程内共享的翻译缓存；设置 TRANSLATION_CACHE_DISABLED=1 时返回 None"""
+    global _default_cache
+    if os.getenv("TRANSLATION_CACHE_DISABLED", "") not in ("", "0"):
+        return None
+    if _default_cache is None:
+        _default_cache = TranslationCache()
+    return _default_cache
+
+
+def translate_abstracts(texts, api_key=None, stats=None, batch_size=TRANSLATE_BATCH_SIZE,
+                        max_workers=TRANSLATE_MAX_WORKERS, cache=None):
+    """
+    批量翻译摘要，返回与 texts 顺序一致的中文摘要
+
+    先查翻译缓存，只有未命中的摘要才发请求；成功的译文写回缓存。
+    没有 API Key、请求失败或模型漏掉某篇时，对应条目回退为原文摘要（不写缓存）。
+    """
+    api_key = api_key if api_key is not None else os.getenv("DEEPSEEK_API_KEY")
+    stats = stats or TranslationStats()
+    cache = cache if cache is not None else get_translation_cache()
+    results = [fallback_summary(t) for t in texts]
+    keys = [translation_key(t, PROMPT_VERSION, DEEPSEEK_MODEL) for t in texts]
+    todo = []
+    cached = 0
+    for i, t in enumerate(texts):
+        if not t.strip():
+            continue
+        hit = cache.get(keys[i]) if cache is not None else None
+        if hit is not None:
+            results[i] = hit
+            cached += 1
+        else:
+            todo.append(i)
+    if not api_key or not todo:
+        stats.add_papers(len(texts), fallbacks=len(texts) - cached)
+        return results
+
+    batches = [todo[i:i + batch_size] for i in range(0, len(todo), batch_size)]
+    outcome = fetch_all(
+        lambda batch: translate_batch([texts[i] for i in batch], api_key, stats),
+        batches,
+        max_workers=max_workers,
+    )
+    fallbacks = len(texts) - len(todo) - cached
+    for result in outcome:
+        translations = result.value if result.ok else [None] * len(result.item)
+        for i, translated in zip(result.item, translations):
+            if translated:
+                results[i] = translated
+                if cache is not None:
+                    cache.put(keys[i], translated)
+            else:
+                fallbacks += 1
+    if cache is not None:
+        cache.evict()
+    stats.add_papers(len(texts), fallbacks=fallbacks)
+    return results
+
+
+def translate_papers(papers, stats=None, **kwargs):
+    """为论文写入 processed_summary 字段，返回统计对象"""
+    stats = stats or TranslationStats()
+    summaries = translate_abstracts([p.get("summary", "") for p in papers], stats=stats, **kwargs)
+    for p, summary in zip(papers, summaries):
+        p["processed_summary"] = summary
+    return stats